@@ -0,0 +1,56 @@
+"""Command line entry point of the benchmarks.
+
+Example, with a baseline recorded earlier on the same machine:
+    python -m help_project.benchmarks.run --output baseline.json
+    python -m help_project.benchmarks.run --baseline baseline.json
+"""
+import argparse
+import json
+import platform
+import sys
+
+from help_project.benchmarks import suite
+
+
+def main(argv=None):
+    """Run the benchmarks, save the results and check for regressions."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('benchmarks', nargs='*',
+                        help='benchmarks to run, out of %s (default: all)' %
+                        ', '.join(suite.BENCHMARKS))
+    parser.add_argument('--quick', action='store_true',
+                        help='only run the small cases')
+    parser.add_argument('--output', help='file to write the results to')
+    parser.add_argument('--baseline', help='results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown relative to the baseline')
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(suite.BENCHMARKS)
+    if unknown:
+        parser.error('unknown benchmarks: %s' % ', '.join(sorted(unknown)))
+
+    results = suite.run_benchmarks(args.benchmarks, args.quick)
+    for result in results:
+        print('%-16s %-60s %.3g s/op' % (
+            result['benchmark'], json.dumps(result['params']),
+            result['seconds_per_op']['best']))
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump({'python': platform.python_version(),
+                       'machine': platform.machine(),
+                       'results': results}, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        regressions = suite.compare(results, baseline, args.tolerance)
+        for result, ratio in regressions:
+            print('REGRESSION %s %s: %.2fx slower than baseline' % (
+                result['benchmark'], json.dumps(result['params']), ratio))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
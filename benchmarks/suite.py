@@ -0,0 +1,179 @@
+"""Benchmarks of the hot paths of the optimization pipeline."""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from help_project.benchmarks import synthetic
+from help_project.src.economic_model.models import basic_lockdown_model
+from help_project.src.exitstrategies.data_elt import DataELT
+from help_project.src.optimization import loss_function
+from help_project.src.optimization import nsga
+from help_project.src.optimization import optimizer
+
+
+# Modules whose import time is measured, and the number of seconds their
+# import may take in a fresh interpreter before it counts as a regression.
+IMPORT_MODULES = (
+    'help_project.src.optimization.optimizer',
+    'help_project.src.economic_model.models.basic_lockdown_model',
+    'help_project.src.disease_model.seir_model',
+    'help_project.src.exitstrategies.interface',
+)
+IMPORT_BUDGET = 1.0
+
+
+def measure(run, n_ops, repeat=3, setup=None):
+    """Time run() and return the best and median seconds per operation.
+
+    setup, if given, is called before each repetition and its result passed
+    to run, so that its cost is not measured."""
+    times = []
+    for _ in range(repeat):
+        args = (setup(),) if setup is not None else ()
+        start = time.perf_counter()
+        run(*args)
+        times.append((time.perf_counter() - start) / n_ops)
+    return {'best': min(times), 'median': statistics.median(times)}
+
+
+def import_stats(module):
+    """Import a module in a fresh interpreter.
+
+    Returns the seconds the import took and the heavy dependencies (among
+    pandas and scipy) that it loaded."""
+    code = ('import sys, time\n'
+            'start = time.perf_counter()\n'
+            'import %s\n'
+            'print(time.perf_counter() - start)\n'
+            'print(*[name for name in ("pandas", "scipy") '
+            'if name in sys.modules])' % module)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    output = subprocess.run([sys.executable, '-c', code], env=env, check=True,
+                            stdout=subprocess.PIPE,
+                            universal_newlines=True).stdout.split('\n')
+    return float(output[0]), output[1].split()
+
+
+def bench_frontier_update(quick):
+    """ParetoFrontier.update as the frontier grows."""
+    sizes = [1000] if quick else [1000, 10000]
+    for n_objectives in [2, 3]:
+        for size in sizes:
+            losses = synthetic.pareto_losses(size, n_objectives)
+            points = tuple(range(size))
+
+            def run(frontier, points=points, losses=losses):
+                for point, loss in zip(points, losses):
+                    frontier.update(point, loss)
+            yield ({'objectives': n_objectives, 'frontier_size': size},
+                   measure(run, size, setup=loss_function.ParetoFrontier))
+
+
+def bench_economic_vector(quick):
+    """Per call and batch cost of the economic model."""
+    n_vectors = 100 if quick else 1000
+    for n_sectors, n_lockdown_sectors in [(10, 30), (50, 200)]:
+        mapping = synthetic.sector_mapping(n_sectors, n_lockdown_sectors)
+        vectors = synthetic.lockdown_vectors(mapping, n_vectors)
+        params = {'sectors': n_sectors, 'lockdown_sectors': n_lockdown_sectors}
+
+        def run_single(mapping=mapping, vectors=vectors):
+            for vector in vectors:
+                basic_lockdown_model.EconomicLockdownModel(
+                    lockdown_vector=vector,
+                    sector_mapping=mapping).get_economic_vector()
+        yield (dict(params, mode='single'), measure(run_single, n_vectors))
+
+        matrix = mapping.to_matrix(vectors)
+        model = basic_lockdown_model.EconomicLockdownModel(
+            sector_mapping=mapping)
+        yield (dict(params, mode='batch'),
+               measure(lambda model=model, matrix=matrix:
+                       model.get_economic_matrix(matrix), n_vectors))
+
+
+def bench_extract_data(quick):
+    """DataELT.extract_data with many strategy files."""
+    sizes = [(20, 100)] if quick else [(20, 100), (200, 365)]
+    for n_strategies, n_days in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            synthetic.write_strategy_files(folder, n_strategies, n_days,
+                                           n_focus_areas=30, n_breakpoints=6)
+            data_elt = DataELT(folder)
+            yield ({'strategies': n_strategies, 'days': n_days},
+                   measure(data_elt.extract_data, n_strategies))
+
+
+def bench_optimizer_steps(quick):
+    """Optimizer steps per second with cheap models."""
+    n_steps = 200 if quick else 2000
+    config = synthetic.config(n_options=10, n_ranges=20)
+    factories = {
+        'random_search': lambda: optimizer.RandomSearch(
+            config, synthetic.MultiLoss(), seed=0),
+        'nsga2': lambda: nsga.NSGA2(config, synthetic.MultiLoss(), seed=0),
+    }
+    for name, factory in factories.items():
+        def run(opt):
+            opt.optimize(synthetic.SumModel(), synthetic.SumModel(-1),
+                         n_steps=n_steps)
+        yield ({'optimizer': name, 'steps': n_steps},
+               measure(run, n_steps, setup=factory))
+
+
+def bench_import(quick):
+    """Import time of the main modules in a fresh interpreter."""
+    repeat = 1 if quick else 3
+    for module in IMPORT_MODULES:
+        times = [import_stats(module)[0] for _ in range(repeat)]
+        yield ({'module': module.rsplit('.', 1)[-1]},
+               {'best': min(times), 'median': statistics.median(times)})
+
+
+BENCHMARKS = {
+    'frontier_update': bench_frontier_update,
+    'economic_vector': bench_economic_vector,
+    'extract_data': bench_extract_data,
+    'optimizer_steps': bench_optimizer_steps,
+    'import': bench_import,
+}
+
+
+def result_key(result):
+    """Key identifying a benchmark case across runs."""
+    return (result['benchmark'],
+            tuple(sorted((name, str(value))
+                         for name, value in result['params'].items())))
+
+
+def run_benchmarks(names=None, quick=False):
+    """Run the selected benchmarks and return their results."""
+    results = []
+    for name in names or BENCHMARKS:
+        for params, timing in BENCHMARKS[name](quick):
+            results.append({'benchmark': name, 'params': params,
+                            'seconds_per_op': timing})
+    return results
+
+
+def compare(results, baseline, tolerance=0.25):
+    """Compare results to a baseline.
+
+    Returns the cases whose best time per operation is more than tolerance
+    slower than in the baseline, with the ratio of the two."""
+    baseline_times = {result_key(result): result['seconds_per_op']['best']
+                      for result in baseline}
+    regressions = []
+    for result in results:
+        reference = baseline_times.get(result_key(result))
+        if not reference:
+            continue
+        ratio = result['seconds_per_op']['best'] / reference
+        if ratio > 1 + tolerance:
+            regressions.append((result, float(np.round(ratio, 3))))
+    return regressions
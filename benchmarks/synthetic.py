@@ -0,0 +1,110 @@
+"""Synthetic data generators for the benchmarks."""
+import datetime
+from os.path import join
+
+import numpy as np
+import pandas as pd
+
+from help_project.src.economic_model.models import basic_lockdown_model
+from help_project.src.optimization import lockdown_config
+from help_project.src.optimization import loss_function
+
+
+def pareto_losses(n_points, n_objectives, seed=0):
+    """Mutually non-dominated losses, in random order.
+
+    The points lie on the simplex where the objectives sum to 1, so none of
+    them dominates another and the frontier grows with every update."""
+    rng = np.random.RandomState(seed)
+    return [tuple(row) for row in rng.dirichlet(np.ones(n_objectives),
+                                                n_points)]
+
+
+def random_losses(n_points, n_objectives, seed=0):
+    """Uniformly random losses, most of which end up dominated."""
+    rng = np.random.RandomState(seed)
+    return [tuple(row) for row in rng.random_sample((n_points, n_objectives))]
+
+
+class SyntheticGVA():
+    """Stand-in for BaseGVA with a random sector mapping."""
+
+    def __init__(self, n_sectors, n_lockdown_sectors, seed=0):
+        rng = np.random.RandomState(seed)
+        self.sectors = ['sector_%d' % i for i in range(n_sectors)]
+        self.lockdown_sectors = ['lockdown_%d' % i
+                                 for i in range(n_lockdown_sectors)]
+        self.gvas = dict(zip(self.sectors,
+                             rng.uniform(1e5, 1e6, n_sectors).tolist()))
+        self.mapping = pd.DataFrame({
+            'lockdown_sector': self.lockdown_sectors,
+            'sector': rng.choice(self.sectors, n_lockdown_sectors),
+        })
+
+    def get_gvas(self):
+        """Return the base GVA of each sector."""
+        return self.gvas
+
+    def get_sector_mapping(self):
+        """Return the mapping from lockdown sectors to sectors."""
+        return self.mapping
+
+
+def sector_mapping(n_sectors, n_lockdown_sectors, seed=0):
+    """SectorMapping built from a SyntheticGVA."""
+    return basic_lockdown_model.SectorMapping(
+        SyntheticGVA(n_sectors, n_lockdown_sectors, seed))
+
+
+def lockdown_vectors(mapping, n_vectors, seed=0):
+    """Random lockdown vectors as dicts over the mapping's lockdown sectors."""
+    rng = np.random.RandomState(seed)
+    return [dict(zip(mapping.lockdown_sectors, row))
+            for row in rng.random_sample(
+                (n_vectors, len(mapping.lockdown_sectors)))]
+
+
+def write_strategy_files(folder, n_strategies, n_days, n_focus_areas,
+                         n_breakpoints, seed=0):
+    """Write exit strategy CSV files in the format read by DataELT."""
+    rng = np.random.RandomState(seed)
+    start_date = datetime.date(2020, 2, 29)
+    focus_areas = ['focus_%d' % i for i in range(n_focus_areas)]
+    for i in range(n_strategies):
+        days = np.sort(rng.choice(np.arange(1, n_days), n_breakpoints - 1,
+                                  replace=False)).tolist() + [n_days]
+        columns = [(start_date + datetime.timedelta(days=day)).strftime(
+            '%Y_%m_%d') for day in days]
+        strat_df = pd.DataFrame(
+            rng.random_sample((n_focus_areas, n_breakpoints)).round(2),
+            columns=columns)
+        strat_df.insert(0, 'focus_area', focus_areas)
+        strat_df.to_csv(join(folder, 'strategy_%d.csv' % i), index=False)
+
+
+def config(n_options, n_ranges, n_values=3):
+    """LockdownConfig with the given number of Options and Range parameters."""
+    kwargs = {'option_%d' % i: lockdown_config.Options(list(range(n_values)))
+              for i in range(n_options)}
+    kwargs.update(('range_%d' % i, lockdown_config.Range(0, 1))
+                  for i in range(n_ranges))
+    return lockdown_config.LockdownConfig(**kwargs)
+
+
+class SumModel():
+    """Cheap model summing the numeric parameters of a policy."""
+
+    def __init__(self, sign=1):
+        self.sign = sign
+
+    def run(self, policy):
+        """Return the signed sum of the parameters."""
+        return self.sign * sum(policy.values())
+
+
+class MultiLoss(loss_function.LossFunction):
+    """Two objective loss made of the health and economic outputs."""
+
+    def compute(self, health_output, economic_output):
+        """Return both outputs as the objectives."""
+        return (health_output, economic_output)
@@ -0,0 +1,149 @@
+'''
+Columnar store of the daily case data, indexed by country and date.
+'''
+import os
+from os.path import dirname, join, realpath
+import tempfile
+import threading
+
+import numpy as np
+
+from help_project.src import lazy_import
+
+DATA_PATH = join(dirname(realpath(__file__)), 'data', 'full_data.csv')
+COLUMNS = ('new_cases', 'new_deaths', 'total_cases', 'total_deaths')
+
+_STORE = None
+_LOCK = threading.Lock()
+
+
+class CaseStore():
+    """ Case data sorted by country and date, one array per column.
+
+    The rows of each country are contiguous, so a country lookup is a dict
+    access followed by a slice, and date ranges within a country are found
+    by binary search. """
+
+    def __init__(self, locations, offsets, dates, columns):
+        self.locations = locations
+        self.offsets = offsets
+        self.dates = dates
+        self.columns = columns
+        self._location_index = {location: i
+                                for i, location in enumerate(locations.tolist())}
+
+    @classmethod
+    def from_csv(cls, path=DATA_PATH):
+        """ Parse the case data CSV """
+        pd = lazy_import.pandas()
+        cases_df = pd.read_csv(path)
+        cases_df = cases_df.sort_values(['location', 'date'], kind='stable')
+        locations, starts = np.unique(cases_df['location'].to_numpy(dtype=str),
+                                      return_index=True)
+        offsets = np.append(starts, len(cases_df)).astype(np.int64)
+        dates = cases_df['date'].to_numpy(dtype='datetime64[D]')
+        columns = {name: cases_df[name].to_numpy() for name in COLUMNS}
+        return cls(locations, offsets, dates, columns)
+
+    @classmethod
+    def open(cls, path=DATA_PATH, cache_dir=None):
+        """ Load the store from cache_dir, memory-mapped, if it was built
+        from the current version of the CSV, otherwise parse the CSV and
+        save the store to cache_dir so other processes can map it """
+        if cache_dir is None:
+            return cls.from_csv(path)
+        signature = _source_signature(path)
+        try:
+            if np.array_equal(np.load(join(cache_dir, 'source.npy')), signature):
+                return cls.load(cache_dir)
+        except (OSError, ValueError):
+            pass
+        store = cls.from_csv(path)
+        try:
+            store.save(cache_dir)
+            _save_array(join(cache_dir, 'source.npy'), signature)
+        except OSError:
+            pass  # e.g. a read-only cache directory, the parsed store works
+        return store
+
+    def save(self, directory):
+        """ Write the arrays as .npy files into a directory
+
+        Each file is written under a temporary name and then renamed, so
+        processes that have the previous files memory-mapped keep reading
+        them unchanged """
+        os.makedirs(directory, exist_ok=True)
+        arrays = dict(self.columns, locations=self.locations,
+                      offsets=self.offsets, dates=self.dates)
+        for name, array in arrays.items():
+            _save_array(join(directory, name + '.npy'), array)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """ Load arrays written by save, memory-mapped by default """
+        def load(name):
+            return np.load(join(directory, name + '.npy'), mmap_mode=mmap_mode)
+        return cls(np.load(join(directory, 'locations.npy')), load('offsets'),
+                   load('dates'), {name: load(name) for name in COLUMNS})
+
+    def __contains__(self, country):
+        return country in self._location_index
+
+    def _rows(self, country, start=None, end=None):
+        """ Slice of the rows of a country between two dates (inclusive) """
+        i = self._location_index[country]
+        first, last = int(self.offsets[i]), int(self.offsets[i + 1])
+        dates = self.dates[first:last]
+        if start is not None:
+            first += int(np.searchsorted(dates, np.datetime64(start, 'D'), side='left'))
+        if end is not None:
+            last = int(self.offsets[i]) + int(
+                np.searchsorted(dates, np.datetime64(end, 'D'), side='right'))
+        return slice(first, max(first, last))
+
+    def query(self, country, start=None, end=None):
+        """ Return the dates and columns of a country between two dates """
+        rows = self._rows(country, start, end)
+        result = {'date': self.dates[rows]}
+        result.update((name, column[rows]) for name, column in self.columns.items())
+        return result
+
+    def query_many(self, countries, start=None, end=None):
+        """ Return query results for several countries at once """
+        return {country: self.query(country, start, end) for country in countries}
+
+
+def _save_array(path, array):
+    """ Atomically replace the .npy file at path with the array """
+    tmp_file = tempfile.NamedTemporaryFile(dir=dirname(path), suffix='.npy',
+                                           delete=False)
+    try:
+        with tmp_file:
+            np.save(tmp_file, array)
+        os.replace(tmp_file.name, path)
+    except BaseException:
+        os.remove(tmp_file.name)
+        raise
+
+
+def _source_signature(path):
+    """ Modification time and size of the source file """
+    stat = os.stat(path)
+    return np.array([stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+
+
+def get_store(cache_dir=None):
+    """ Return the case store shared by the whole process """
+    global _STORE  # pylint: disable=global-statement
+    with _LOCK:
+        if _STORE is None:
+            _STORE = CaseStore.open(cache_dir=cache_dir)
+        return _STORE
+
+
+def set_store(store):
+    """ Make a store, e.g. one attached to shared memory, the one shared by
+    the whole process """
+    global _STORE  # pylint: disable=global-statement
+    with _LOCK:
+        _STORE = store
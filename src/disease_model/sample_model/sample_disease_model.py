@@ -2,11 +2,21 @@
 This file is simply a placeholder used to set up the repository, the interfaces etc
 are not indicative of the actual models to be built.
 '''
-import pandas as pd
+import numpy as np
+
+from help_project.src import lazy_import
+from help_project.src.disease_model import case_store
 
 
 def get_cases(country):
     """ Sample function to get the number of cases for a country """
-    cases_df = pd.read_csv('data/full_data.csv')
-    cases_df = cases_df[cases_df['location'] == country]
-    return cases_df[['date', 'location', 'total_cases']]
+    pd = lazy_import.pandas()
+    store = case_store.get_store()
+    if country not in store:
+        return pd.DataFrame(columns=['date', 'location', 'total_cases'])
+    cases = store.query(country)
+    return pd.DataFrame({
+        'date': np.datetime_as_string(cases['date']),
+        'location': country,
+        'total_cases': cases['total_cases'],
+    })
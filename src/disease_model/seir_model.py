@@ -0,0 +1,188 @@
+'''
+SEIR model simulating many exit strategies at once.
+'''
+import numpy as np
+
+from help_project.src.disease_model import case_store
+from help_project.src.exitstrategies import strategy_store as strategy_store_lib
+
+COMPARTMENTS = ('susceptible', 'exposed', 'infectious', 'recovered')
+START_DATE = '2020-02-29'  # Day 0 of the exit strategy timelines, see DataELT
+
+
+# The epidemiological parameters are independent and kept on the model.
+class SEIRModel():  # pylint: disable=too-many-instance-attributes
+    """ Deterministic SEIR model stepped daily for a batch of policies.
+
+    The state of all policies is a policies x compartments array. The
+    transmission rate of each policy on each day is scaled by how open the
+    focus areas are, from min_contact when everything is closed (level 0) to
+    beta when everything is open (level 1). NaN levels are ignored, and days
+    without any level count as fully open.
+
+    Policies are either {'strategy': id} for a strategy of the StrategyStore,
+    or a mapping of focus areas to constant levels. Timelines shorter than
+    n_days keep their last levels. A fidelity below 1 only simulates that
+    fraction of the n_days, e.g. for multi-fidelity optimizers. """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, population, beta=0.5, incubation_days=5.2,
+            infectious_days=2.9, initial_state=None, min_contact=0.2,
+            focus_weights=None, n_days=120, strategy_store=None):
+        self.population = float(population)
+        self.beta = beta
+        self.incubation_days = incubation_days
+        self.infectious_days = infectious_days
+        if initial_state is None:
+            initial_state = (self.population - 1, 0, 1, 0)
+        self.initial_state = np.asarray(initial_state, dtype=float)
+        self.min_contact = min_contact
+        self.focus_weights = focus_weights or {}
+        self.n_days = n_days
+        self._strategy_store = strategy_store
+
+    @classmethod
+    def calibrate(  # pylint: disable=too-many-arguments
+            cls, country, population, store=None, start_date=START_DATE,
+            min_cases=100, fit_days=21, **kwargs):
+        """ Fit beta to the growth of the cases of a country and start from
+        its cases on start_date
+
+        The growth rate r is fitted to the log of the total cases over the
+        first fit_days days with at least min_cases cases, and beta follows
+        from R0 = (1 + r * incubation) * (1 + r * infectious). The initial
+        state is seeded by seed_from_cases. """
+        store = store or case_store.get_store()
+        if country not in store:
+            raise KeyError('No case data for %s' % country)
+        cases = store.query(country)
+        model = cls(population, **kwargs)
+
+        growth = _growth_rate(cases, min_cases, fit_days)
+        if growth is None:
+            raise ValueError('Not enough cases to calibrate %s' % country)
+        model.beta = ((1 + growth * model.incubation_days) *
+                      (1 + growth * model.infectious_days) / model.infectious_days)
+        model.seed_from_cases(cases, start_date)
+        return model
+
+    def seed_from_cases(self, cases, start_date=START_DATE):
+        """ Start from the cases (a case store query) on start_date
+
+        People who became cases within the last infectious period are
+        infectious, the earlier cases have recovered, and the exposed are in
+        proportion to the infectious. """
+        total = np.asarray(cases['total_cases'], dtype=float)
+        start = np.datetime64(start_date, 'D')
+        before = cases['date'] <= start
+        recent = before & (cases['date'] > start - np.timedelta64(
+            int(round(self.infectious_days)), 'D'))
+        infectious = max(float(np.sum(cases['new_cases'][recent])), 1.)
+        exposed = infectious * self.incubation_days / self.infectious_days
+        recovered = max(float(total[before][-1]) - infectious, 0.) if before.any() else 0.
+        self.initial_state = np.array([
+            self.population - exposed - infectious - recovered,
+            exposed, infectious, recovered])
+
+    @property
+    def strategy_store(self):
+        """ The store the strategy timelines are taken from """
+        if self._strategy_store is None:
+            self._strategy_store = strategy_store_lib.get_store()
+        return self._strategy_store
+
+    def openness(self, policies):
+        """ Return the policies x days x focus areas levels of the policies
+        and the names of the focus areas """
+        focus_areas = self.strategy_store.focus_areas
+        strategies = [policy['strategy'] for policy in policies
+                      if 'strategy' in policy]
+        if len(strategies) == len(policies):
+            return self.strategy_store.get(strategies=strategies), focus_areas
+
+        levels = np.full((len(policies), self.n_days, len(focus_areas)), np.nan)
+        for i, policy in enumerate(policies):
+            if 'strategy' in policy:
+                levels[i] = self._fit_days(
+                    self.strategy_store.get(strategies=[policy['strategy']]))[0]
+            else:
+                levels[i] = [policy.get(focus_area, np.nan)
+                             for focus_area in focus_areas]
+        return levels, focus_areas
+
+    def contact(self, levels, focus_areas):
+        """ Turn policies x days x focus areas levels into policies x days
+        transmission multipliers """
+        weights = np.array([self.focus_weights.get(focus_area, 1.)
+                            for focus_area in focus_areas])
+        present = ~np.isnan(levels)
+        totals = np.where(present, levels, 0) @ weights
+        counts = present.astype(float) @ weights
+        with np.errstate(invalid='ignore', divide='ignore'):
+            openness = np.where(counts > 0, totals / counts, 1.)
+        return self.min_contact + (1 - self.min_contact) * openness
+
+    def simulate(self, contact, n_days=None):
+        """ Step the model over the policies x days contact multipliers and
+        return the policies x days + 1 x compartments trajectories """
+        contact = self._fit_days(np.asarray(contact, dtype=float), n_days)
+        rates = self.beta * contact / self.population
+        n_policies, n_days = rates.shape
+        trajectories = np.empty((n_policies, n_days + 1, len(COMPARTMENTS)))
+        trajectories[:, 0] = self.initial_state
+        for day in range(n_days):
+            trajectories[:, day + 1] = self._step(trajectories[:, day],
+                                                  rates[:, day])
+        return trajectories
+
+    def _step(self, state, rates):
+        """ Return the policies x compartments state one day after state,
+        with the given transmission rate of each policy """
+        susceptible, exposed, infectious, recovered = state.T
+        infections = np.minimum(rates * susceptible * infectious, susceptible)
+        onsets = 1. / self.incubation_days * exposed
+        recoveries = 1. / self.infectious_days * infectious
+        return np.stack([susceptible - infections,
+                         exposed + (infections - onsets),
+                         infectious + (onsets - recoveries),
+                         recovered + recoveries], axis=1)
+
+    def run_batch(self, policies, fidelity=None):
+        """ Return the number of infections over n_days for each policy
+
+        policies is either a list of policies or a policies x days x focus
+        areas array of levels, in the focus areas of the strategy store """
+        if isinstance(policies, np.ndarray):
+            levels, focus_areas = policies, self.strategy_store.focus_areas
+        else:
+            levels, focus_areas = self.openness(policies)
+        n_days = None
+        if fidelity is not None:
+            n_days = max(int(round(self.n_days * fidelity)), 1)
+        trajectories = self.simulate(self.contact(levels, focus_areas), n_days)
+        return trajectories[:, 0, 0] - trajectories[:, -1, 0]
+
+    def run(self, policy, fidelity=None):
+        """ Return the number of infections over n_days for a policy """
+        return float(self.run_batch([policy], fidelity)[0])
+
+    def _fit_days(self, timeline, n_days=None):
+        """ Cut or pad the day axis (axis 1) to n_days """
+        n_days = n_days or self.n_days
+        if timeline.shape[1] >= n_days:
+            return timeline[:, :n_days]
+        if timeline.shape[1] == 0:
+            return np.ones(timeline.shape[:1] + (n_days,) + timeline.shape[2:])
+        padding = np.repeat(timeline[:, -1:], n_days - timeline.shape[1], axis=1)
+        return np.concatenate([timeline, padding], axis=1)
+
+
+def _growth_rate(cases, min_cases, fit_days):
+    """ Daily growth rate of the total cases over the first fit_days days
+    with at least min_cases cases, None if there are fewer than two """
+    total = np.asarray(cases['total_cases'], dtype=float)
+    window = np.flatnonzero(total >= min_cases)[:fit_days]
+    if len(window) < 2:
+        return None
+    days = (cases['date'][window] - cases['date'][window[0]]).astype(float)
+    return max(np.polyfit(days, np.log(total[window]), 1)[0], 0.)
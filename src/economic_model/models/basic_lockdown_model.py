@@ -1,8 +1,107 @@
 """
 This defines a very basic economic model, this is going to change in the future
 """
+import collections
+
 import numpy as np
 from help_project.src.economic_model.utils import gva_data
+from help_project.src.exitstrategies import strategy_store as strategy_store_lib
+
+DAYS_PER_YEAR = 365
+
+DailyImpact = collections.namedtuple(
+    'DailyImpact', ['gva', 'loss', 'cumulative_loss'])
+
+
+class SectorMapping():
+    """
+    Precomputed mapping from lockdown sectors to GVA sectors, stored as a
+    matrix counting how often each lockdown sector maps to each GVA sector
+    """
+    _default = None
+
+    def __init__(self, gva=None):
+        gva = gva or gva_data.BaseGVA()
+        sector_mappings = gva.get_sector_mapping().dropna()
+        baseline_gva = gva.get_gvas()
+
+        pairs = list(zip(sector_mappings['sector'],
+                         sector_mappings['lockdown_sector']))
+        self.sectors = [sector for sector in dict.fromkeys(
+            sector for sector, _ in pairs) if sector in baseline_gva]
+        self.lockdown_sectors = list(dict.fromkeys(
+            lockdown_sector for _, lockdown_sector in pairs))
+        self.baseline = np.array([baseline_gva[sector]
+                                  for sector in self.sectors], dtype=float)
+
+        sector_index = {sector: i for i, sector in enumerate(self.sectors)}
+        lockdown_index = {sector: i
+                          for i, sector in enumerate(self.lockdown_sectors)}
+        self.counts = np.zeros((len(self.sectors), len(self.lockdown_sectors)))
+        for sector, lockdown_sector in pairs:
+            if sector in sector_index:
+                self.counts[sector_index[sector],
+                            lockdown_index[lockdown_sector]] += 1
+        self._focus_area_counts = {}
+
+    @classmethod
+    def default(cls):
+        """
+        return the mapping built from the default GVA data, computed once
+        """
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def to_matrix(self, lockdown_vectors):
+        """
+        convert lockdown vector dicts to a matrix with one column per
+        lockdown sector, missing sectors are NaN
+        """
+        matrix = np.full((len(lockdown_vectors), len(self.lockdown_sectors)),
+                         np.nan)
+        for row, lockdown_vector in enumerate(lockdown_vectors):
+            for column, sector in enumerate(self.lockdown_sectors):
+                if sector in lockdown_vector:
+                    matrix[row, column] = lockdown_vector[sector]
+        return matrix
+
+    def focus_area_counts(self, focus_areas):
+        """
+        counts matrix with one column per focus area instead of per lockdown
+        sector, computed once per list of focus areas
+
+        names are compared without surrounding whitespace, and focus areas
+        that are not lockdown sectors get an empty column
+        """
+        key = tuple(focus_areas)
+        if key not in self._focus_area_counts:
+            lockdown_index = {sector.strip(): i for i, sector
+                              in enumerate(self.lockdown_sectors)}
+            columns = [lockdown_index.get(focus_area.strip(), -1)
+                       for focus_area in focus_areas]
+            padded = np.hstack([self.counts, np.zeros((len(self.sectors), 1))])
+            self._focus_area_counts[key] = padded[:, columns]
+        return self._focus_area_counts[key]
+
+    def adjust(self, lockdown_matrix, counts=None):
+        """
+        multiply the base GVAs by the mean lockdown value of the mapped
+        lockdown sectors, for an N x lockdown sectors matrix at once
+
+        NaN entries are ignored, and GVA sectors without any lockdown value
+        keep their base GVA. Leading dimensions are kept, so the input can
+        also be e.g. strategies x days x lockdown sectors. counts can replace
+        the lockdown sector counts, e.g. by focus_area_counts.
+        """
+        counts = self.counts if counts is None else counts
+        lockdown_matrix = np.asarray(lockdown_matrix, dtype=float)
+        present = ~np.isnan(lockdown_matrix)
+        totals = np.where(present, lockdown_matrix, 0) @ counts.T
+        counts = present.astype(float) @ counts.T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            factors = np.where(counts > 0, totals / counts, 1)
+        return self.baseline * factors
 
 
 class EconomicLockdownModel():
@@ -12,40 +111,85 @@ class EconomicLockdownModel():
     of a sector
     """
 
-    def __init__(self, country=None, lockdown_vector=None):
+    def __init__(self, country=None, lockdown_vector=None, sector_mapping=None,
+                 strategy_store=None):
         self.country = country
         self.lockdown_vector = lockdown_vector
+        self._sector_mapping = sector_mapping
+        self._strategy_store = strategy_store
+
+    @property
+    def sector_mapping(self):
+        """
+        the sector mapping, the default one is built on first use
+        """
+        if self._sector_mapping is None:
+            self._sector_mapping = SectorMapping.default()
+        return self._sector_mapping
+
+    @property
+    def strategy_store(self):
+        """
+        the store the strategy timelines of run are taken from
+        """
+        if self._strategy_store is None:
+            self._strategy_store = strategy_store_lib.get_store()
+        return self._strategy_store
 
     def get_economic_vector(self):
         """
         get the economic vector for a country
         """
-        # TODO
-        # use the lockdown vector while calculating new GVAs
-        # not using because of not sure of the structure right now
-        gva = gva_data.BaseGVA()
-        sector_mappings = gva.get_sector_mapping()
-        sector_mappings = sector_mappings.dropna()
-        mapping_dict = {}
-        for i in range(len(sector_mappings)):
-            if sector_mappings.iloc[i]['sector'] not in mapping_dict.keys():
-                mapping_dict[sector_mappings.iloc[i]['sector']] = \
-                    [sector_mappings.iloc[i]['lockdown_sector']]
-            else:
-                mapping_dict[sector_mappings.iloc[i]['sector']].append(
-                    sector_mappings.iloc[i]['lockdown_sector'])
+        adjusted_gva = self.get_economic_matrix(
+            self.sector_mapping.to_matrix([self.lockdown_vector]))[0]
+        return dict(zip(self.sector_mapping.sectors, adjusted_gva.tolist()))
 
-        baseline_gva = gva.get_gvas()
-        adjusted_gva = {}
-        for key in mapping_dict.keys():
-            if key not in baseline_gva.keys():
-                continue
-            weights = []
-            for sector in mapping_dict[key]:
-                if sector in self.lockdown_vector.keys():
-                    weights.append(self.lockdown_vector[sector])
-            if len(weights) > 0:
-                adjusted_gva[key] = baseline_gva[key] * np.mean(weights)
-            else:
-                adjusted_gva[key] = baseline_gva[key]
-        return adjusted_gva
+    def get_economic_matrix(self, lockdown_matrix):
+        """
+        get the adjusted GVAs for many lockdown vectors at once
+
+        lockdown_matrix has one row per lockdown vector and one column per
+        sector in sector_mapping.lockdown_sectors, the result has one column
+        per sector in sector_mapping.sectors
+        """
+        return self.sector_mapping.adjust(lockdown_matrix)
+
+    def get_daily_impact(self, timelines, focus_areas=None):
+        """
+        get the daily GVA and GVA loss of each sector over strategy timelines
+
+        timelines is a strategies x days x focus areas array of levels, such
+        as the tensor of the exit strategy store, with one column per entry
+        of focus_areas (sector_mapping.lockdown_sectors by default). The base
+        GVAs are yearly, so each day is compared to a 365th of them. All
+        results are strategies x days x sectors, and the cumulative loss sums
+        the daily loss over the days so far.
+        """
+        counts = None
+        if focus_areas is not None:
+            counts = self.sector_mapping.focus_area_counts(focus_areas)
+        daily_gva = self.sector_mapping.adjust(timelines, counts) / DAYS_PER_YEAR
+        daily_loss = self.sector_mapping.baseline / DAYS_PER_YEAR - daily_gva
+        return DailyImpact(daily_gva, daily_loss, np.cumsum(daily_loss, axis=-2))
+
+    def run_batch(self, policies, fidelity=None):
+        """
+        get the total GVA loss over the timeline of each {'strategy': id}
+        policy, the strategies are taken from the strategy store
+
+        a fidelity below 1 only covers that fraction of the days
+        """
+        store = self.strategy_store
+        timelines = store.get(
+            strategies=[policy['strategy'] for policy in policies])
+        if fidelity is not None:
+            timelines = timelines[
+                :, :max(int(round(timelines.shape[1] * fidelity)), 1)]
+        impact = self.get_daily_impact(timelines, store.focus_areas)
+        return impact.cumulative_loss[:, -1].sum(axis=-1)
+
+    def run(self, policy, fidelity=None):
+        """
+        get the total GVA loss over the timeline of a {'strategy': id} policy
+        """
+        return float(self.run_batch([policy], fidelity)[0])
@@ -2,22 +2,199 @@
 file to get the gva data for india
 """
 from os import path
-import pandas as pd
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from help_project.src import lazy_import
+
+DATA_DIR = path.join(path.dirname(path.realpath(__file__)), "..", "data")
+GVA_PATH = path.join(DATA_DIR, "gva_data.csv")
+MAPPING_PATH = path.join(DATA_DIR, "sector_mapping.csv")
+BINARY_PATH = path.join(DATA_DIR, "gva_data.npz")
+
+_LOCK = threading.Lock()
+_DATASET = None
+
+
+class GVADataset():
+    """
+    arrays holding the base GVAs and the sector mapping
+    """
+    def __init__(self, industries, values, lockdown_sectors, sectors):
+        self.industries = industries
+        self.values = values
+        self.lockdown_sectors = lockdown_sectors
+        # Lockdown sectors without a GVA sector are mapped to ''
+        self.sectors = sectors
+
+    @classmethod
+    def from_csv(cls, gva_path=GVA_PATH, mapping_path=MAPPING_PATH):
+        """
+        parse the GVA and sector mapping CSV files
+        """
+        pd = lazy_import.pandas()
+        gva_df = pd.read_csv(gva_path)
+        gva_df = gva_df.loc[~gva_df['2019'].isna()]
+        mapping_df = pd.read_csv(mapping_path)
+        return cls(
+            industries=gva_df["Industry"].to_numpy(dtype=str),
+            values=gva_df['2019'].to_numpy(dtype=float),
+            lockdown_sectors=mapping_df["lockdown_sector"].to_numpy(dtype=str),
+            sectors=mapping_df["sector"].fillna("").to_numpy(dtype=str),
+        )
+
+    @classmethod
+    def from_binary(cls, binary_path, sources):
+        """
+        load the arrays written by to_binary, returns None if the file is
+        missing or was built from different versions of the sources
+        """
+        try:
+            with np.load(binary_path) as arrays:
+                if not np.array_equal(arrays["sources"],
+                                      _source_signature(sources)):
+                    return None
+                return cls(arrays["industries"], arrays["values"],
+                           arrays["lockdown_sectors"], arrays["sectors"])
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def to_binary(self, binary_path, sources):
+        """
+        write the arrays together with the signature of the sources
+
+        the file is written under a unique temporary name and then renamed,
+        so processes building the cache at the same time do not mix their
+        files
+        """
+        tmp_file = tempfile.NamedTemporaryFile(
+            dir=path.dirname(binary_path) or ".", suffix=".npz", delete=False)
+        try:
+            with tmp_file:
+                np.savez(tmp_file, industries=self.industries,
+                         values=self.values,
+                         lockdown_sectors=self.lockdown_sectors,
+                         sectors=self.sectors,
+                         sources=_source_signature(sources))
+            os.replace(tmp_file.name, binary_path)
+        except BaseException:
+            os.remove(tmp_file.name)
+            raise
+
+    def gva_mapping(self):
+        """
+        return the base GVA of each industry as a dict
+        """
+        return dict(zip(self.industries.tolist(), self.values.tolist()))
+
+    def sector_mapping(self):
+        """
+        return the sector mapping as a dataframe, with NaN for missing sectors
+        """
+        pd = lazy_import.pandas()
+        return pd.DataFrame({
+            "lockdown_sector": self.lockdown_sectors.tolist(),
+            "sector": [sector or np.nan for sector in self.sectors.tolist()],
+        })
+
+
+def _source_signature(sources):
+    """
+    modification time and size of the source files
+    """
+    return np.array([[os.stat(source).st_mtime_ns, os.stat(source).st_size]
+                     for source in sources], dtype=np.int64)
+
+
+def get_dataset(binary_path=BINARY_PATH):
+    """
+    return the GVA dataset, loaded once per process and shared by all callers
+
+    the parsed CSVs are stored in a binary file that is used instead of the
+    CSVs as long as they don't change, pass binary_path=None to skip it
+    """
+    global _DATASET  # pylint: disable=global-statement
+    with _LOCK:
+        if _DATASET is None:
+            _DATASET = load_dataset(binary_path=binary_path)
+        return _DATASET
+
+
+def set_dataset(dataset):
+    """
+    make the given dataset, e.g. one attached to shared memory, the one
+    returned by get_dataset
+    """
+    global _DATASET  # pylint: disable=global-statement
+    with _LOCK:
+        _DATASET = dataset
+
+
+def clear_dataset():
+    """
+    forget the loaded dataset, the next call to get_dataset loads it again
+    """
+    global _DATASET  # pylint: disable=global-statement
+    with _LOCK:
+        _DATASET = None
+
+
+def load_dataset(gva_path=GVA_PATH, mapping_path=MAPPING_PATH,
+                 binary_path=BINARY_PATH):
+    """
+    load the dataset from the binary file, rebuilding it if needed
+    """
+    sources = (gva_path, mapping_path)
+    if binary_path is None:
+        return GVADataset.from_csv(gva_path, mapping_path)
+    dataset = GVADataset.from_binary(binary_path, sources)
+    if dataset is None:
+        dataset = GVADataset.from_csv(gva_path, mapping_path)
+        try:
+            dataset.to_binary(binary_path, sources)
+        except OSError:
+            pass  # e.g. a read-only install, the CSVs still work
+    return dataset
 
 
 class BaseGVA():
     """
-    class for Base GVA
+    class for Base GVA, the data is loaded on first use
     """
     def __init__(self):
-        dir_path = path.dirname(path.realpath(__file__))
-        gva_df = pd.read_csv(dir_path + "/../data/gva_data.csv")
-        gva_df = gva_df.loc[~gva_df['2019'].isna()]
-        gva_df = gva_df.set_index("Industry")
-        self.gva_mapping = gva_df['2019'].to_dict()
+        self._dataset = None
+        self._gva_mapping = None
+        self._sector_mapping = None
 
-        mapping_df = pd.read_csv(dir_path + "/../data/sector_mapping.csv")
-        self.sector_mapping = mapping_df
+    @property
+    def dataset(self):
+        """
+        the GVA dataset shared by the process
+        """
+        if self._dataset is None:
+            self._dataset = get_dataset()
+        return self._dataset
+
+    @property
+    def gva_mapping(self):
+        """
+        the base GVA of each industry
+        """
+        if self._gva_mapping is None:
+            self._gva_mapping = self.dataset.gva_mapping()
+        return self._gva_mapping
+
+    @property
+    def sector_mapping(self):
+        """
+        the mapping from our sectors to lockdown team's sectors, built lazily
+        """
+        if self._sector_mapping is None:
+            self._sector_mapping = self.dataset.sector_mapping()
+        return self._sector_mapping
 
     def get_gvas(self):
         """
@@ -30,4 +207,4 @@ class BaseGVA():
         """
         return the mapping from our sectors to lockdown team's sectors
         """
-        return self.sector_mapping
\ No newline at end of file
+        return self.sector_mapping
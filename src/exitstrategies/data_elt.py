@@ -5,73 +5,77 @@ Class for ELT of data files
 from os import listdir
 from os.path import dirname, join
 import datetime
-import pandas as pd
+import numpy as np
+
+from help_project.src import lazy_import
 
 
 class DataELT():
 
-    def __init__(self):
-        pass
+    def __init__(self, data_folder=None):
+        if data_folder is None:
+            project_root = dirname(dirname(__file__))
+            data_folder = join(join(project_root, "exitstrategies"), "data")
+        self.data_folder = data_folder
 
-    def extract_data(self):
-        strat_dict = {}
+    def extract_data(self, expand=True):
+        """Load all exit strategies as day x focus area dataframes.
 
-        # Get data folder and start_date
-        start_date = self.convert_to_date("2020_02_29")
-        project_root = dirname(dirname(__file__))
-        data_folder = join(join(project_root, "exitstrategies"), "data")
-        file_list = listdir(data_folder)
+        With expand=False the strategies are kept in their compact form, with
+        one row per day on which the levels change instead of one per day."""
+        strat_dict = {}
 
         # Fetch list of available strategies
-        for file_name in file_list:
-            if ".csv" in file_name:
-                # Load file
-                file_path = join(data_folder, file_name)
-                file_df = pd.read_csv(file_path, encoding="utf-8")
-
-                # Create list of dates
-                date_array = file_df.columns.values
-                date_list = [date_value for date_value in date_array if date_value != date_array[0]]
-                date_list.sort()
-
-                # Save dataframe to dict
-                ld_df = self.create_lockdown_df(file_df, date_list, start_date)
-                strat_df = ld_df.transpose()
-                strat_id = file_name.replace(".csv", "")
-                strat_dict[strat_id] = strat_df
+        for strat_id, file_path in self.list_files().items():
+            strat_dict[strat_id] = self.load_file(file_path, expand)
 
         return strat_dict
 
+    def list_files(self):
+        """Return the path of each strategy file, keyed by strategy id."""
+        return {file_name.replace(".csv", ""): join(self.data_folder, file_name)
+                for file_name in listdir(self.data_folder) if ".csv" in file_name}
+
+    def load_file(self, file_path, expand=True):
+        """Load a single exit strategy file."""
+        pd = lazy_import.pandas()
+        start_date = self.convert_to_date("2020_02_29")
+        file_df = pd.read_csv(file_path, encoding="utf-8")
+
+        # Create list of dates
+        date_array = file_df.columns.values
+        date_list = [date_value for date_value in date_array if date_value != date_array[0]]
+        date_list.sort()
+
+        ld_df = self.create_lockdown_df(file_df, date_list, start_date, expand)
+        return ld_df.transpose()
+
     def convert_to_date(self, date_str):
         date_items = date_str.split("_")
         date_value = datetime.datetime(int(date_items[0]), int(date_items[1]), int(date_items[2]))
         return date_value
 
-    def create_lockdown_df(self, file_df, date_list, start_date):
-        # Create base dataframe
-        ld_df = file_df.drop(date_list, axis=1)
-        day0_values = [1] * ld_df.shape[0]
-        prev_date = start_date
-
-        for date_str in date_list:
-            # Perform date calcs
-            impl_date = self.convert_to_date(date_str)
-            day_count_since_prev = (impl_date - prev_date).days
-            day_count_till_prev = (prev_date - start_date).days
-
-            # Update dataframe with same column for previous lockdown period
-            for i in range(day_count_since_prev):
-                if day_count_till_prev == 0:
-                    ld_df[str(day_count_till_prev + i)] = day0_values
-                else:
-                    ld_df[str(day_count_till_prev + i)] = file_df[prev_date_str]
-
-            # Update prev_date
-            prev_date = impl_date
-            prev_date_str = date_str
-
-        # Update index as column names to prevent wrong index in subsequent transpose operation (see extract_data())
-        ld_cols = ld_df.columns.values
-        ld_df.set_index(ld_cols[0], inplace=True)
+    def create_lockdown_df(self, file_df, date_list, start_date, expand=True):
+        pd = lazy_import.pandas()
+        # Days since start_date at which each implementation date takes effect
+        breakpoints = np.array([(self.convert_to_date(date_str) - start_date).days for date_str in date_list])
+
+        # Before the first implementation date everything is open (level 1)
+        levels = np.ones((file_df.shape[0], len(date_list) + 1))
+        levels[:, 1:] = file_df[date_list].to_numpy(dtype=float)
+        focus_areas = file_df[file_df.columns.values[0]]
+
+        if not expand:
+            # Compact run-length form: one column per day the levels change
+            ld_df = pd.DataFrame(levels, columns=np.concatenate([[0], breakpoints]))
+        else:
+            # Expand to one column per day up to the last implementation date,
+            # picking for each day the levels of the latest breakpoint before it
+            days = np.arange(breakpoints[-1] if len(breakpoints) else 0)
+            segments = np.searchsorted(breakpoints, days, side="right")
+            ld_df = pd.DataFrame(levels[:, segments], columns=[str(day) for day in days])
+
+        # Index by focus area to get the right columns in the subsequent transpose operation (see extract_data())
+        ld_df.index = pd.Index(focus_areas.to_numpy(), name=focus_areas.name)
 
         return ld_df
@@ -2,7 +2,7 @@
 Interface class to be used by other modules
 """
 
-from help_project.src.exitstrategies.data_elt import DataELT
+from help_project.src.exitstrategies import strategy_store
 
 
 class ExitStrategies():
@@ -18,11 +18,23 @@ class ExitStrategies():
     def __init__(self):
         pass
 
-    def get_exit_strategies(self):
-        data_elt = DataELT()
-        exit_strategies = data_elt.extract_data()
-        # TODO: parameterize start_date, end_date, start_day (numerical day since day 1), end_day, format (df/array/map)
-        return exit_strategies
+    def get_exit_strategies(self, start_day=0, end_day=None, strategies=None, output_format="df"):
+        """Return the exit strategies between start_day and end_day.
+
+        output_format is one of "df" (dict of day x focus area dataframes),
+        "map" (dict of day x focus area arrays) or "array" (a single
+        strategies x days x focus areas array, see StrategyStore)."""
+        # TODO: parameterize start_date, end_date
+        store = strategy_store.get_store()
+        store.refresh()
+        if output_format == "df":
+            return store.get_frames(start_day, end_day, strategies)
+        if output_format == "array":
+            return store.get(start_day, end_day, strategies)
+        if output_format == "map":
+            return {strat_id: store.get(start_day, end_day, [strat_id])[0]
+                    for strat_id in strategies or store.names}
+        raise ValueError("Unknown output format: %s" % output_format)
 
     def get_focus_areas(self):
         focus_areas = self.focus_areas_eco.extend(self.focus_areas_soc)
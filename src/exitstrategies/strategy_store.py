@@ -0,0 +1,170 @@
+"""
+Store exposing all exit strategies as a single array
+"""
+
+from os import stat
+import threading
+import numpy as np
+
+from help_project.src import lazy_import
+from help_project.src.exitstrategies.data_elt import DataELT
+
+
+class StrategyStore():
+    """Exit strategies loaded once into a strategies x days x focus areas array.
+
+    Strategies are sorted by id and focus areas are kept in the order they
+    are first seen. Strategies shorter than the longest one keep the levels of
+    their last implementation date, and focus areas missing from a strategy
+    file are NaN. refresh() only parses the files that changed on disk, and
+    does nothing for stores that are not refreshable (see from_arrays)."""
+
+    def __init__(self, data_folder=None, load=True):
+        self.data_elt = DataELT(data_folder)
+        self.names = []
+        self.focus_areas = []
+        self.tensor = np.empty((0, 0, 0))
+        self.n_days = {}
+        # Modification time and compact frame of each loaded strategy file,
+        # None for stores that are not refreshable.
+        self._files = {}
+        self._lock = threading.Lock()
+        if load:
+            self.refresh()
+
+    @classmethod
+    def from_arrays(cls, names, focus_areas, tensor, n_days, data_folder=None):
+        """Create a store around an existing tensor, without reading files.
+
+        The tensor is used as is (e.g. a view of shared memory). The store
+        is not refreshable unless refreshable is set to True, in which case
+        the next refresh() reloads all the files into a new tensor."""
+        store = cls(data_folder, load=False)
+        store._files = None
+        store.names = list(names)
+        store.focus_areas = list(focus_areas)
+        store.tensor = tensor
+        store.n_days = dict(zip(store.names, n_days))
+        return store
+
+    @property
+    def refreshable(self):
+        """Whether refresh() reads the strategy files."""
+        return self._files is not None
+
+    @refreshable.setter
+    def refreshable(self, refreshable):
+        if not refreshable:
+            self._files = None
+        elif self._files is None:
+            self._files = {}
+
+    @property
+    def days(self):
+        """Day index of the tensor, in days since the start date."""
+        return np.arange(self.tensor.shape[1])
+
+    def refresh(self):
+        """Reload the strategy files that were added, changed or removed.
+
+        Returns the ids of the strategies that were (re)loaded."""
+        if not self.refreshable:
+            return []
+        with self._lock:
+            files = self.data_elt.list_files()
+            reloaded = []
+            for strat_id, file_path in files.items():
+                mtime = stat(file_path).st_mtime_ns
+                known = self._files.get(strat_id)
+                if known is None or known[0] != mtime:
+                    self._files[strat_id] = (mtime, self.data_elt.load_file(file_path, expand=False))
+                    reloaded.append(strat_id)
+            removed = [strat_id for strat_id in self._files if strat_id not in files]
+            for strat_id in removed:
+                del self._files[strat_id]
+
+            if reloaded or removed:
+                self._build()
+            return reloaded
+
+    def _build(self):
+        """Expand the compact strategies into the dense tensor."""
+        self.names = sorted(self._files)
+        compact_dfs = [self._files[strat_id][1] for strat_id in self.names]
+        self.focus_areas = list(dict.fromkeys(
+            focus_area for compact_df in compact_dfs for focus_area in compact_df.columns))
+        # The expanded form of a strategy ends at its last implementation date
+        self.n_days = {strat_id: int(compact_df.index[-1])
+                       for strat_id, compact_df in zip(self.names, compact_dfs)}
+        days = np.arange(max(self.n_days.values(), default=0))
+
+        tensor = np.full((len(self.names), len(days), len(self.focus_areas)), np.nan)
+        for i, compact_df in enumerate(compact_dfs):
+            rows = np.searchsorted(compact_df.index.to_numpy(), days, side="right") - 1
+            columns = [self.focus_areas.index(focus_area) for focus_area in compact_df.columns]
+            tensor[i][:, columns] = compact_df.to_numpy()[rows]
+        self.tensor = tensor
+
+    def strategy_indices(self, strategies=None):
+        """Return a slice or index array selecting the given strategy ids.
+
+        Consecutive strategies give a slice, so that indexing stays a view."""
+        if strategies is None:
+            return slice(None)
+        indices = [self.names.index(strat_id) for strat_id in strategies]
+        if indices and indices == list(range(indices[0], indices[-1] + 1)):
+            return slice(indices[0], indices[-1] + 1)
+        return np.array(indices, dtype=int)
+
+    def get(self, start_day=0, end_day=None, strategies=None):
+        """Return the strategies x days x focus areas levels.
+
+        Day ranges and consecutive strategy subsets are views into the
+        tensor, other strategy subsets are copies."""
+        return self.tensor[self.strategy_indices(strategies), start_day:end_day]
+
+    def get_frames(self, start_day=0, end_day=None, strategies=None):
+        """Return a day x focus area dataframe for each strategy."""
+        pd = lazy_import.pandas()
+        strat_dict = {}
+        for strat_id in strategies or self.names:
+            i = self.names.index(strat_id)
+            columns = self._columns(strat_id)
+            stop = self.n_days[strat_id] if end_day is None else min(end_day, self.n_days[strat_id])
+            days = np.arange(start_day, max(stop, start_day))
+            strat_dict[strat_id] = pd.DataFrame(
+                self.tensor[i, days][:, columns],
+                index=[str(day) for day in days],
+                columns=[self.focus_areas[column] for column in columns])
+        return strat_dict
+
+    def _columns(self, strat_id):
+        """Return the indices of the focus areas set by a strategy.
+
+        Stores built from arrays have no files, the focus areas are then
+        those with any level in the tensor."""
+        if self.refreshable and strat_id in self._files:
+            return [self.focus_areas.index(focus_area)
+                    for focus_area in self._files[strat_id][1].columns]
+        levels = self.tensor[self.names.index(strat_id)]
+        return np.flatnonzero(~np.all(np.isnan(levels), axis=0)).tolist()
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store():
+    """Return the process-wide store for the default data folder."""
+    global _STORE  # pylint: disable=global-statement
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = StrategyStore()
+        return _STORE
+
+
+def set_store(store):
+    """Make the given store the process-wide store."""
+    global _STORE  # pylint: disable=global-statement
+    with _STORE_LOCK:
+        _STORE = store
@@ -0,0 +1,10 @@
+"""Imports of heavy dependencies that are deferred to their first use."""
+
+
+def pandas():
+    """Import and return pandas.
+
+    Importing it on first use keeps the import of the models and of the
+    optimization package fast (see benchmarks.suite.IMPORT_MODULES)."""
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+    return pd
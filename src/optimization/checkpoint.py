@@ -0,0 +1,73 @@
+"""Module for checkpointing optimization runs."""
+import os
+import pickle
+
+
+class Checkpoint():
+    """Append-only log of an optimization run.
+
+    The log is a sequence of pickled records: one per evaluated policy and,
+    every `every` steps, one with the optimizer state and the policies in
+    flight at that point. Records are flushed as they are written, and a
+    record cut short by a crash is ignored when the log is loaded, then cut
+    off before new records are appended."""
+
+    def __init__(self, path, every=100):
+        self.path = path
+        self.every = every
+        self._file = None
+        # Size of the readable part of the log, found by load.
+        self._valid_size = None
+
+    def load(self):
+        """Read the log.
+
+        Returns the (policy, loss) pairs of all logged evaluations and the
+        last saved state, or None if no state was saved yet."""
+        evaluations = []
+        state = None
+        self._valid_size = 0
+        if not os.path.exists(self.path):
+            return evaluations, state
+
+        with open(self.path, 'rb') as log_file:
+            while True:
+                try:
+                    record = pickle.load(log_file)
+                except (EOFError, pickle.UnpicklingError):
+                    break
+                self._valid_size = log_file.tell()
+                if record[0] == 'evaluation':
+                    evaluations.append(record[1:])
+                elif record[0] == 'state':
+                    state = record[1]
+        return evaluations, state
+
+    def log_evaluation(self, policy, loss):
+        """Append an evaluated policy to the log."""
+        self._append(('evaluation', policy, loss))
+
+    def log_state(self, step, optimizer_state, in_flight):
+        """Append the optimizer state after the given step to the log."""
+        self._append(('state', {
+            'step': step,
+            'optimizer': optimizer_state,
+            'in_flight': in_flight,
+        }))
+
+    def close(self):
+        """Close the log file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _append(self, record):
+        """Write a record to the end of the log."""
+        if self._file is None:
+            if self._valid_size is None:
+                self.load()
+            self._file = open(self.path, 'ab')
+            if self._file.tell() > self._valid_size:
+                self._file.truncate(self._valid_size)
+        pickle.dump(record, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.flush()
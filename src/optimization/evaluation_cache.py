@@ -0,0 +1,96 @@
+"""Module containing a cache for health and economic model evaluations."""
+import collections
+import os
+import pickle
+import tempfile
+
+from help_project.src.optimization import lockdown_config
+
+
+class EvaluationCache():
+    """LRU cache of model outputs, keyed on the evaluated policy.
+
+    The cache keeps at most maxsize entries (unbounded if None), evicting the
+    least recently used ones first. If a path is given, previously saved
+    entries are loaded from it, and save() writes the cache back so repeated
+    sweeps and restarted jobs can skip evaluations that were already done."""
+
+    def __init__(self, maxsize=1024, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, policy):
+        return lockdown_config.canonical_key(policy) in self._entries
+
+    def get(self, policy, default=None):
+        """Return the cached value for a policy, counting hits and misses."""
+        key = lockdown_config.canonical_key(policy)
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, policy, value):
+        """Store the value for a policy, evicting old entries if needed."""
+        key = lockdown_config.canonical_key(policy)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def stats(self):
+        """Return the hit and miss counters of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def load(self, path=None):
+        """Load entries previously written by save()."""
+        with open(path or self.path, 'rb') as cache_file:
+            entries = pickle.load(cache_file)
+        for key, value in entries:
+            self._entries[key] = value
+        self._evict()
+
+    def save(self, path=None):
+        """Write the cache entries to disk.
+
+        The file is written under a unique temporary name next to its
+        destination and then moved into place, so an interrupted save never
+        leaves a corrupt cache behind and jobs saving to the same path do not
+        mix their files."""
+        path = path or self.path
+        if path is None:
+            raise ValueError('No path given to save the cache to.')
+        tmp_file = tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(path) or '.', suffix='.tmp', delete=False)
+        try:
+            with tmp_file:
+                pickle.dump(list(self._entries.items()), tmp_file,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file.name, path)
+        except BaseException:
+            os.remove(tmp_file.name)
+            raise
+
+    def _evict(self):
+        """Drop the least recently used entries above maxsize."""
+        if self.maxsize is None:
+            return
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
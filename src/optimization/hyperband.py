@@ -0,0 +1,124 @@
+"""Module containing multi-fidelity successive halving optimizers."""
+import collections
+import math
+import random
+
+import numpy as np
+
+from help_project.src.optimization import lockdown_config
+from help_project.src.optimization import nsga
+from help_project.src.optimization import optimizer
+
+
+def rank_losses(losses):
+    """Return the order of the losses from best to worst.
+
+    Multi objective losses are ordered by pareto front, then by decreasing
+    crowding distance within a front, as in NSGA-II."""
+    losses = np.array([np.ravel(np.asarray(loss, dtype=float))
+                       for loss in losses])
+    ranks = nsga.non_dominated_sort(losses)
+    crowding = nsga.crowding_distance(losses, ranks)
+    return np.lexsort((-crowding, ranks))
+
+
+class _Rung():
+    """Policies of the current rung of a bracket, and their losses."""
+
+    def __init__(self, policies=(), index=0, n_rungs=0):
+        self.index = index
+        self.n_rungs = n_rungs
+        self.queue = collections.deque(policies)
+        self.results = []
+        self.outstanding = 0
+
+    def take(self):
+        """Return the next policy to evaluate."""
+        self.outstanding += 1
+        return self.queue.popleft()
+
+    def record(self, proposal, loss):
+        """Record the loss of a policy taken from the rung."""
+        self.outstanding -= 1
+        self.results.append((proposal, loss))
+
+
+class SuccessiveHalving(optimizer.Optimizer):
+    """Optimizer running cheap, low fidelity evaluations first.
+
+    Each bracket samples n_policies policies from the config and evaluates
+    them at min_fidelity. The best 1 / eta of them are evaluated again at eta
+    times the fidelity, and so on until the survivors are evaluated at full
+    fidelity (1). Then a new bracket starts. The models are called as
+    run(policy, fidelity=...), e.g. simulating that fraction of the days, and
+    only full fidelity losses reach the frontier."""
+
+    # The bracket shape knobs are independent and passed by name.
+    def __init__(  # pylint: disable=too-many-arguments
+            self, config, loss, n_policies=27, eta=3, min_fidelity=None,
+            seed=None):
+        super().__init__(config, loss)
+        self.eta = eta
+        if min_fidelity is None:
+            min_fidelity = eta ** -int(math.log(n_policies, eta) + 1e-9)
+        n_rungs = int(math.log(1 / min_fidelity, eta) + 1e-9) + 1
+        self.brackets = [(n_policies, n_rungs)]
+        self.rng = random.Random(seed)
+
+        self.n_brackets = 0
+        self.fidelity = None
+        self._rung = _Rung()
+
+    @property
+    def rung(self):
+        """Index of the current rung in its bracket."""
+        return self._rung.index
+
+    def propose(self):
+        """Get the next policy of the current rung."""
+        if not self._rung.queue:
+            if self._rung.outstanding:
+                raise optimizer.NeedsRecords()
+            self._next_rung()
+        return self._rung.take()
+
+    def record(self, proposal, loss):
+        """Record the loss of a policy of the current rung."""
+        self._rung.record(proposal, loss)
+
+    def _next_rung(self):
+        """Promote the best policies of the rung, or start a new bracket."""
+        results = self._rung.results
+        n_survivors = len(results) // self.eta
+        if self._rung.index + 1 < self._rung.n_rungs and n_survivors:
+            order = rank_losses([loss for _, loss in results])
+            self._rung = _Rung((results[i][0] for i in order[:n_survivors]),
+                               self._rung.index + 1, self._rung.n_rungs)
+        else:
+            n_policies, n_rungs = self.brackets[
+                self.n_brackets % len(self.brackets)]
+            self._rung = _Rung(
+                (lockdown_config.LockdownConfig.generate_lockdown_policy(
+                    self.config.sample(self.rng))
+                 for _ in range(n_policies)), 0, n_rungs)
+            self.n_brackets += 1
+        self.fidelity = min(
+            self.eta ** (self._rung.index + 1 - self._rung.n_rungs), 1)
+
+
+class Hyperband(SuccessiveHalving):
+    """Successive halving cycling through brackets of different aggression.
+
+    The most aggressive bracket samples the most policies and starts at
+    min_fidelity, the least aggressive evaluates a few policies at full
+    fidelity only. Cycling through them hedges against low fidelity losses
+    that rank policies differently from full ones."""
+
+    def __init__(self, config, loss, eta=3, min_fidelity=1 / 27, seed=None):
+        super().__init__(config, loss, eta=eta, min_fidelity=min_fidelity,
+                         seed=seed)
+        n_rungs = self.brackets[0][1]
+        self.brackets = [
+            (int(math.ceil(n_rungs / n_bracket_rungs *
+                           eta ** (n_bracket_rungs - 1))), n_bracket_rungs)
+            for n_bracket_rungs in range(n_rungs, 0, -1)]
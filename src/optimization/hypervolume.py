@@ -0,0 +1,134 @@
+"""Module with pareto indices that keep track of their hypervolume.
+
+The hypervolume of a frontier is the volume of the loss space between its
+points and a reference point, i.e. dominated by the frontier and dominating
+the reference. It grows whenever the frontier improves. Each index below
+updates it as points are inserted, without recomputing it from scratch."""
+import numpy as np
+
+from help_project.src.optimization import pareto_index
+
+
+def make_index(n_objectives, reference, n_samples=10000, seed=0):
+    """Return the most suitable hypervolume index for the objectives.
+
+    The hypervolume is exact for one and two objectives, and estimated from
+    n_samples Monte Carlo samples for more."""
+    reference = tuple(float(value) for value in np.ravel(reference))
+    assert len(reference) == n_objectives, "Reference has a different length"
+    if n_objectives == 1:
+        return ScalarHypervolume(reference)
+    if n_objectives == 2:
+        return Hypervolume2D(reference)
+    return MonteCarloHypervolume(reference, n_samples, seed)
+
+
+class ScalarHypervolume(pareto_index.ScalarIndex):
+    """Single objective index, the hypervolume is the gap to the reference."""
+
+    def __init__(self, reference):
+        super().__init__()
+        self.reference = reference
+        self.hypervolume = 0.
+
+    def insert(self, entry_id, loss):
+        """Insert a non-dominated loss, returning the ids it dominates."""
+        removed = super().insert(entry_id, loss)
+        self.hypervolume = max(self.reference[0] - self.best, 0.)
+        return removed
+
+
+class Hypervolume2D(pareto_index.SortedIndex2D):
+    """Two objective index with the exact hypervolume.
+
+    The points sorted by the first objective form a staircase, whose area is
+    the sum over the points of the width to the next point times the height
+    to the reference. An insertion only changes the terms of the points it
+    replaces and of its predecessor, so updating the area takes O(log n)
+    operations besides the removal of the dominated points."""
+
+    def __init__(self, reference):
+        super().__init__()
+        self.reference = reference
+        self.hypervolume = 0.
+
+    def insert(self, entry_id, loss):
+        """Insert a non-dominated loss, returning the ids it dominates."""
+        start, end = self.span(loss)
+        first, second = self._clip(loss)
+        next_first = (self._clip_first(self.first[end]) if end < len(self.ids)
+                      else self.reference[0])
+
+        before = sum(self._area(i) for i in range(max(start - 1, 0), end))
+        after = (next_first - first) * (self.reference[1] - second)
+        if start > 0:
+            prev_first, prev_second = self._clip(
+                (self.first[start - 1], self.second[start - 1]))
+            after += (first - prev_first) * (self.reference[1] - prev_second)
+        self.hypervolume += after - before
+        return super().insert(entry_id, loss)
+
+    def _area(self, i):
+        """Area term of the i-th point of the staircase."""
+        first, second = self._clip((self.first[i], self.second[i]))
+        next_first = (self._clip_first(self.first[i + 1])
+                      if i + 1 < len(self.ids) else self.reference[0])
+        return (next_first - first) * (self.reference[1] - second)
+
+    def _clip(self, loss):
+        """Clip a loss to the reference, beyond which it adds no volume."""
+        return (self._clip_first(loss[0]), min(loss[1], self.reference[1]))
+
+    def _clip_first(self, first):
+        """Clip a first objective value to the reference."""
+        return min(first, self.reference[0])
+
+
+class MonteCarloHypervolume(pareto_index.SkylineIndex):
+    """Index for any number of objectives with an estimated hypervolume.
+
+    Samples are drawn uniformly in the box between the lowest losses seen so
+    far and the reference, and the hypervolume is the volume of the box times
+    the fraction of samples dominated by the frontier. Points removed from the
+    frontier are dominated by the point that replaced them, so inserting a
+    point only adds the samples it dominates. The samples are redrawn when a
+    loss falls below the box, which grows it."""
+
+    def __init__(self, reference, n_samples=10000, seed=0):
+        super().__init__(len(reference))
+        self.reference = np.array(reference)
+        self.n_samples = n_samples
+        self.rng = np.random.RandomState(seed)
+        self.lower = None
+        self.samples = None
+        self.covered = None
+        self.hypervolume = 0.
+
+    def insert(self, entry_id, loss):
+        """Insert a non-dominated loss, returning the ids it dominates."""
+        removed = super().insert(entry_id, loss)
+        loss = np.asarray(loss, dtype=float)
+        if not np.all(loss < self.reference):
+            return removed  # Dominates none of the box
+
+        if self.lower is None or np.any(loss < self.lower):
+            self.lower = (loss if self.lower is None
+                          else np.minimum(self.lower, loss))
+            self._resample()
+        else:
+            self.covered |= np.all(loss <= self.samples, axis=1)
+        self.hypervolume = (np.prod(self.reference - self.lower) *
+                            np.count_nonzero(self.covered) / self.n_samples)
+        return removed
+
+    def _resample(self, chunk_size=256):
+        """Draw new samples and find those dominated by the stored losses."""
+        self.samples = self.lower + self.rng.random_sample(
+            (self.n_samples, len(self.reference))) * (self.reference - self.lower)
+        self.covered = np.zeros(self.n_samples, dtype=bool)
+        stored = self.losses[:len(self.ids)]
+        for start in range(0, len(stored), chunk_size):
+            chunk = stored[start:start + chunk_size]
+            self.covered |= np.any(np.all(
+                chunk[:, np.newaxis, :] <= self.samples[np.newaxis], axis=2),
+                                   axis=0)
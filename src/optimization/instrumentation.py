@@ -0,0 +1,250 @@
+"""Module for timing and profiling the stages of the optimization loop."""
+import collections
+import contextlib
+import cProfile
+import json
+import math
+import pstats
+import threading
+import time
+import tracemalloc
+
+STAGES = ('propose', 'health_model', 'economic_model', 'loss', 'record',
+          'frontier_update')
+
+
+class Histogram():
+    """Latency histogram with power of two buckets, starting at 1us."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets = collections.Counter()
+
+    def add(self, seconds):
+        """Add a latency measurement."""
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.buckets[max(math.frexp(seconds * 1e6)[1], 0)] += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket containing the given percentile."""
+        rank = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(2 ** bucket * 1e-6, self.max)
+        return self.max
+
+    def to_dict(self):
+        """Summary of the histogram."""
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99),
+        }
+
+
+class _Sampler():
+    """Profiling and memory tracing of one call out of sample_every."""
+
+    def __init__(self, profile=(), trace_memory=(), sample_every=1):
+        self.profile = set(profile)
+        self.trace_memory = set(trace_memory)
+        self.sample_every = sample_every
+        self.profiles = {}
+        self.memory = collections.defaultdict(collections.Counter)
+        self._calls = collections.Counter()
+        self._started_tracing = False
+
+    @contextlib.contextmanager
+    def sample(self, name):
+        """Profile and trace the code run in the context, if sampled."""
+        self._calls[name] += 1
+        sampled = (self._calls[name] - 1) % self.sample_every == 0
+        profiler = None
+        if sampled and name in self.profile:
+            profiler = self.profiles.setdefault(name, cProfile.Profile())
+            profiler.enable()
+        memory_before = None
+        if sampled and name in self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            memory_before = tracemalloc.get_traced_memory()[0]
+
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            if memory_before is not None:
+                current, peak = tracemalloc.get_traced_memory()
+                self.memory[name]['calls'] += 1
+                self.memory[name]['allocated'] += current - memory_before
+                self.memory[name]['peak'] = max(self.memory[name]['peak'],
+                                                peak)
+
+    def stop(self):
+        """Stop memory tracing if it was started here."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+
+class Instrumentation():
+    """Per stage timers, counters and optional profiling of the loop.
+
+    Every stage of a step (see STAGES) is timed into a latency histogram.
+    Callbacks registered with add_callback, such as a JsonLinesExporter, get
+    an event after every step and a summary at the end of the run.
+
+    The stages listed in profile are run under cProfile and the ones listed
+    in trace_memory under tracemalloc, for one call out of sample_every.
+    Model stages can only be profiled when they run in the calling process,
+    i.e. without an executor. Memory tracing started for a run is stopped by
+    finish()."""
+
+    enabled = True
+
+    def __init__(self, profile=(), trace_memory=(), sample_every=1,
+                 callbacks=()):
+        self.timers = collections.defaultdict(Histogram)
+        self.counters = collections.Counter()
+        self.last = {}
+        self._sampler = _Sampler(profile, trace_memory, sample_every)
+        self._callbacks = list(callbacks)
+        self._lock = threading.Lock()
+        self._start = time.time()
+
+    def add_callback(self, callback):
+        """Register a function called with an event dict after each step."""
+        self._callbacks.append(callback)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time (and possibly profile) the code run in the context."""
+        with self._sampler.sample(name):
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.record_time(name, time.perf_counter() - start)
+
+    def record_time(self, name, seconds):
+        """Add a stage duration measured elsewhere, e.g. in a worker."""
+        with self._lock:
+            self.timers[name].add(seconds)
+            self.last[name] = seconds
+
+    def count(self, name, value=1):
+        """Increment a counter."""
+        self.counters[name] += value
+
+    def step(self, step, **info):
+        """Report the end of a step to the callbacks."""
+        if not self._callbacks:
+            return
+        event = dict(info, event='step', step=step,
+                     elapsed=time.time() - self._start,
+                     stages=dict(self.last), counters=dict(self.counters))
+        for callback in self._callbacks:
+            callback(event)
+
+    def summary(self):
+        """Return the histograms, counters and memory use of all stages."""
+        return {
+            'stages': {name: timer.to_dict()
+                       for name, timer in self.timers.items()},
+            'counters': dict(self.counters),
+            'memory': {name: dict(values)
+                       for name, values in self._sampler.memory.items()},
+        }
+
+    def profile_stats(self, name):
+        """Return the cProfile statistics of a profiled stage."""
+        return pstats.Stats(self._sampler.profiles[name])
+
+    def finish(self):
+        """Send the summary to the callbacks at the end of a run.
+
+        Also stops memory tracing if this instrumentation started it."""
+        self._sampler.stop()
+        event = dict(self.summary(), event='summary',
+                     elapsed=time.time() - self._start)
+        for callback in self._callbacks:
+            callback(event)
+            if hasattr(callback, 'flush'):
+                callback.flush()
+
+
+class _NullStage():
+    """Context manager doing nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class _NullInstrumentation():
+    """Instrumentation doing nothing, used when instrumentation is off."""
+
+    enabled = False
+    _stage = _NullStage()
+
+    def stage(self, name):  # pylint: disable=unused-argument
+        """Return a context manager doing nothing."""
+        return self._stage
+
+    def record_time(self, name, seconds):
+        """Do nothing."""
+
+    def count(self, name, value=1):
+        """Do nothing."""
+
+    def step(self, step, **info):
+        """Do nothing."""
+
+    def finish(self):
+        """Do nothing."""
+
+
+NULL = _NullInstrumentation()
+
+
+class JsonLinesExporter():
+    """Callback writing each event as a line of JSON to a file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __call__(self, event):
+        if self._file is None:
+            self._file = open(self.path, 'a')
+        self._file.write(json.dumps(event, default=repr) + '\n')
+
+    def flush(self):
+        """Flush the events written so far."""
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        """Close the file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -1,7 +1,14 @@
 """Module containing the LockdownConfig class."""
 import collections
+from collections import abc
 import random
 
+import numpy as np
+
+SAMPLING_METHODS = ('random', 'lhs', 'halton', 'sobol')
+# Methods whose batches continue one sequence through the start argument.
+SEQUENCE_METHODS = ('halton', 'sobol')
+
 
 class LockdownConfig():
     """Class for generating valid lockdown policies."""
@@ -9,23 +16,250 @@ class LockdownConfig():
     def __init__(self, **kwargs):
         self.kwargs = kwargs
 
-    def sample(self):
-        """Return a sample lockdown policy."""
+    def sample(self, rng=None):
+        """Return a sample lockdown policy, drawn with the given RNG."""
+        rng = rng or random
         sample_kwargs = {}
         for name, values in self.kwargs.items():
             if isinstance(values, Options):
-                value = random.sample(values.values, 1)[0]
+                value = rng.sample(values.values, 1)[0]
             elif isinstance(values, Range):
-                value = random.uniform(values.min, values.max)
+                value = rng.uniform(values.min, values.max)
             else:
                 value = values
             sample_kwargs[name] = value
         return sample_kwargs
 
+    def sample_batch(self, n, method='random', seed=None, start=0):
+        """Return n sample lockdown policies as one array per parameter.
+
+        method is one of:
+          - 'random': independent uniform draws,
+          - 'lhs': latin hypercube sampling, which puts exactly one sample in
+            each of the n equal slices of every parameter,
+          - 'halton': the Halton low discrepancy sequence from index start
+            (so that consecutive batches continue the sequence), randomly
+            shifted if a seed is given,
+          - 'sobol': a scrambled Sobol sequence, requires scipy.
+        Options parameters get the option of the slice of [0, 1) that the
+        draw falls in, Range parameters are scaled linearly."""
+        variable = [name for name, values in self.kwargs.items()
+                    if isinstance(values, (Options, Range))]
+        unit = _unit_samples(n, len(variable), method, seed, start)
+
+        batch = {}
+        draws = dict(zip(variable, unit.T))
+        for name, values in self.kwargs.items():
+            if isinstance(values, Options):
+                indices = np.minimum(
+                    (draws[name] * len(values.values)).astype(int),
+                    len(values.values) - 1)
+                batch[name] = _column(values.values)[indices]
+            elif isinstance(values, Range):
+                batch[name] = values.min + draws[name] * (
+                    values.max - values.min)
+            else:
+                batch[name] = _column([values])[np.zeros(n, dtype=int)]
+        return batch
+
+    @classmethod
+    def policies_from_batch(cls, batch):
+        """Convert the columns returned by sample_batch into policies."""
+        schema = PolicySchema.get(batch)
+        rows = zip(*[batch[name].tolist() for name in schema.names])
+        return [Policy(schema, row) for row in rows]
+
     @classmethod
     def generate_lockdown_policy(cls, kwargs):
         """Generate the actual policy."""
-        return kwargs  # TODO: Adapt to group 2 code.
+        return Policy.from_dict(kwargs)  # TODO: Adapt to group 2 code.
+
+
+class PolicySchema():  # pylint: disable=too-few-public-methods
+    """Ordered parameter names, shared by all policies with these names."""
+
+    __slots__ = ('names', 'index')
+    _interned = {}
+
+    def __init__(self, names):
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+
+    @classmethod
+    def get(cls, names):
+        """Return the shared schema for the given parameter names."""
+        names = tuple(names)
+        schema = cls._interned.get(names)
+        if schema is None:
+            schema = cls._interned.setdefault(names, cls(names))
+        return schema
+
+
+class Policy(abc.Mapping):
+    """Immutable, hashable lockdown policy.
+
+    A policy only stores a tuple of values and a reference to the schema of
+    its parameter names, which is shared between policies. It behaves as a
+    read-only dict and compares equal to a dict with the same items."""
+
+    # The slots are only set through object.__setattr__, which pylint does
+    # not follow.
+    # pylint: disable=no-member
+
+    __slots__ = ('_schema', '_values', '_key')
+
+    def __init__(self, schema, values):
+        object.__setattr__(self, '_schema', schema)
+        object.__setattr__(self, '_values', tuple(values))
+        object.__setattr__(self, '_key', None)
+
+    @classmethod
+    def from_dict(cls, kwargs):
+        """Create a policy from a dict of parameter values."""
+        return cls(PolicySchema.get(kwargs), kwargs.values())
+
+    @classmethod
+    def from_row(cls, names, row):
+        """Create a policy from a sequence (e.g. NumPy row) of values."""
+        if hasattr(row, 'tolist'):
+            row = row.tolist()
+        return cls(PolicySchema.get(names), row)
+
+    @property
+    def names(self):
+        """The parameter names, in order."""
+        return self._schema.names
+
+    @property
+    def key(self):
+        """Canonical hashable key of the policy, see canonical_key."""
+        if self._key is None:
+            object.__setattr__(self, '_key', frozenset(
+                (name, canonical_key(value)) for name, value in self.items()))
+        return self._key
+
+    def to_dict(self):
+        """Return the policy as a dict."""
+        return dict(zip(self._schema.names, self._values))
+
+    def to_row(self, dtype=float):
+        """Return the values as a NumPy row, in the order of names."""
+        return np.array(self._values, dtype=dtype)
+
+    def __getitem__(self, name):
+        return self._values[self._schema.index[name]]
+
+    def __iter__(self):
+        return iter(self._schema.names)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, name):
+        return name in self._schema.index
+
+    def __eq__(self, other):
+        if isinstance(other, Policy) and other._schema is self._schema:
+            return self._values == other._values
+        if isinstance(other, abc.Mapping):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Policies are immutable')
+
+    def __reduce__(self):
+        return (Policy.from_row, (self._schema.names, self._values))
+
+    def __repr__(self):
+        return 'Policy(%r)' % self.to_dict()
+
+
+def _column(values):
+    """Return the values as a 1-d array.
+
+    The array is numeric if all the values are numbers of the same type, and
+    of objects otherwise so that every value keeps its type."""
+    values = list(values)
+    column = np.asarray(values)
+    if (column.ndim == 1 and column.dtype.kind in 'biuf' and
+            len({type(value) for value in values}) == 1):
+        return column
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def _unit_samples(n, dimensions, method, seed, start):
+    """Return n points of the unit hypercube drawn with the given method."""
+    if method not in SAMPLING_METHODS:
+        raise ValueError('Unknown sampling method: %s' % method)
+    rng = np.random.RandomState(seed)
+    if not dimensions:
+        return np.empty((n, 0))
+    if method == 'random':
+        return rng.random_sample((n, dimensions))
+    if method == 'lhs':
+        strata = np.argsort(rng.random_sample((dimensions, n)), axis=1).T
+        return (strata + rng.random_sample((n, dimensions))) / n
+    if method == 'halton':
+        points = np.stack([_radical_inverse(np.arange(start + 1,
+                                                      start + n + 1), base)
+                           for base in _primes(dimensions)], axis=1)
+        if seed is not None:
+            points = (points + rng.random_sample(dimensions)) % 1
+        return points
+    # Sobol: scipy is only needed for this method, and is not a requirement.
+    from scipy.stats import qmc  # pylint: disable=import-outside-toplevel,import-error
+    sampler = qmc.Sobol(dimensions, seed=seed)
+    if start:
+        sampler.fast_forward(start)
+    return sampler.random(n)
+
+
+def _radical_inverse(indices, base):
+    """Van der Corput radical inverse of the indices in the given base."""
+    result = np.zeros(len(indices))
+    fraction = 1.0 / base
+    indices = indices.copy()
+    while indices.any():
+        indices, digits = np.divmod(indices, base)
+        result += digits * fraction
+        fraction /= base
+    return result
+
+
+def _primes(count):
+    """Return the first count prime numbers."""
+    primes = []
+    candidate = 2
+    while len(primes) < count:
+        if all(candidate % prime for prime in primes):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+def canonical_key(policy):
+    """Return a hashable form of a policy that does not depend on key order.
+
+    Two policies that compare equal are mapped to equal keys, so the result
+    can be used to look policies up in sets and dicts."""
+    if isinstance(policy, Policy):
+        return policy.key
+    if isinstance(policy, abc.Mapping):
+        return frozenset(
+            (name, canonical_key(value)) for name, value in policy.items())
+    if isinstance(policy, (list, tuple)):
+        return tuple(canonical_key(value) for value in policy)
+    if isinstance(policy, (set, frozenset)):
+        return frozenset(canonical_key(value) for value in policy)
+    if hasattr(policy, 'tolist'):  # NumPy arrays and scalars.
+        return canonical_key(policy.tolist())
+    return policy
 
 
 Options = collections.namedtuple('Options', 'values')
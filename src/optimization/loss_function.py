@@ -1,4 +1,9 @@
 """Module for loss functions."""
+import numpy as np
+
+from help_project.src.optimization import hypervolume as hypervolume_lib
+from help_project.src.optimization import lockdown_config
+from help_project.src.optimization import pareto_index
 
 
 class LossFunction():
@@ -8,34 +13,151 @@ class LossFunction():
         """Compute the loss for a given health and economic output."""
         raise NotImplementedError()
 
+    def compute_batch(self, health_outputs, economic_outputs):
+        """Compute the losses of a batch of outputs as an array.
+
+        Returns one value per item for single objective losses, and an items
+        x objectives array otherwise. Subclasses can override this with a
+        vectorized version, by default it calls compute on each item."""
+        return np.array([self.compute(health_output, economic_output)
+                         for health_output, economic_output
+                         in zip(health_outputs, economic_outputs)])
+
     def __call__(self, *args, **kwargs):
         """Shortcut to call the compute function."""
         return self.compute(*args, **kwargs)
 
 
 class ParetoFrontier():
-    """Class to store the pareto frontier for a problem."""
+    """Class to store the pareto frontier for a problem.
+
+    The losses of the frontier points are kept in an index (see pareto_index)
+    so that checking and inserting a new point does not scan the whole
+    frontier. The frontier attribute lists the (point, loss) pairs in the
+    order they were added.
+
+    If a reference loss is given, the hypervolume between the frontier and
+    the reference is kept up to date as points are added (see the
+    hypervolume module)."""
+
+    def __init__(self, reference=None):
+        self.reference = reference
+        self._entries = {}
+        self._entry_keys = {}
+        self._point_ids = {}
+        self._index = None
+        self._n_objectives = None
+        self._next_id = 0
 
-    def __init__(self):
-        self.frontier = []
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def frontier(self):
+        """The (point, loss) pairs of the frontier, in insertion order."""
+        return list(self._entries.values())
+
+    @property
+    def hypervolume(self):
+        """The hypervolume of the frontier, None without a reference."""
+        if self.reference is None:
+            return None
+        if self._index is None:
+            return 0.
+        return self._index.hypervolume
 
     def update(self, point, loss):
         """Update the pareto frontier given a new point and loss value.
 
         The frontier will remain unchanged if any point dominates the new given
         point. If the new point in turn, dominates any points previously in the
-        frontier, these points will be removed."""
-        for pareto_point, pareto_loss in self.frontier:
-            if pareto_point == point:
-                return  # No update - new point already exists.
-            if ParetoFrontier.dominate(pareto_loss, loss):
-                return  # No update - new loss is worse than some point
-
-        # Update - keep only points that are not dominated by the new point
-        self.frontier = [(pareto_point, pareto_loss)
-                         for pareto_point, pareto_loss in self.frontier
-                         if not ParetoFrontier.dominate(loss, pareto_loss)]
-        self.frontier.append((point, loss))
+        frontier, these points will be removed. Returns whether the point was
+        added."""
+        vector = self._loss_vector(loss)
+        if self._contains(point):
+            return False  # No update - new point already exists.
+        if self._index.dominated(vector):
+            return False  # No update - new loss is worse than some point
+
+        # Update - drop the points that are dominated by the new point
+        entry_id = self._next_id
+        self._next_id += 1
+        for removed_id in self._index.insert(entry_id, vector):
+            del self._entries[removed_id]
+            key = self._entry_keys.pop(removed_id)
+            if key is not None:
+                del self._point_ids[key]
+
+        key = self._point_key(point)
+        self._entries[entry_id] = (point, loss)
+        self._entry_keys[entry_id] = key
+        if key is not None:
+            self._point_ids[key] = entry_id
+        return True
+
+    def update_many(self, points, losses):
+        """Update the frontier with several points, in the given order.
+
+        The losses are first checked against the current frontier with a
+        single query to the index, and only the points it does not dominate
+        go through update. Returns the number of points that were added."""
+        points, losses = list(points), list(losses)
+        if not losses:
+            return 0
+        vectors = np.array([self._loss_vector(loss) for loss in losses])
+        candidates = np.flatnonzero(~self._index.dominated_many(vectors))
+        return sum(self.update(points[i], losses[i]) for i in candidates)
+
+    def merge(self, other):
+        """Add the points of another frontier (or list of (point, loss) pairs).
+
+        Returns the number of points that were added."""
+        pairs = other.frontier if isinstance(other, ParetoFrontier) else other
+        return self.update_many([point for point, _ in pairs],
+                                [loss for _, loss in pairs])
+
+    def dominated(self, loss):
+        """Return whether some point of the frontier dominates the loss."""
+        if self._index is None:
+            return False
+        return self._index.dominated(self._loss_vector(loss))
+
+    def _loss_vector(self, loss):
+        """Convert a loss to a tuple of floats, creating the index if needed."""
+        try:
+            vector = (float(loss),)
+        except TypeError:
+            vector = tuple(float(value) for value in loss)
+
+        if self._index is None:
+            self._n_objectives = len(vector)
+            if self.reference is not None:
+                self._index = hypervolume_lib.make_index(len(vector),
+                                                         self.reference)
+            else:
+                self._index = pareto_index.make_index(len(vector))
+        assert len(vector) == self._n_objectives, "Losses have different length"
+        if self._n_objectives > 2:
+            return np.array(vector)
+        return vector
+
+    def _contains(self, point):
+        """Return whether the point is already part of the frontier."""
+        key = self._point_key(point)
+        if key is not None:
+            return key in self._point_ids
+        return any(pareto_point == point
+                   for pareto_point, _ in self._entries.values())
+
+    @staticmethod
+    def _point_key(point):
+        """Return a hashable key for the point, or None if there is none."""
+        key = lockdown_config.canonical_key(point)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
 
     @classmethod
     def dominate(cls, loss_a, loss_b):
@@ -48,3 +170,111 @@ class ParetoFrontier():
 
             return (any(a < b for a, b in zipped_values) and
                     all(a <= b for a, b in zipped_values))
+
+
+class EpsilonParetoArchive(ParetoFrontier):
+    """Approximation of the pareto frontier holding a bounded number of points.
+
+    The loss space is divided into boxes of size epsilon (a size per
+    objective, or one for all) and the archive keeps one point per box, for
+    the boxes that no other box dominates. Within a box, a point replaces the
+    kept one if it dominates it, or if neither dominates and it is closer to
+    the lower corner of the box. Every loss passed to update is then within
+    epsilon of an archived loss: for each objective, some archived loss is
+    lower than the given loss plus epsilon.
+
+    Boxes are looked up in a dict, and box dominance is checked with an index
+    (see pareto_index) over the box coordinates. If capacity is given and the
+    archive grows beyond it, epsilon is doubled and the archive rebuilt until
+    it fits. Coarser boxes keep the order of the finer ones, so the guarantee
+    still holds with the new epsilon."""
+
+    def __init__(self, epsilon, capacity=None):
+        super().__init__()
+        self.epsilon = np.asarray(epsilon, dtype=float)
+        self.capacity = capacity
+        self._boxes = {}
+
+    def __len__(self):
+        return len(self._boxes)
+
+    @property
+    def frontier(self):
+        """The (point, loss) pairs of the archive, in insertion order."""
+        return [(point, loss) for point, loss, _ in self._boxes.values()]
+
+    def update(self, point, loss):
+        """Add a point to the archive if its box is not dominated.
+
+        Returns whether the point was added, it may have been dropped since
+        if the archive had to be coarsened."""
+        vector = np.asarray(self._loss_vector(loss), dtype=float)
+        if self.epsilon.shape != vector.shape:
+            self.epsilon = np.broadcast_to(self.epsilon, vector.shape).copy()
+        added = self._insert(point, loss, vector)
+        while self.capacity is not None and len(self._boxes) > self.capacity:
+            self._coarsen()
+        return added
+
+    def update_many(self, points, losses):
+        """Add several points to the archive, in the given order.
+
+        Returns the number of points that were added."""
+        return sum(self.update(point, loss)
+                   for point, loss in zip(points, losses))
+
+    def dominated(self, loss):
+        """Return whether the archive would reject the loss."""
+        if self._index is None:
+            return False
+        vector = np.asarray(self._loss_vector(loss), dtype=float)
+        box = self._box(vector)
+        current = self._boxes.get(box)
+        if current is not None:
+            return not self._replaces(vector, current[2], box)
+        return self._index.dominated(self._box_vector(box))
+
+    def _insert(self, point, loss, vector):
+        """Insert a loss vector, returning whether it was kept."""
+        box = self._box(vector)
+        current = self._boxes.get(box)
+        if current is not None:
+            if not self._replaces(vector, current[2], box):
+                return False
+        else:
+            box_vector = self._box_vector(box)
+            if self._index.dominated(box_vector):
+                return False
+            for removed_box in self._index.insert(box, box_vector):
+                del self._boxes[removed_box]
+        self._boxes[box] = (point, loss, vector)
+        return True
+
+    def _coarsen(self):
+        """Double epsilon and rebuild the archive from its points."""
+        self.epsilon = self.epsilon * 2
+        entries = list(self._boxes.values())
+        self._boxes = {}
+        self._index = pareto_index.make_index(self._n_objectives)
+        for point, loss, vector in entries:
+            self._insert(point, loss, vector)
+
+    def _box(self, vector):
+        """Coordinates of the box of a loss vector."""
+        return tuple(np.floor(vector / self.epsilon).astype(int).tolist())
+
+    def _box_vector(self, box):
+        """Box coordinates in the form expected by the index."""
+        if self._n_objectives > 2:
+            return np.array(box, dtype=float)
+        return tuple(float(coordinate) for coordinate in box)
+
+    def _replaces(self, vector, current, box):
+        """Return whether a loss vector should replace the one of its box."""
+        if self.dominate(vector, current):
+            return True
+        if self.dominate(current, vector):
+            return False
+        corner = np.array(box) * self.epsilon
+        return (np.sum(((vector - corner) / self.epsilon) ** 2) <
+                np.sum(((current - corner) / self.epsilon) ** 2))
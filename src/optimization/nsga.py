@@ -0,0 +1,182 @@
+"""Module containing an NSGA-II style evolutionary optimizer."""
+import collections
+
+import numpy as np
+
+from help_project.src.optimization import optimizer
+from help_project.src.optimization import search_space
+
+
+def non_dominated_sort(losses):
+    """Return the pareto front rank of each row of a loss matrix.
+
+    Rank 0 is the non-dominated front, rank 1 the front that is only dominated
+    by rank 0, and so on. The pairwise dominance matrix is computed in one
+    vectorized step and the fronts are then peeled off one at a time."""
+    losses = np.asarray(losses, dtype=float)
+    lhs = losses[:, np.newaxis, :]
+    rhs = losses[np.newaxis, :, :]
+    # dominates[i, j] is whether row i dominates row j.
+    dominates = np.all(lhs <= rhs, axis=2) & np.any(lhs < rhs, axis=2)
+    n_dominators = dominates.sum(axis=0)
+
+    ranks = np.full(len(losses), -1)
+    remaining = np.ones(len(losses), dtype=bool)
+    rank = 0
+    while remaining.any():
+        front = remaining & (n_dominators == 0)
+        ranks[front] = rank
+        remaining &= ~front
+        n_dominators -= dominates[front].sum(axis=0)
+        rank += 1
+    return ranks
+
+
+def crowding_distance(losses, ranks):
+    """Return the crowding distance of each row within its front."""
+    losses = np.asarray(losses, dtype=float)
+    distance = np.zeros(len(losses))
+    for rank in np.unique(ranks):
+        members = np.flatnonzero(ranks == rank)
+        if len(members) <= 2:
+            distance[members] = np.inf
+            continue
+        front = losses[members]
+        order = np.argsort(front, axis=0)
+        ordered = np.take_along_axis(front, order, axis=0)
+        span = ordered[-1] - ordered[0]
+        span[span == 0] = 1
+
+        gaps = np.empty_like(ordered)
+        gaps[1:-1] = (ordered[2:] - ordered[:-2]) / span
+        gaps[[0, -1]] = np.inf
+        per_member = np.empty_like(gaps)
+        np.put_along_axis(per_member, order, gaps, axis=0)
+        distance[members] = per_member.sum(axis=1)
+    return distance
+
+
+# The SBX and mutation parameters are kept on the optimizer with its
+# population, all of which is saved in checkpoints.
+class NSGA2(optimizer.Optimizer):  # pylint: disable=too-many-instance-attributes
+    """Population based multi objective optimizer.
+
+    Each generation is proposed as a batch of offspring. Once all their losses
+    are recorded, parents and offspring are ranked by non-dominated sorting
+    and crowding distance, the best population_size individuals survive, and
+    the next offspring are bred by binary tournament, simulated binary
+    crossover and polynomial mutation. Options parameters are crossed over
+    uniformly and mutated by drawing a new option."""
+
+    # The variation parameters are independent and passed by name.
+    def __init__(  # pylint: disable=too-many-arguments
+            self, config, loss, population_size=40, crossover_prob=0.9,
+            mutation_prob=None, crossover_eta=15, mutation_eta=20, seed=None):
+        super().__init__(config, loss)
+        self.space = search_space.SearchSpace(config)
+        self.population_size = population_size
+        self.crossover_prob = crossover_prob
+        self.mutation_prob = (mutation_prob if mutation_prob is not None
+                              else 1 / max(self.space.n_genes, 1))
+        self.crossover_eta = crossover_eta
+        self.mutation_eta = mutation_eta
+        self.rng = np.random.RandomState(seed)
+
+        self.generation = 0
+        self.population = np.empty((0, self.space.n_genes))
+        self.population_losses = None
+        self._offspring = []
+        self._offspring_losses = []
+        self._outstanding = 0
+        self._queue = collections.deque(
+            self.space.random(population_size, self.rng))
+
+    def propose(self):
+        """Get the next individual of the current generation."""
+        if not self._queue:
+            if self._outstanding:
+                raise optimizer.NeedsRecords()
+            self._next_generation()
+        self._outstanding += 1
+        return self.space.decode(self._queue.popleft())
+
+    def record(self, proposal, loss):
+        """Record the loss of an individual of the current generation."""
+        self._outstanding -= 1
+        self._offspring.append(self.space.encode(proposal))
+        self._offspring_losses.append(np.ravel(np.asarray(loss, dtype=float)))
+
+    def _next_generation(self):
+        """Select the survivors and breed the next offspring."""
+        genomes = np.concatenate([self.population, np.array(self._offspring)])
+        losses = np.array(self._offspring_losses)
+        if self.population_losses is not None:
+            losses = np.concatenate([self.population_losses, losses])
+        self._offspring = []
+        self._offspring_losses = []
+
+        ranks = non_dominated_sort(losses)
+        crowding = crowding_distance(losses, ranks)
+        survivors = np.lexsort((-crowding, ranks))[:self.population_size]
+        self.population = genomes[survivors]
+        self.population_losses = losses[survivors]
+        self.generation += 1
+
+        parents = self._tournament(ranks[survivors], crowding[survivors])
+        self._queue.extend(self._breed(self.population[parents]))
+
+    def _tournament(self, ranks, crowding):
+        """Pick population_size parents by binary tournament."""
+        contenders = self.rng.randint(
+            len(ranks), size=(self.population_size, 2))
+        first, second = contenders[:, 0], contenders[:, 1]
+        first_wins = ((ranks[first] < ranks[second]) |
+                      ((ranks[first] == ranks[second]) &
+                       (crowding[first] >= crowding[second])))
+        return np.where(first_wins, first, second)
+
+    def _breed(self, parents):
+        """Create offspring from pairs of consecutive parents."""
+        if len(parents) % 2:
+            parents = np.concatenate([parents, parents[:1]])
+        mothers, fathers = parents[0::2], parents[1::2]
+        shape = mothers.shape
+        is_range = ~self.space.is_option
+        crossed = (self.rng.random_sample((shape[0], 1)) <
+                   self.crossover_prob)
+        swapped = crossed & (self.rng.random_sample(shape) < 0.5)
+
+        # Simulated binary crossover for Range genes.
+        uniform = self.rng.random_sample(shape)
+        beta = np.where(
+            uniform <= 0.5,
+            (2 * uniform) ** (1 / (self.crossover_eta + 1)),
+            (1 / (2 * (1 - uniform))) ** (1 / (self.crossover_eta + 1)))
+        beta = np.where(swapped & is_range, beta, 1)
+        first = 0.5 * ((1 + beta) * mothers + (1 - beta) * fathers)
+        second = 0.5 * ((1 - beta) * mothers + (1 + beta) * fathers)
+
+        # Uniform crossover for Options genes.
+        exchange = swapped & self.space.is_option
+        first = np.where(exchange, fathers, first)
+        second = np.where(exchange, mothers, second)
+
+        children = np.concatenate([first, second])[:self.population_size]
+        return self.space.clip(self._mutate(children))
+
+    def _mutate(self, children):
+        """Apply polynomial mutation to Range genes and resample Options."""
+        mutated = self.rng.random_sample(children.shape) < self.mutation_prob
+        span = self.space.upper - self.space.lower
+
+        uniform = self.rng.random_sample(children.shape)
+        delta = np.where(
+            uniform < 0.5,
+            (2 * uniform) ** (1 / (self.mutation_eta + 1)) - 1,
+            1 - (2 * (1 - uniform)) ** (1 / (self.mutation_eta + 1)))
+        perturbed = children + delta * span
+        resampled = self.space.random(len(children), self.rng)
+
+        children = np.where(mutated & ~self.space.is_option, perturbed,
+                            children)
+        return np.where(mutated & self.space.is_option, resampled, children)
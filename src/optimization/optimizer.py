@@ -1,59 +1,696 @@
 """Module for handling the optimization loop."""
+import asyncio
+import collections
+import copy
+import functools
 import itertools
+import os
 import random
+import time
+from concurrent import futures
 
+import numpy as np
+
+from help_project.src.optimization import instrumentation as instrumentation_lib
 from help_project.src.optimization import loss_function
 from help_project.src.optimization import lockdown_config
+from help_project.src.optimization import shared_data as shared_data_lib
+
+
+class NeedsRecords(Exception):
+    """Raised by propose() when new proposals depend on pending losses."""
 
 
 class Optimizer():
     """Main optimization class."""
 
+    # Attributes that are not part of the state saved in checkpoints.
+    stateless_attributes = ('config', 'loss')
+
+    # Fidelity of the proposals, see proposal_fidelity.
+    fidelity = None
+
     def __init__(self, config, loss):
         self.config = config
         self.loss = loss
 
-    def optimize(self, health_model, economic_model, n_steps=None):
-        """Run the optimization loop."""
-        pareto_frontier = loss_function.ParetoFrontier()
+    def optimize(self, health_model, economic_model, n_steps=None,
+                 frontier=None, **kwargs):
+        """Run the optimization loop and return the pareto frontier.
 
-        step = 0
-        while True:
-            try:
-                policy = self.propose()
+        frontier is a ParetoFrontier by default, an EpsilonParetoArchive
+        bounds its size. See optimize_iter for the other keyword arguments."""
+        if frontier is None:
+            frontier = loss_function.ParetoFrontier()
+        for _ in self.optimize_iter(health_model, economic_model, n_steps,
+                                    frontier=frontier, **kwargs):
+            pass
+        return frontier.frontier
 
-                health_output = health_model.run(policy)
-                economic_output = economic_model.run(policy)
+    # The keyword arguments are independent options of the run, documented
+    # below, that callers pass by name.
+    def optimize_iter(  # pylint: disable=too-many-arguments
+            self, health_model, economic_model, n_steps=None, executor=None,
+            n_workers=None, max_in_flight=None, cache=None, checkpoint=None,
+            frontier=None, instrumentation=None, shared_data=None,
+            stopping=(), batch_size=None):
+        """Run the optimization loop, yielding an Evaluation per step.
 
-                loss = self.loss(health_output, economic_output)
-                self.record(policy, loss)
+        If an executor is given, the health and economic models are run on it
+        for up to max_in_flight proposals at a time. The executor can either
+        be a concurrent.futures.Executor or one of 'thread' and 'process', in
+        which case a pool with n_workers workers is created for the run.
+        The workers of a 'process' pool attach to the model data published
+        by shared_data (a shared_data.SharedData), if given, instead of each
+        loading their own copy.
+        Results are still recorded in the order the proposals were made, so
+        runs remain reproducible. Optimizers whose next proposals depend on
+        earlier losses can raise NeedsRecords from propose() to wait for the
+        proposals in flight.
+
+        If an EvaluationCache is given, policies found in it are not evaluated
+        again, and the cache is saved at the end of the run if it has a
+        path.
+
+        If a Checkpoint is given, every evaluation and, periodically, the
+        optimizer state are appended to it. A run started with an existing
+        checkpoint resumes from its last saved state, without evaluating the
+        logged policies again.
+
+        If an Instrumentation is given, every stage of the loop is timed and
+        reported to it (see the instrumentation module).
+
+        The run stops early after an evaluation for which one of the given
+        stopping criteria (see the stopping module) says so. With a frontier
+        created with a reference point, each Evaluation's frontier reports
+        the current hypervolume to watch progress.
+
+        Multi-fidelity optimizers (see proposal_fidelity) get their proposals
+        evaluated with run(policy, fidelity=...), and only full fidelity
+        evaluations update the frontier. They do not support checkpoints.
+
+        With a batch_size, proposals are evaluated batch_size at a time
+        instead: they come from propose_batch, each model evaluates the whole
+        batch with one run_batch call (on the executor, if any), the losses
+        come from the loss function's compute_batch, and they are recorded
+        and added to the frontier in bulk. Models without run_batch are run
+        on each policy, see run_batch. Evaluations are still yielded one by
+        one, and a stopping criterion stops the run within a batch, whose
+        remaining policies have already been recorded."""
+        if isinstance(executor, str):
+            with make_executor(executor, n_workers, shared_data) as pool:
+                yield from self.optimize_iter(
+                    health_model, economic_model, n_steps, pool, n_workers,
+                    max_in_flight, cache, checkpoint, frontier,
+                    instrumentation, stopping=stopping, batch_size=batch_size)
+            return
+
+        if executor is None:
+            executor = _InlineExecutor()
+            max_in_flight = 1
+        elif max_in_flight is None:
+            max_in_flight = 2 * (n_workers or os.cpu_count() or 1)
+        yield from self._evaluate(_Run(
+            health_model=health_model,
+            economic_model=economic_model,
+            n_steps=n_steps,
+            executor=executor,
+            max_in_flight=max_in_flight,
+            cache=cache,
+            checkpoint=checkpoint,
+            frontier=(frontier if frontier is not None
+                      else loss_function.ParetoFrontier()),
+            instrumentation=instrumentation or instrumentation_lib.NULL,
+            stopping=tuple(stopping),
+        ), batch_size)
+
+    def _evaluate(self, run, batch_size):
+        """Run the evaluation loop, then save the cache and close the run."""
+        try:
+            if batch_size is None:
+                yield from self._evaluate_proposals(run)
+            else:
+                yield from self._evaluate_batches(run, batch_size)
+        finally:
+            if run.cache is not None and run.cache.path is not None:
+                run.cache.save()
+            if run.checkpoint is not None:
+                run.checkpoint.close()
+            run.instrumentation.finish()
 
-                pareto_frontier.update(policy, loss)
-                step += 1
-                if n_steps is not None and step >= n_steps:
+    def _evaluate_proposals(self, run):
+        """Keep up to max_in_flight proposals running on the executor."""
+        step, logged, replay = self._start(run)
+        pending = collections.deque()
+        # Futures of the policies currently being evaluated, so that a policy
+        # proposed again while in flight is not submitted twice.
+        in_flight = {}
+        proposed = step
+        exhausted = False
+        while True:
+            while (not exhausted and len(pending) < run.max_in_flight and
+                   (run.n_steps is None or proposed < run.n_steps)):
+                try:
+                    (policy,), fidelity = self._next_proposals(run, replay)
+                except StopIteration:
+                    exhausted = True
+                    break
+                except NeedsRecords:
+                    if not pending:
+                        raise
                     break
+                pending.append(
+                    _pending(run, policy, fidelity, logged, in_flight))
+                proposed += 1
+
+            if not pending:
+                break
+
+            # Always wait for the oldest proposal so that results are recorded
+            # in a deterministic order, whatever order they complete in.
+            item = pending.popleft()
+            loss = self._pending_loss(run, item, in_flight)
+            with run.instrumentation.stage('record'):
+                self.record(item.policy, loss)
+            if is_full_fidelity(item.fidelity):
+                with run.instrumentation.stage('frontier_update'):
+                    if run.frontier.update(item.policy, loss):
+                        run.instrumentation.count('frontier_updates')
+            step += 1
+            self._save_state(run, step, (item.policy for item in pending),
+                             since=step - 1)
+            if (yield from _yield_evaluations(run, step - 1, [item.policy],
+                                              [loss], item.fidelity)):
+                break
+
+        self._save_state(run, step, (item.policy for item in pending))
+
+    def _evaluate_batches(self, run, batch_size):
+        """Evaluate the proposals batch_size at a time."""
+        step, logged, replay = self._start(run)
+        while run.n_steps is None or step < run.n_steps:
+            size = (batch_size if run.n_steps is None
+                    else min(batch_size, run.n_steps - step))
+            try:
+                policies, fidelity = self._next_proposals(run, replay, size)
             except StopIteration:
                 break
 
-        return pareto_frontier.frontier
+            losses = self._batch_losses(run, policies, logged, fidelity)
+            with run.instrumentation.stage('record'):
+                self.record_batch(policies, losses)
+            if is_full_fidelity(fidelity):
+                with run.instrumentation.stage('frontier_update'):
+                    added = run.frontier.update_many(policies, losses)
+                if added:
+                    run.instrumentation.count('frontier_updates', added)
+
+            first_step, step = step, step + len(policies)
+            self._save_state(run, step, (), since=first_step)
+            if (yield from _yield_evaluations(run, first_step, policies,
+                                              losses, fidelity)):
+                break
+
+        self._save_state(run, step, ())
+
+    def _start(self, run):
+        """Resume from the checkpoint, if any, and start the stopping criteria.
+
+        Returns the step to start from, the logged losses keyed by policy,
+        and the policies to evaluate again first (see _resume)."""
+        resumed = (0, {}, collections.deque())
+        if run.checkpoint is not None:
+            resumed = self._resume(run.checkpoint, run.frontier)
+        for criterion in run.stopping:
+            criterion.start()
+        return resumed
+
+    def _next_proposals(self, run, replay, size=None):
+        """Return the next policies to evaluate and their fidelity.
+
+        Without a size, this is a single proposal from propose, otherwise a
+        batch from propose_batch. The policies to evaluate again after a
+        resume come first."""
+        with run.instrumentation.stage('propose'):
+            if replay:
+                count = 1 if size is None else min(size, len(replay))
+                return [replay.popleft() for _ in range(count)], None
+            policies = ([self.propose()] if size is None
+                        else self.propose_batch(size))
+            fidelity = self.proposal_fidelity()
+        if fidelity is not None and run.checkpoint is not None:
+            raise ValueError('Checkpoints do not support multi-fidelity '
+                             'evaluations')
+        return policies, fidelity
+
+    def _pending_loss(self, run, item, in_flight):
+        """Wait for the model outputs of a pending proposal, return its loss."""
+        if item.loss is not None:
+            return item.loss
+        outputs = tuple(future.result() for future in item.futures)
+        if run.cache is not None:
+            run.cache.put(_cache_key(item.policy, item.fidelity), outputs)
+            key = lockdown_config.canonical_key(
+                _cache_key(item.policy, item.fidelity))
+            if in_flight.get(key) == item.futures:
+                del in_flight[key]
+        with run.instrumentation.stage('loss'):
+            loss = self.loss(*outputs)
+        if run.checkpoint is not None:
+            run.checkpoint.log_evaluation(item.policy, loss)
+        return loss
+
+    def _batch_losses(self, run, policies, logged, fidelity):
+        """Return the losses of a batch of policies.
+
+        Logged losses are reused, the other ones are computed in one
+        compute_batch call from the model outputs (see _batch_outputs)."""
+        losses = [logged.get(lockdown_config.canonical_key(policy))
+                  for policy in policies]
+        computed = [i for i, loss in enumerate(losses) if loss is None]
+        if computed:
+            outputs = _batch_outputs(run, [policies[i] for i in computed],
+                                     fidelity)
+            with run.instrumentation.stage('loss'):
+                values = compute_batch(self.loss,
+                                       [output[0] for output in outputs],
+                                       [output[1] for output in outputs])
+            for i, loss in zip(computed, values):
+                losses[i] = loss
+                if run.checkpoint is not None:
+                    run.checkpoint.log_evaluation(policies[i], loss)
+        return losses
+
+    def _save_state(self, run, step, in_flight, since=None):
+        """Save the optimizer state to the checkpoint of the run, if any.
+
+        With since, the state is only saved if a multiple of the checkpoint
+        period lies in (since, step]. in_flight are the policies proposed
+        but not recorded yet."""
+        if run.checkpoint is None:
+            return
+        every = run.checkpoint.every
+        if since is None or step // every > since // every:
+            run.checkpoint.log_state(step, self.get_state(), list(in_flight))
+
+    # As for optimize_iter, the keyword arguments are options of the run.
+    async def optimize_async(  # pylint: disable=too-many-arguments
+            self, health_model, economic_model, n_steps=None, max_in_flight=4,
+            timeout=None, retries=0, frontier=None):
+        """Run the optimization loop on asyncio and return the frontier.
+
+        The models may implement run as a coroutine (e.g. clients of model
+        servers) or as a plain function, which is then run in the default
+        executor of the event loop. Up to max_in_flight proposals are
+        evaluated at a time, with the health and economic models of each
+        proposal called concurrently. Each call is cancelled after timeout
+        seconds and tried again up to retries times on timeouts and
+        connection errors. Results are recorded in proposal order."""
+        if frontier is None:
+            frontier = loss_function.ParetoFrontier()
+
+        pending = collections.deque()
+        proposed = 0
+        exhausted = False
+        try:
+            while True:
+                while (not exhausted and len(pending) < max_in_flight and
+                       (n_steps is None or proposed < n_steps)):
+                    try:
+                        policy = self.propose()
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    except NeedsRecords:
+                        if not pending:
+                            raise
+                        break
+                    fidelity = self.proposal_fidelity()
+                    pending.append((policy, fidelity, asyncio.ensure_future(
+                        asyncio.gather(
+                            _run_async(health_model, policy, timeout, retries,
+                                       fidelity),
+                            _run_async(economic_model, policy, timeout,
+                                       retries, fidelity)))))
+                    proposed += 1
+
+                if not pending:
+                    break
+
+                policy, fidelity, outputs = pending.popleft()
+                loss = self.loss(*(await outputs))
+                self.record(policy, loss)
+                if is_full_fidelity(fidelity):
+                    frontier.update(policy, loss)
+        finally:
+            for _, _, outputs in pending:
+                outputs.cancel()
+
+        return frontier.frontier
+
+    def _resume(self, checkpoint, frontier):
+        """Restore the frontier and optimizer state saved in a checkpoint.
+
+        Returns the step to resume from, the logged losses keyed by policy,
+        and the policies that were in flight when the state was saved."""
+        evaluations, state = checkpoint.load()
+        logged = {}
+        for policy, loss in evaluations:
+            frontier.update(policy, loss)
+            logged[lockdown_config.canonical_key(policy)] = loss
+        if state is None:
+            return 0, logged, collections.deque()
+        self.set_state(state['optimizer'])
+        return state['step'], logged, collections.deque(state['in_flight'])
+
+    def get_state(self):
+        """Return a picklable copy of the optimizer state for checkpoints."""
+        return {name: copy.deepcopy(value)
+                for name, value in vars(self).items()
+                if name not in self.stateless_attributes}
+
+    def set_state(self, state):
+        """Restore a state returned by get_state."""
+        vars(self).update(copy.deepcopy(state))
 
     def propose(self):
         """Get a new policy proposal from the config."""
         raise NotImplementedError()
 
+    def propose_batch(self, size):
+        """Get up to size new policy proposals, evaluated together.
+
+        By default this calls propose until it has size proposals, or until
+        propose raises NeedsRecords (the batch then needs recording first)
+        or StopIteration. Only raises those if there is no proposal at all.
+        proposal_fidelity applies to the whole batch."""
+        policies = []
+        while len(policies) < size:
+            try:
+                policies.append(self.propose())
+            except (StopIteration, NeedsRecords):
+                if not policies:
+                    raise
+                break
+        return policies
+
+    def proposal_fidelity(self):
+        """Return the fidelity to evaluate the last proposal at.
+
+        This is the fidelity attribute. None, the default, runs the models as
+        usual. Multi-fidelity optimizers set it to the fraction of the full
+        model run to do, in (0, 1], which is passed on as
+        run(policy, fidelity=...)."""
+        return self.fidelity
+
     def record(self, proposal, loss):
         """Record the loss for the given proposal."""
         raise NotImplementedError()
 
+    def record_batch(self, proposals, losses):
+        """Record the losses of a batch, by default with record."""
+        for proposal, loss in zip(proposals, losses):
+            self.record(proposal, loss)
+
+
+Evaluation = collections.namedtuple(
+    'Evaluation', 'step, policy, loss, frontier, fidelity')
+Evaluation.__new__.__defaults__ = (None,)
+Evaluation.__doc__ = """A step of the optimization loop.
+
+The frontier is the live ParetoFrontier of the run, its frontier attribute
+gives a snapshot of the current pareto frontier. The fidelity is None
+unless the optimizer evaluates proposals at several fidelities."""
+
+_Pending = collections.namedtuple('_Pending', 'policy, futures, loss, fidelity')
+
+_Run = collections.namedtuple(
+    '_Run', 'health_model, economic_model, n_steps, executor, max_in_flight, '
+    'cache, checkpoint, frontier, instrumentation, stopping')
+
+
+def is_full_fidelity(fidelity):
+    """Return whether an evaluation at this fidelity is a full model run."""
+    return fidelity is None or fidelity >= 1
+
+
+def _cache_key(policy, fidelity):
+    """What identifies the model outputs of a policy in the cache."""
+    return policy if fidelity is None else (policy, fidelity)
+
+
+def _model_kwargs(fidelity):
+    """Keyword arguments of model.run for the fidelity."""
+    return {} if fidelity is None else {'fidelity': fidelity}
+
+
+def _pending(run, policy, fidelity, logged, in_flight):
+    """Return the _Pending of a policy, submitting it unless it is logged."""
+    loss = logged.get(lockdown_config.canonical_key(policy))
+    if loss is not None:
+        return _Pending(policy, None, loss, None)
+    return _Pending(policy, _submit(run, policy, in_flight, fidelity), None,
+                    fidelity)
+
+
+def _yield_evaluations(run, first_step, policies, losses, fidelity):
+    """Report and yield the Evaluations of recorded policies.
+
+    Returns whether one of the stopping criteria stopped the run."""
+    for step, policy, loss in zip(itertools.count(first_step + 1), policies,
+                                  losses):
+        run.instrumentation.count('steps')
+        if run.frontier.hypervolume is not None:
+            run.instrumentation.step(step,
+                                     hypervolume=run.frontier.hypervolume)
+        else:
+            run.instrumentation.step(step)
+        evaluation = Evaluation(step, policy, loss, run.frontier, fidelity)
+        yield evaluation
+        # Every criterion sees every evaluation, e.g. to fill its window.
+        stops = [criterion.update(evaluation) for criterion in run.stopping]
+        if any(stops):
+            return True
+    return False
+
+
+def _batch_outputs(run, policies, fidelity):
+    """Return the (health, economic) model outputs of a batch of policies.
+
+    Cached outputs are reused, the models are run on the other policies with
+    one run_batch call each."""
+    outputs = [None] * len(policies)
+    if run.cache is not None:
+        outputs = [run.cache.get(_cache_key(policy, fidelity))
+                   for policy in policies]
+    missing = [i for i, output in enumerate(outputs) if output is None]
+    if len(missing) < len(policies):
+        run.instrumentation.count('cache_hits', len(policies) - len(missing))
+    if not missing:
+        return outputs
+
+    batch = [policies[i] for i in missing]
+    run.instrumentation.count('evaluations', len(batch))
+    model_futures = [
+        _submit_model(run, functools.partial(run_batch, model), batch, stage,
+                      _model_kwargs(fidelity))
+        for model, stage in ((run.health_model, 'health_model'),
+                             (run.economic_model, 'economic_model'))]
+    health_outputs, economic_outputs = [
+        future.result() for future in model_futures]
+    for i, output in zip(missing, zip(health_outputs, economic_outputs)):
+        outputs[i] = output
+        if run.cache is not None:
+            run.cache.put(_cache_key(policies[i], fidelity), output)
+    return outputs
+
+
+def _submit(run, policy, in_flight, fidelity=None):
+    """Submit the model runs for a policy, unless they are known."""
+    if run.cache is None:
+        return _submit_models(run, policy, fidelity)
+
+    outputs = run.cache.get(_cache_key(policy, fidelity))
+    if outputs is not None:
+        run.instrumentation.count('cache_hits')
+        return tuple(_completed_future(output) for output in outputs)
+
+    key = lockdown_config.canonical_key(_cache_key(policy, fidelity))
+    if key not in in_flight:
+        in_flight[key] = _submit_models(run, policy, fidelity)
+    return in_flight[key]
+
+
+def _submit_models(run, policy, fidelity=None):
+    """Submit the health and economic model runs for a policy."""
+    run.instrumentation.count('evaluations')
+    kwargs = _model_kwargs(fidelity)
+    return (_submit_model(run, run.health_model.run, policy, 'health_model',
+                          kwargs),
+            _submit_model(run, run.economic_model.run, policy,
+                          'economic_model', kwargs))
+
+
+def _submit_model(run, function, argument, stage, kwargs):
+    """Submit a model run, timing it if instrumentation is on.
+
+    Runs on the inline executor happen right away and are timed (and possibly
+    profiled) here. Runs on other executors are timed where they run."""
+    if not run.instrumentation.enabled:
+        return run.executor.submit(function, argument, **kwargs)
+    if isinstance(run.executor, _InlineExecutor):
+        with run.instrumentation.stage(stage):
+            return run.executor.submit(function, argument, **kwargs)
+
+    future = futures.Future()
+
+    def done(timed_future):
+        """Record the duration and pass on the model output."""
+        try:
+            output, seconds = timed_future.result()
+        except Exception as error:  # pylint: disable=broad-except
+            future.set_exception(error)
+            return
+        run.instrumentation.record_time(stage, seconds)
+        future.set_result(output)
+
+    run.executor.submit(_timed_run, function, argument,
+                        kwargs).add_done_callback(done)
+    return future
+
+
+def _timed_run(function, argument, kwargs):
+    """Run a model and return its output with the time it took."""
+    start = time.perf_counter()
+    output = function(argument, **kwargs)
+    return output, time.perf_counter() - start
+
+
+def run_batch(model, policies, **kwargs):
+    """Run a model on a batch of policies and return the list of outputs.
+
+    Uses the run_batch method of the model if it has one, and runs it on each
+    policy otherwise."""
+    if hasattr(model, 'run_batch'):
+        return list(model.run_batch(policies, **kwargs))
+    return [model.run(policy, **kwargs) for policy in policies]
+
+
+def compute_batch(loss, health_outputs, economic_outputs):
+    """Compute the losses of a batch of model outputs, one per item.
+
+    Uses the compute_batch method of the loss function if it has one, and
+    calls it on each item otherwise. Multi objective losses are returned as
+    tuples."""
+    if not hasattr(loss, 'compute_batch'):
+        return [loss(health_output, economic_output)
+                for health_output, economic_output
+                in zip(health_outputs, economic_outputs)]
+    values = np.asarray(loss.compute_batch(health_outputs, economic_outputs))
+    if values.ndim == 1:
+        return [value.item() for value in values]
+    return [tuple(row) for row in values.tolist()]
+
+
+async def _run_async(model, policy, timeout, retries, fidelity=None):
+    """Run a model on a policy with a timeout, retrying failed attempts."""
+    # get_running_loop is new in Python 3.7, before which get_event_loop
+    # returns the running loop when called from a coroutine.
+    loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)()
+    attempt = 0
+    while True:
+        if asyncio.iscoroutinefunction(model.run):
+            call = model.run(policy, **_model_kwargs(fidelity))
+        else:
+            call = loop.run_in_executor(
+                None, functools.partial(model.run, policy,
+                                        **_model_kwargs(fidelity)))
+        try:
+            return await asyncio.wait_for(call, timeout)
+        except (asyncio.TimeoutError, ConnectionError):
+            if attempt == retries:
+                raise
+            attempt += 1
+
+
+class _InlineExecutor(futures.Executor):
+    """Executor running each call immediately in the calling thread."""
+
+    def submit(self, fn, *args, **kwargs):  # pylint: disable=arguments-differ
+        """Run the call and return its outcome as a completed future."""
+        future = futures.Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as error:  # pylint: disable=broad-except
+            future.set_exception(error)
+        return future
+
+
+def _completed_future(result):
+    """Wrap an already known result in a future."""
+    future = futures.Future()
+    future.set_result(result)
+    return future
+
+
+def make_executor(kind='thread', n_workers=None, shared_data=None):
+    """Create a thread or process pool to evaluate proposals on.
+
+    Threads already share the data of the process. The workers of a process
+    pool attach to the data of shared_data when they start, if it could be
+    published."""
+    if kind == 'thread':
+        return futures.ThreadPoolExecutor(max_workers=n_workers)
+    if kind == 'process':
+        # The manifest is None before Python 3.8 (no shared memory), so the
+        # initializer argument, new in 3.7, is only used where it exists.
+        if shared_data is None or shared_data.manifest is None:
+            return futures.ProcessPoolExecutor(max_workers=n_workers)
+        return futures.ProcessPoolExecutor(
+            max_workers=n_workers, initializer=shared_data_lib.attach,
+            initargs=(shared_data.manifest,))
+    raise ValueError('Unknown executor kind: %s' % kind)
+
 
 class RandomSearch(Optimizer):
-    """Optimizer that tries possibilities randomly."""
+    """Optimizer that tries possibilities randomly.
+
+    By default every proposal is drawn independently. With a sampling method
+    of LockdownConfig.sample_batch (e.g. 'lhs' or 'halton'), proposals are
+    drawn batch_size at a time, which covers the space more evenly. The
+    batches of the 'halton' and 'sobol' sequences share one shift or
+    scramble, so that together they continue a single sequence."""
+
+    def __init__(self, config, loss, seed=None, sampling=None,
+                 batch_size=256):
+        super().__init__(config, loss)
+        self.rng = random.Random(seed)
+        self.sampling = sampling
+        self.batch_size = batch_size
+        self.n_sampled = 0
+        self.batch = collections.deque()
+        self.sequence_seed = None
+        if sampling in lockdown_config.SEQUENCE_METHODS:
+            self.sequence_seed = self.rng.randrange(2 ** 32)
 
     def propose(self):
         """Get a new proposal."""
-        sample_kwargs = self.config.sample()
-        return lockdown_config.LockdownConfig.generate_lockdown_policy(
-            sample_kwargs)
+        if self.sampling is None:
+            sample_kwargs = self.config.sample(self.rng)
+            return lockdown_config.LockdownConfig.generate_lockdown_policy(
+                sample_kwargs)
+
+        if not self.batch:
+            seed = self.sequence_seed
+            if seed is None:
+                seed = self.rng.randrange(2 ** 32)
+            batch = self.config.sample_batch(
+                self.batch_size, self.sampling, seed=seed,
+                start=self.n_sampled)
+            self.batch.extend(
+                lockdown_config.LockdownConfig.policies_from_batch(batch))
+            self.n_sampled += self.batch_size
+        return self.batch.popleft()
 
     def record(self, proposal, loss):
         """Do nothing."""
@@ -61,42 +698,105 @@ class RandomSearch(Optimizer):
 
 
 class ExhaustiveSearch(Optimizer):
-    """Optimizer that tries all possibilities."""
+    """Optimizer that tries all possibilities.
 
-    def __init__(self, config, loss):
+    The possibilities are the cross product of the Options parameters, in
+    the order of itertools.product, and can be addressed by a flat index with
+    proposal_at. Range parameters are drawn at random for each proposal,
+    unless range_steps puts them on a fixed grid of that many values (either
+    one number for all of them or a dict by parameter name).
+
+    To split the search, shard=(i, n) only proposes the indices i, i + n,
+    i + 2n, ... and index_range=(start, stop) only the indices in that range.
+    The frontiers of the shards can be combined with ParetoFrontier.merge."""
+
+    # The grid and search splitting options are passed by name.
+    def __init__(  # pylint: disable=too-many-arguments
+            self, config, loss, seed=None, range_steps=None, shard=None,
+            index_range=None):
         super().__init__(config, loss)
+        self.rng = random.Random(seed)
+
+        self.fixed_args = {}
+        self.grid_args = []
+        self.range_args = []
+        for name, values in self.config.kwargs.items():
+            if isinstance(values, lockdown_config.Options):
+                self.grid_args.append((name, list(values.values)))
+            elif isinstance(values, lockdown_config.Range):
+                steps = (range_steps.get(name)
+                         if isinstance(range_steps, dict) else range_steps)
+                if steps:
+                    self.grid_args.append((name, _grid(values, steps)))
+                else:
+                    self.range_args.append((name, values))
+            else:
+                self.fixed_args[name] = values
+
+        self.indices = range(self.size)
+        if index_range is not None:
+            self.indices = self.indices[slice(*index_range)]
+        if shard is not None:
+            shard_index, n_shards = shard
+            self.indices = self.indices[shard_index::n_shards]
+
+        self.position = 0
         self.proposals = self.generate_proposals()
 
+    @property
+    def size(self):
+        """Number of possibilities, i.e. of grid points."""
+        size = 1
+        for _, values in self.grid_args:
+            size *= len(values)
+        return size
+
     def propose(self):
         """Get a new proposal."""
-        return next(self.proposals)
+        proposal = next(self.proposals)
+        self.position += 1
+        return proposal
 
     def record(self, proposal, loss):
         """Do nothing."""
         return
 
-    def generate_proposals(self):
-        """Generator for proposals."""
-        range_args = []
-        option_args = []
+    def get_state(self):
+        """Return the position in the search space and the RNG state."""
+        return {'position': self.position, 'rng': self.rng.getstate()}
 
-        sample_kwargs = {}
-        for name, values in self.config.kwargs.items():
-            if isinstance(values, lockdown_config.Options):
-                option_args.append((name, values.values))
-            elif isinstance(values, lockdown_config.Range):
-                range_args.append((name, values))
-            else:
-                sample_kwargs[name] = values
-
-        option_names = [names for names, _ in option_args]
-        cross_product = itertools.product(
-            *[values for _, values in option_args])
-
-        for option_values in cross_product:
-            for name, value in zip(option_names, option_values):
-                sample_kwargs[name] = value
-            for range_name, range_arg in range_args:
-                sample_kwargs[range_name] = random.uniform(
-                    range_arg.min, range_arg.max)
-            yield sample_kwargs.copy()
+    def set_state(self, state):
+        """Continue the search from a state returned by get_state."""
+        self.position = state['position']
+        self.rng.setstate(state['rng'])
+        self.proposals = self.generate_proposals(start=self.position)
+
+    def generate_proposals(self, start=0):
+        """Generator for proposals, starting at the given position."""
+        for index in self.indices[start:]:
+            yield self.proposal_at(index)
+
+    def proposal_at(self, index):
+        """Return the proposal with the given flat index.
+
+        The index is unranked into one value per grid parameter, with the last
+        parameter varying fastest as in itertools.product."""
+        if not 0 <= index < self.size:
+            raise IndexError('Proposal index out of range: %d' % index)
+        sample_kwargs = dict(self.fixed_args)
+        for name, values in reversed(self.grid_args):
+            index, value_index = divmod(index, len(values))
+            sample_kwargs[name] = values[value_index]
+        for range_name, range_arg in self.range_args:
+            sample_kwargs[range_name] = self.rng.uniform(
+                range_arg.min, range_arg.max)
+        return lockdown_config.LockdownConfig.generate_lockdown_policy(
+            sample_kwargs)
+
+
+def _grid(range_arg, steps):
+    """Return evenly spaced values covering a Range."""
+    if steps == 1:
+        return [range_arg.min]
+    step = (range_arg.max - range_arg.min) / (steps - 1)
+    return [range_arg.min + i * step for i in range(steps)]
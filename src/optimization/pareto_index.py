@@ -0,0 +1,170 @@
+"""Module with index structures for the points of a pareto frontier.
+
+Each index stores the loss vectors of a set of mutually non-dominated points
+under integer ids, answers whether a new loss is dominated by any stored one,
+and removes the stored losses that a newly inserted loss dominates."""
+import bisect
+
+import numpy as np
+
+
+def make_index(n_objectives):
+    """Return the most suitable index for the given number of objectives."""
+    if n_objectives == 1:
+        return ScalarIndex()
+    if n_objectives == 2:
+        return SortedIndex2D()
+    return SkylineIndex(n_objectives)
+
+
+class ScalarIndex():
+    """Index for single objective losses: all points sharing the best loss."""
+
+    def __init__(self):
+        self.best = None
+        self.ids = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def dominated(self, loss):
+        """Return whether any stored loss dominates the given one."""
+        return self.best is not None and self.best < loss[0]
+
+    def dominated_many(self, losses):
+        """Return whether each row of a loss matrix is dominated."""
+        losses = np.asarray(losses, dtype=float)
+        if self.best is None:
+            return np.zeros(len(losses), dtype=bool)
+        return self.best < losses[:, 0]
+
+    def insert(self, entry_id, loss):
+        """Insert a non-dominated loss, returning the ids it dominates."""
+        removed = []
+        if self.best is None or loss[0] < self.best:
+            removed, self.ids = self.ids, []
+            self.best = loss[0]
+        self.ids.append(entry_id)
+        return removed
+
+
+class SortedIndex2D():
+    """Index for two objective losses, sorted by the first objective.
+
+    In a set of mutually non-dominated points sorted by the first objective,
+    the second objective is non-increasing. A new loss is therefore dominated
+    iff its closest predecessor on the first objective dominates it, and the
+    points it dominates form a contiguous run right after its position, so
+    both operations take O(log n) comparisons."""
+
+    def __init__(self):
+        self.first = []
+        self.second = []
+        self.ids = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def dominated(self, loss):
+        """Return whether any stored loss dominates the given one."""
+        first, second = loss
+        position = bisect.bisect_right(self.first, first)
+        if position == 0:
+            return False
+        prev_first = self.first[position - 1]
+        prev_second = self.second[position - 1]
+        return prev_second <= second and (prev_first < first or
+                                          prev_second < second)
+
+    def dominated_many(self, losses):
+        """Return whether each row of a loss matrix is dominated."""
+        losses = np.asarray(losses, dtype=float)
+        if not self.ids:
+            return np.zeros(len(losses), dtype=bool)
+        positions = np.searchsorted(self.first, losses[:, 0], side='right')
+        prev = np.maximum(positions - 1, 0)
+        prev_first = np.asarray(self.first)[prev]
+        prev_second = np.asarray(self.second)[prev]
+        return (positions > 0) & (prev_second <= losses[:, 1]) & (
+            (prev_first < losses[:, 0]) | (prev_second < losses[:, 1]))
+
+    def span(self, loss):
+        """Return the slice of stored points a new loss would replace.
+
+        The new loss goes at the start of the slice, and the points in the
+        slice are the ones it dominates."""
+        first, second = loss
+        start = bisect.bisect_left(self.first, first)
+        # Points with the very same loss are not dominated and are kept.
+        while (start < len(self.ids) and self.first[start] == first and
+               self.second[start] == second):
+            start += 1
+        end = start
+        while end < len(self.ids) and self.second[end] >= second:
+            end += 1
+        return start, end
+
+    def insert(self, entry_id, loss):
+        """Insert a non-dominated loss, returning the ids it dominates."""
+        first, second = loss
+        start, end = self.span(loss)
+        removed = self.ids[start:end]
+        self.first[start:end] = [first]
+        self.second[start:end] = [second]
+        self.ids[start:end] = [entry_id]
+        return removed
+
+
+class SkylineIndex():
+    """Index for losses with any number of objectives.
+
+    The losses are stored as rows of a NumPy matrix (grown by doubling) so
+    that dominance against the whole skyline is checked in one vectorized
+    comparison rather than one Python call per stored point."""
+
+    def __init__(self, n_objectives, capacity=64):
+        self.losses = np.empty((capacity, n_objectives))
+        self.ids = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def dominated(self, loss):
+        """Return whether any stored loss dominates the given one."""
+        stored = self.losses[:len(self.ids)]
+        return bool(np.any(np.all(stored <= loss, axis=1) &
+                           np.any(stored < loss, axis=1)))
+
+    def dominated_many(self, losses, chunk_size=256):
+        """Return whether each row of a loss matrix is dominated."""
+        losses = np.asarray(losses, dtype=float)
+        stored = self.losses[:len(self.ids)][:, np.newaxis, :]
+        dominated = np.zeros(len(losses), dtype=bool)
+        for start in range(0, len(losses), chunk_size):
+            chunk = losses[np.newaxis, start:start + chunk_size]
+            dominated[start:start + chunk_size] = np.any(
+                np.all(stored <= chunk, axis=2) &
+                np.any(stored < chunk, axis=2), axis=0)
+        return dominated
+
+    def insert(self, entry_id, loss):
+        """Insert a non-dominated loss, returning the ids it dominates."""
+        size = len(self.ids)
+        stored = self.losses[:size]
+        dominated = (np.all(loss <= stored, axis=1) &
+                     np.any(loss < stored, axis=1))
+
+        removed = []
+        if dominated.any():
+            keep = ~dominated
+            removed = [self.ids[i] for i in np.flatnonzero(dominated)]
+            self.ids = [self.ids[i] for i in np.flatnonzero(keep)]
+            size = len(self.ids)
+            self.losses[:size] = stored[keep]
+
+        if size == len(self.losses):
+            self.losses = np.concatenate(
+                [self.losses, np.empty_like(self.losses)])
+        self.losses[size] = loss
+        self.ids.append(entry_id)
+        return removed
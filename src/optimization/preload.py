@@ -0,0 +1,42 @@
+"""Warm-up of the heavy dependencies and data used by the models.
+
+Importing the optimization package, or the models, does not import pandas
+nor load any data: both happen on first use. Long-running processes, such as
+the workers of a process pool, can call preload() once when they start so
+that their first evaluation does not pay for it."""
+import importlib
+
+# (part, module, loader) in loading order. The loaders cache their result in
+# the process, so calling preload again is cheap.
+PARTS = (
+    ('pandas', 'pandas', None),
+    ('gva', 'help_project.src.economic_model.utils.gva_data', 'get_dataset'),
+    ('sector_mapping',
+     'help_project.src.economic_model.models.basic_lockdown_model',
+     'SectorMapping.default'),
+    ('strategies', 'help_project.src.exitstrategies.strategy_store',
+     'get_store'),
+    ('cases', 'help_project.src.disease_model.case_store', 'get_store'),
+)
+
+
+def preload(parts=None):
+    """Import and load the given parts (all of PARTS by default).
+
+    Returns the loaded object of each part, keyed by part name."""
+    names = [name for name, _, _ in PARTS]
+    unknown = set(parts or ()) - set(names)
+    if unknown:
+        raise ValueError('Unknown parts: %s' % ', '.join(sorted(unknown)))
+
+    loaded = {}
+    for name, module_name, loader in PARTS:
+        if parts is not None and name not in parts:
+            continue
+        value = importlib.import_module(module_name)
+        if loader is not None:
+            for attribute in loader.split('.'):
+                value = getattr(value, attribute)
+            value = value()
+        loaded[name] = value
+    return loaded
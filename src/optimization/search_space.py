@@ -0,0 +1,81 @@
+"""Module mapping lockdown policies to and from numeric vectors."""
+import numpy as np
+
+from help_project.src.optimization import lockdown_config
+
+
+class SearchSpace():
+    """Numeric view of the parameters of a LockdownConfig.
+
+    Every Options or Range parameter becomes one gene of a float vector: the
+    index of the chosen option for Options and the value itself for Range.
+    Fixed parameters are not part of the vector."""
+
+    def __init__(self, config):
+        self.config = config
+        self.names = []
+        self.options = []
+        lower = []
+        upper = []
+        for name, values in config.kwargs.items():
+            if isinstance(values, lockdown_config.Options):
+                self.names.append(name)
+                self.options.append(list(values.values))
+                lower.append(0)
+                upper.append(len(values.values) - 1)
+            elif isinstance(values, lockdown_config.Range):
+                self.names.append(name)
+                self.options.append(None)
+                lower.append(values.min)
+                upper.append(values.max)
+        self.lower = np.array(lower, dtype=float)
+        self.upper = np.array(upper, dtype=float)
+        self.is_option = np.array([values is not None
+                                   for values in self.options], dtype=bool)
+
+    @property
+    def n_genes(self):
+        """Number of variable parameters."""
+        return len(self.names)
+
+    def random(self, n, rng):
+        """Draw n genomes uniformly from the space.
+
+        Each option of an Options parameter is equally likely."""
+        genomes = self.lower + rng.random_sample((n, self.n_genes)) * (
+            self.upper - self.lower)
+        for gene in np.flatnonzero(self.is_option):
+            genomes[:, gene] = rng.randint(len(self.options[gene]), size=n)
+        return genomes
+
+    def clip(self, genomes):
+        """Project genomes back into the space, rounding option indices."""
+        genomes = np.clip(genomes, self.lower, self.upper)
+        genomes[..., self.is_option] = np.round(genomes[..., self.is_option])
+        return genomes
+
+    def decode(self, genome):
+        """Convert a genome into a lockdown policy."""
+        genes = dict(zip(self.names, range(self.n_genes)))
+        kwargs = {}
+        for name, values in self.config.kwargs.items():
+            if name not in genes:
+                kwargs[name] = values
+                continue
+            gene = genes[name]
+            options = self.options[gene]
+            if options is None:
+                kwargs[name] = float(genome[gene])
+            else:
+                kwargs[name] = options[int(round(genome[gene]))]
+        return lockdown_config.LockdownConfig.generate_lockdown_policy(kwargs)
+
+    def encode(self, policy):
+        """Convert a lockdown policy into a genome."""
+        genome = np.empty(self.n_genes)
+        for gene, (name, options) in enumerate(zip(self.names, self.options)):
+            if options is None:
+                genome[gene] = policy[name]
+            else:
+                genome[gene] = options.index(policy[name])
+        return genome
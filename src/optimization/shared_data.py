@@ -0,0 +1,184 @@
+"""Model data shared between the processes of a pool.
+
+The parent process loads the GVA dataset, the exit strategy store and the
+case store once and copies their arrays into shared memory. Workers attach
+to the arrays by name, without copying them, and install them as the stores
+of their process, so the models find them through the usual get_dataset()
+and get_store() functions:
+
+    with shared_data.SharedData() as data:
+        with futures.ProcessPoolExecutor(
+                initializer=shared_data.attach,
+                initargs=(data.manifest,)) as pool:
+            ...
+
+optimize_iter(executor='process', shared_data=data) does the same for the
+pools it creates. Shared memory needs Python 3.8 (multiprocessing.
+shared_memory). Without it, or if publishing fails, the manifest is None
+and workers load their own copy of the data on first use."""
+import atexit
+
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+PARTS = ('gva', 'strategies', 'cases')
+
+# Shared memory blocks attached by this process, kept open while in use,
+# and the parts installed from them.
+_ATTACHED = []
+_INSTALLED = set()
+
+
+def _gva_arrays():
+    from help_project.src.economic_model.utils import gva_data  # pylint: disable=import-outside-toplevel
+    dataset = gva_data.get_dataset()
+    return {'industries': dataset.industries, 'values': dataset.values,
+            'lockdown_sectors': dataset.lockdown_sectors,
+            'sectors': dataset.sectors}
+
+
+def _install_gva(arrays):
+    from help_project.src.economic_model.utils import gva_data  # pylint: disable=import-outside-toplevel
+    gva_data.set_dataset(None if arrays is None else gva_data.GVADataset(
+        arrays['industries'], arrays['values'], arrays['lockdown_sectors'],
+        arrays['sectors']))
+
+
+def _strategy_arrays():
+    from help_project.src.exitstrategies import strategy_store  # pylint: disable=import-outside-toplevel
+    store = strategy_store.get_store()
+    return {'names': np.array(store.names, dtype=str),
+            'focus_areas': np.array(store.focus_areas, dtype=str),
+            'tensor': store.tensor,
+            'n_days': np.array([store.n_days[name] for name in store.names],
+                               dtype=np.int64)}
+
+
+def _install_strategies(arrays):
+    from help_project.src.exitstrategies import strategy_store  # pylint: disable=import-outside-toplevel
+    strategy_store.set_store(
+        None if arrays is None else strategy_store.StrategyStore.from_arrays(
+            arrays['names'].tolist(), arrays['focus_areas'].tolist(),
+            arrays['tensor'], arrays['n_days'].tolist()))
+
+
+def _case_arrays():
+    from help_project.src.disease_model import case_store  # pylint: disable=import-outside-toplevel
+    store = case_store.get_store()
+    arrays = {'locations': store.locations, 'offsets': store.offsets,
+              'dates': store.dates}
+    arrays.update(('column_' + name, column)
+                  for name, column in store.columns.items())
+    return arrays
+
+
+def _install_cases(arrays):
+    from help_project.src.disease_model import case_store  # pylint: disable=import-outside-toplevel
+    case_store.set_store(None if arrays is None else case_store.CaseStore(
+        arrays['locations'], arrays['offsets'], arrays['dates'],
+        {name: arrays['column_' + name] for name in case_store.COLUMNS}))
+
+
+# Part name -> (function returning its arrays, function installing them, or
+# resetting the data to be loaded on next use when given None).
+_HANDLERS = {
+    'gva': (_gva_arrays, _install_gva),
+    'strategies': (_strategy_arrays, _install_strategies),
+    'cases': (_case_arrays, _install_cases),
+}
+
+
+class SharedData():
+    """Model data published to shared memory by the parent process.
+
+    manifest describes the published arrays (block name, shape and dtype of
+    each array of each part) and is what workers need to attach. It is None
+    when shared memory is not available. The blocks are freed by close(),
+    or when leaving the with block, so workers must be done by then."""
+
+    def __init__(self, parts=PARTS):
+        unknown = set(parts) - set(PARTS)
+        if unknown:
+            raise ValueError('Unknown parts: %s' % ', '.join(sorted(unknown)))
+        self.manifest = None
+        self._blocks = []
+        if shared_memory is None:
+            return
+        try:
+            self.manifest = {part: self._publish(_HANDLERS[part][0]())
+                             for part in parts}
+        except OSError:
+            self.close()  # e.g. no space left in /dev/shm
+
+    def _publish(self, arrays):
+        """Copy arrays into new shared memory blocks."""
+        entries = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True,
+                                               size=max(array.nbytes, 1))
+            self._blocks.append(block)
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            entries[name] = (block.name, array.shape, array.dtype.str)
+        return entries
+
+    def close(self):
+        """Free the shared memory blocks."""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+        self.manifest = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def attach(manifest):
+    """Install the data published in manifest as the data of this process.
+
+    Meant as the initializer of pool workers. Does nothing if manifest is
+    None, so the data is then loaded by the worker when first used. The
+    blocks are closed by detach, which runs when the process exits."""
+    if manifest is None:
+        return
+    if not _ATTACHED:
+        atexit.register(detach)
+    for part, entries in manifest.items():
+        arrays = {}
+        for name, (block_name, shape, dtype) in entries.items():
+            # Pool workers share the resource tracker of the parent, so the
+            # block is only unlinked once, by SharedData.close.
+            block = shared_memory.SharedMemory(name=block_name)
+            _ATTACHED.append(block)
+            arrays[name] = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+            arrays[name].flags.writeable = False
+        _HANDLERS[part][1](arrays)
+        _INSTALLED.add(part)
+
+
+def detach():
+    """Close the blocks attached by this process.
+
+    The data installed from them is reset, so it is loaded again if used
+    later. Blocks whose arrays are still referenced elsewhere, e.g. by a
+    model holding on to a store, stay open."""
+    for part in _INSTALLED:
+        _HANDLERS[part][1](None)
+    _INSTALLED.clear()
+    in_use = []
+    for block in _ATTACHED:
+        try:
+            block.close()
+        except BufferError:
+            in_use.append(block)
+    _ATTACHED[:] = in_use
+    if not _ATTACHED:
+        atexit.unregister(detach)
@@ -0,0 +1,93 @@
+"""Module with stopping criteria for the optimization loop.
+
+A criterion is given every Evaluation of a run through update(), which
+returns whether the run should stop. optimize_iter stops after the first
+evaluation for which one of its criteria does, and sets the stopped
+attribute of the criteria that fired. The hypervolume based criteria need a
+frontier created with a reference point (see ParetoFrontier)."""
+import collections
+import time
+
+
+class StoppingCriterion():
+    """Base class for stopping criteria."""
+
+    def __init__(self):
+        self.stopped = False
+
+    def start(self):
+        """Reset the criterion at the start of a run."""
+        self.stopped = False
+
+    def update(self, evaluation):
+        """Take an evaluation into account, returning whether to stop."""
+        self.stopped = self.should_stop(evaluation)
+        return self.stopped
+
+    def should_stop(self, evaluation):
+        """Return whether the run should stop after this evaluation."""
+        raise NotImplementedError()
+
+
+def _hypervolume(evaluation):
+    """Return the hypervolume of the frontier of an evaluation."""
+    hypervolume = evaluation.frontier.hypervolume
+    if hypervolume is None:
+        raise ValueError('Hypervolume criteria need a frontier with a '
+                         'reference point')
+    return hypervolume
+
+
+class Stagnation(StoppingCriterion):
+    """Stop when the hypervolume improved by at most tolerance (relative to
+    the current hypervolume) over the last window steps."""
+
+    def __init__(self, window=100, tolerance=1e-3):
+        super().__init__()
+        self.window = window
+        self.tolerance = tolerance
+        self.history = collections.deque(maxlen=window + 1)
+
+    def start(self):
+        super().start()
+        self.history.clear()
+
+    def should_stop(self, evaluation):
+        hypervolume = _hypervolume(evaluation)
+        self.history.append(hypervolume)
+        if len(self.history) <= self.window:
+            return False
+        improvement = hypervolume - self.history[0]
+        return improvement <= self.tolerance * abs(hypervolume)
+
+
+class WallClock(StoppingCriterion):
+    """Stop once the run has taken more than the given number of seconds."""
+
+    def __init__(self, seconds):
+        super().__init__()
+        self.seconds = seconds
+        self.started = None
+
+    def start(self):
+        super().start()
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        """Seconds since the start of the run."""
+        return time.monotonic() - self.started
+
+    def should_stop(self, evaluation):
+        return self.elapsed > self.seconds
+
+
+class TargetHypervolume(StoppingCriterion):
+    """Stop once the hypervolume reaches the target."""
+
+    def __init__(self, target):
+        super().__init__()
+        self.target = target
+
+    def should_stop(self, evaluation):
+        return _hypervolume(evaluation) >= self.target
@@ -0,0 +1,186 @@
+"""Module containing an optimizer guided by a surrogate model of the loss."""
+import collections
+
+import numpy as np
+
+from help_project.src.optimization import optimizer
+from help_project.src.optimization import search_space
+
+
+# The hyperparameters and the fitted factorization are kept on the process.
+class GaussianProcess():  # pylint: disable=too-many-instance-attributes
+    """Gaussian process regression with an RBF kernel.
+
+    Inputs are expected to be scaled to the unit cube. The length scale is
+    picked from length_scales by maximizing the marginal likelihood. When
+    the kernel matrix is not numerically positive definite (e.g. duplicate
+    inputs), the noise added to its diagonal is increased tenfold at a time
+    up to max_jitter."""
+
+    def __init__(self, length_scales=(0.05, 0.1, 0.2, 0.5, 1.0), noise=1e-6,
+                 max_jitter=1e-2):
+        self.length_scales = length_scales
+        self.noise = noise
+        self.max_jitter = max_jitter
+        self.length_scale = None
+        self._inputs = None
+        self._cholesky = None
+        self._alpha = None
+        self._offset = 0.0
+        self._scale = 1.0
+
+    def fit(self, inputs, targets):
+        """Fit the process to the given inputs and targets.
+
+        Raises np.linalg.LinAlgError if no length scale gives a usable
+        kernel matrix."""
+        targets = np.asarray(targets, dtype=float)
+        self._offset = targets.mean()
+        self._scale = targets.std() or 1.0
+        normalized = (targets - self._offset) / self._scale
+        self._inputs = np.asarray(inputs, dtype=float)
+
+        best_likelihood = -np.inf
+        for length_scale in self.length_scales:
+            cholesky = self._factorize(
+                self._kernel(self._inputs, self._inputs, length_scale))
+            if cholesky is None:
+                continue
+            alpha = np.linalg.solve(
+                cholesky.T, np.linalg.solve(cholesky, normalized))
+            likelihood = (-0.5 * normalized @ alpha -
+                          np.log(np.diag(cholesky)).sum())
+            if likelihood > best_likelihood:
+                best_likelihood = likelihood
+                self.length_scale = length_scale
+                self._cholesky = cholesky
+                self._alpha = alpha
+        if self._cholesky is None:
+            raise np.linalg.LinAlgError(
+                'Kernel matrix is not positive definite for any length scale')
+        return self
+
+    def _factorize(self, kernel):
+        """Cholesky factor of the kernel plus noise, None if it fails."""
+        jitter = self.noise
+        while True:
+            try:
+                return np.linalg.cholesky(
+                    kernel + jitter * np.eye(len(kernel)))
+            except np.linalg.LinAlgError:
+                if jitter >= self.max_jitter:
+                    return None
+                jitter = max(jitter * 10, 1e-10)
+
+    def predict(self, inputs):
+        """Return the predicted mean and standard deviation at the inputs."""
+        cross = self._kernel(np.asarray(inputs, dtype=float), self._inputs,
+                             self.length_scale)
+        mean = cross @ self._alpha
+        solved = np.linalg.solve(self._cholesky, cross.T)
+        variance = np.maximum(1 - np.sum(solved ** 2, axis=0), 0)
+        return (mean * self._scale + self._offset,
+                np.sqrt(variance) * self._scale)
+
+    @staticmethod
+    def _kernel(inputs_a, inputs_b, length_scale):
+        """RBF kernel matrix between two sets of inputs."""
+        distances = (np.sum(inputs_a ** 2, axis=1)[:, np.newaxis] +
+                     np.sum(inputs_b ** 2, axis=1)[np.newaxis, :] -
+                     2 * inputs_a @ inputs_b.T)
+        return np.exp(-0.5 * np.maximum(distances, 0) / length_scale ** 2)
+
+
+# Besides its state, the optimizer keeps all of its acquisition settings.
+class SurrogateSearch(  # pylint: disable=too-many-instance-attributes
+        optimizer.Optimizer):
+    """Optimizer proposing batches of points chosen by a surrogate model.
+
+    After n_initial random proposals, a Gaussian process is fitted to the
+    recorded losses of each objective. Every batch is then picked from
+    n_candidates random points by a lower confidence bound acquisition. For
+    multiple objectives each point of the batch uses a random Tchebycheff
+    scalarization of the objectives (as in ParEGO), which spreads the batch
+    along the pareto frontier. Options parameters are modelled through their
+    option index."""
+
+    stateless_attributes = ('config', 'loss', 'space')
+
+    # The acquisition knobs are independent and passed by name.
+    def __init__(  # pylint: disable=too-many-arguments
+            self, config, loss, n_initial=10, batch_size=5, n_candidates=1000,
+            exploration=2.0, max_points=500, seed=None):
+        super().__init__(config, loss)
+        self.space = search_space.SearchSpace(config)
+        self.batch_size = batch_size
+        self.n_candidates = n_candidates
+        self.exploration = exploration
+        self.max_points = max_points
+        self.rng = np.random.RandomState(seed)
+
+        self.genomes = []
+        self.losses = []
+        self._outstanding = 0
+        self._queue = collections.deque(self.space.random(n_initial, self.rng))
+
+    def propose(self):
+        """Get the next point of the current batch."""
+        if not self._queue:
+            if self._outstanding:
+                raise optimizer.NeedsRecords()
+            self._queue.extend(self._next_batch())
+        self._outstanding += 1
+        return self.space.decode(self._queue.popleft())
+
+    def record(self, proposal, loss):
+        """Record the loss of a proposal for the next fit."""
+        self._outstanding -= 1
+        self.genomes.append(self.space.encode(proposal))
+        self.losses.append(np.ravel(np.asarray(loss, dtype=float)))
+
+    def _next_batch(self):
+        """Pick a batch of candidates with the best acquisition values."""
+        candidates = self.space.random(self.n_candidates, self.rng)
+        seen = {tuple(genome) for genome in self.genomes}
+        fresh = np.array([tuple(genome) not in seen for genome in candidates])
+        if not fresh.any():
+            return self.space.random(self.batch_size, self.rng)
+        candidates = candidates[fresh]
+        try:
+            bounds = self._lower_bounds(candidates)
+        except np.linalg.LinAlgError:
+            return self.space.random(self.batch_size, self.rng)
+
+        batch = []
+        available = np.ones(len(candidates), dtype=bool)
+        for _ in range(min(self.batch_size, len(candidates))):
+            weights = self.rng.dirichlet(np.ones(len(bounds)))
+            acquisition = np.max(weights[:, np.newaxis] * bounds, axis=0)
+            acquisition[~available] = np.inf
+            best = int(np.argmin(acquisition))
+            available[best] = False
+            batch.append(candidates[best])
+        return batch
+
+    def _lower_bounds(self, candidates):
+        """Lower confidence bound of each objective at the candidates.
+
+        The bounds come from a Gaussian process per objective, fitted to the
+        last max_points losses, and are scaled to [0, 1]. Raises
+        np.linalg.LinAlgError if a process can not be fitted."""
+        inputs = self._scale(np.array(self.genomes[-self.max_points:]))
+        losses = np.array(self.losses[-self.max_points:])
+        bounds = []
+        for objective in losses.T:
+            model = GaussianProcess().fit(inputs, objective)
+            mean, std = model.predict(self._scale(candidates))
+            bound = mean - self.exploration * std
+            span = bound.max() - bound.min()
+            bounds.append((bound - bound.min()) / (span or 1))
+        return np.array(bounds)
+
+    def _scale(self, genomes):
+        """Scale genomes to the unit cube."""
+        span = self.space.upper - self.space.lower
+        span[span == 0] = 1
+        return (genomes - self.space.lower) / span
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from help_project.benchmarks import run
+from help_project.benchmarks import suite
+from help_project.benchmarks import synthetic
+from help_project.src.exitstrategies.data_elt import DataELT
+from help_project.src.optimization import loss_function
+
+
+def test_pareto_losses_are_non_dominated():
+    """Test that every synthetic pareto loss ends up on the frontier."""
+    losses = synthetic.pareto_losses(200, 3)
+    frontier = loss_function.ParetoFrontier()
+    assert frontier.update_many(range(200), losses) == 200
+
+
+def test_strategy_files_are_readable(tmp_path):
+    """Test that DataELT reads the synthetic strategy files."""
+    synthetic.write_strategy_files(str(tmp_path), n_strategies=3, n_days=50,
+                                   n_focus_areas=4, n_breakpoints=5)
+    strat_dict = DataELT(str(tmp_path)).extract_data()
+    assert len(strat_dict) == 3
+    assert all(strat_df.shape == (50, 4) for strat_df in strat_dict.values())
+
+
+def test_compare_flags_regressions():
+    """Test that only cases slower than the tolerance are reported."""
+    def result(params, seconds):
+        return {'benchmark': 'case', 'params': params,
+                'seconds_per_op': {'best': seconds, 'median': seconds}}
+    baseline = [result({'n': 1}, 1.0), result({'n': 2}, 1.0)]
+    results = [result({'n': 1}, 1.1), result({'n': 2}, 2.0),
+               result({'n': 3}, 5.0)]
+    regressions = suite.compare(results, baseline, tolerance=0.25)
+    assert [(case['params'], ratio) for case, ratio in regressions] == [
+        ({'n': 2}, 2.0)]
+
+
+def test_run_writes_results(tmp_path):
+    """Test the command line on a quick benchmark."""
+    output = str(tmp_path / 'results.json')
+    assert run.main(['frontier_update', '--quick', '--output', output]) == 0
+    assert run.main(['frontier_update', '--quick', '--baseline', output,
+                     '--tolerance', str(np.inf)]) == 0
+
+
+def test_imports_without_pandas():
+    """Test that the main modules import without pandas."""
+    for module in suite.IMPORT_MODULES:
+        _, heavy = suite.import_stats(module)
+        assert heavy == [], module
+
+
+@pytest.mark.slow
+def test_imports_within_budget():
+    """Test that the main modules import quickly."""
+    for module in suite.IMPORT_MODULES:
+        seconds, _ = suite.import_stats(module)
+        assert seconds < suite.IMPORT_BUDGET, module
@@ -0,0 +1,64 @@
+""" Test for the case data store """
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from help_project.src.disease_model import case_store
+from help_project.src.disease_model.sample_model import sample_disease_model
+
+
+def test_get_cases_matches_csv():
+    """ get_cases returns the rows of the CSV for the country """
+    cases_df = pd.read_csv(case_store.DATA_PATH)
+    expected = cases_df[cases_df['location'] == 'India']
+    result = sample_disease_model.get_cases('India')
+    assert list(result['date']) == list(expected['date'])
+    assert list(result['total_cases']) == list(expected['total_cases'])
+    assert set(result['location']) == {'India'}
+
+
+def test_date_range_query():
+    """ Date range queries include both ends """
+    store = case_store.get_store()
+    cases = store.query('India', '2020-03-01', '2020-03-10')
+    assert len(cases['date']) == 9  # 2020-03-09 is missing from the data
+    assert str(cases['date'][0]) == '2020-03-01'
+    assert str(cases['date'][-1]) == '2020-03-10'
+
+
+def test_query_many():
+    """ Bulk queries return each country """
+    store = case_store.get_store()
+    results = store.query_many(['India', 'Italy'], end='2020-02-01')
+    assert set(results) == {'India', 'Italy'}
+    assert all(np.all(cases['date'] <= np.datetime64('2020-02-01'))
+               for cases in results.values())
+
+
+def test_memory_mapped_store(tmp_path):
+    """ A saved store is memory-mapped and gives the same results """
+    cache_dir = str(tmp_path / 'cases')
+    parsed = case_store.CaseStore.open(cache_dir=cache_dir)
+    mapped = case_store.CaseStore.open(cache_dir=cache_dir)
+    assert isinstance(mapped.columns['total_cases'], np.memmap)
+    for name, values in parsed.query('Italy').items():
+        assert np.array_equal(values, mapped.query('Italy')[name])
+
+
+def test_save_keeps_mapped_files_intact(tmp_path):
+    """ Saving over a mapped store does not change what it reads """
+    cache_dir = str(tmp_path / 'cases')
+    store = case_store.CaseStore.from_csv()
+    store.save(cache_dir)
+    mapped = case_store.CaseStore.load(cache_dir)
+    before = np.array(mapped.columns['total_cases'])
+
+    store.columns = {name: column[:10] for name, column in store.columns.items()}
+    store.save(cache_dir)
+    assert np.array_equal(mapped.columns['total_cases'], before)
+    assert len(case_store.CaseStore.load(cache_dir).columns['total_cases']) == 10
+    assert sorted(os.listdir(cache_dir)) == sorted(
+        name + '.npy' for name in
+        case_store.COLUMNS + ('locations', 'offsets', 'dates'))
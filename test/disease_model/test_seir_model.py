@@ -0,0 +1,49 @@
+""" Test for the batch SEIR model """
+
+import numpy as np
+import pytest
+
+from help_project.src.disease_model import seir_model
+
+
+def test_population_is_conserved():
+    """ The compartments always sum up to the population """
+    model = seir_model.SEIRModel(1e6, initial_state=(1e6 - 10, 0, 10, 0), n_days=50)
+    trajectories = model.simulate(np.linspace(0, 1, 3)[:, None] * np.ones((3, 50)))
+    assert trajectories.shape == (3, 51, 4)
+    assert np.allclose(trajectories.sum(axis=2), 1e6)
+    assert np.all(trajectories >= 0)
+
+
+def test_closing_reduces_infections():
+    """ Lower focus area levels give fewer infections """
+    model = seir_model.SEIRModel(1e6, n_days=60)
+    levels = np.stack([np.full((60, 2), level) for level in (0., 0.5, 1.)])
+    infections = model.simulate(model.contact(levels, ['a', 'b']))[:, -1, 3]
+    assert infections[0] < infections[1] < infections[2]
+
+
+def test_contact_ignores_missing_levels():
+    """ NaN levels are skipped, and days without levels are fully open """
+    model = seir_model.SEIRModel(1e6, min_contact=0.2, focus_weights={'b': 3.})
+    levels = np.array([[[1., 0.], [np.nan, 0.5], [np.nan, np.nan]]])
+    contact = model.contact(levels, ['a', 'b'])
+    assert np.allclose(contact, [[0.2 + 0.8 * 0.25, 0.2 + 0.8 * 0.5, 1.]])
+
+
+def test_run_matches_run_batch():
+    """ run gives the same result as run_batch for the same policy """
+    model = seir_model.SEIRModel.calibrate('India', 1.38e9)
+    policies = [{'strategy': '1_ind'}, {'agriculture': 1.}, {'agriculture': 0.}]
+    batch = model.run_batch(policies)
+    assert batch.tolist() == [model.run(policy) for policy in policies]
+    assert batch[2] < batch[0] < batch[1]
+
+
+def test_calibrate():
+    """ Calibration gives a growing epidemic starting from the case data """
+    model = seir_model.SEIRModel.calibrate('India', 1.38e9)
+    assert model.beta * model.infectious_days > 1
+    assert np.isclose(model.initial_state.sum(), 1.38e9)
+    with pytest.raises(KeyError):
+        seir_model.SEIRModel.calibrate('Atlantis', 1e6)
@@ -2,7 +2,10 @@
 Test economic model
 """
 
+import numpy as np
+
 from help_project.src.economic_model.models.basic_lockdown_model import EconomicLockdownModel
+from help_project.src.economic_model.utils import gva_data
 
 
 def test_economic_model():
@@ -23,3 +26,99 @@ def test_economic_model():
         economic_output = True
 
     assert economic_output
+
+
+def reference_economic_vector(lockdown_vector):
+    """
+    per sector computation of the adjusted GVAs, as a reference
+    """
+    gva = gva_data.BaseGVA()
+    mapping_dict = {}
+    for _, row in gva.get_sector_mapping().dropna().iterrows():
+        mapping_dict.setdefault(row['sector'], []).append(
+            row['lockdown_sector'])
+    baseline_gva = gva.get_gvas()
+    adjusted_gva = {}
+    for key, sectors in mapping_dict.items():
+        if key not in baseline_gva:
+            continue
+        weights = [lockdown_vector[sector] for sector in sectors
+                   if sector in lockdown_vector]
+        adjusted_gva[key] = baseline_gva[key] * (
+            np.mean(weights) if weights else 1)
+    return adjusted_gva
+
+
+def test_economic_vector_matches_reference():
+    """
+    test that the matrix based model gives the per sector results
+    """
+    lockdown_vector = {"agriculture": 0.2, "chemical": 0.5,
+                       "manufacturing": 0.9, "telecom": 0.1}
+    economic_vector = EconomicLockdownModel(
+        lockdown_vector=lockdown_vector).get_economic_vector()
+    expected = reference_economic_vector(lockdown_vector)
+    assert list(economic_vector.keys()) == list(expected.keys())
+    assert np.allclose(list(economic_vector.values()), list(expected.values()))
+
+
+def test_economic_matrix_batch():
+    """
+    test that each row of the batch matches the single vector path
+    """
+    model = EconomicLockdownModel()
+    rng = np.random.RandomState(0)
+    lockdown_matrix = rng.random_sample(
+        (5, len(model.sector_mapping.lockdown_sectors)))
+    lockdown_matrix[0, :3] = np.nan
+    adjusted = model.get_economic_matrix(lockdown_matrix)
+    assert adjusted.shape == (5, len(model.sector_mapping.sectors))
+    for row, values in zip(lockdown_matrix, adjusted):
+        lockdown_vector = {
+            sector: value for sector, value in zip(
+                model.sector_mapping.lockdown_sectors, row)
+            if not np.isnan(value)}
+        expected = reference_economic_vector(lockdown_vector)
+        assert np.allclose(values, list(expected.values()))
+
+
+def test_daily_impact():
+    """
+    test that each day of the timelines matches the static model
+    """
+    model = EconomicLockdownModel()
+    rng = np.random.RandomState(0)
+    focus_areas = ['media', 'unknown'] + model.sector_mapping.lockdown_sectors[::-1]
+    timelines = rng.random_sample((3, 10, len(focus_areas)))
+    impact = model.get_daily_impact(timelines, focus_areas)
+    assert impact.loss.shape == (3, 10, len(model.sector_mapping.sectors))
+
+    columns = [focus_areas.index(sector)
+               for sector in model.sector_mapping.lockdown_sectors]
+    expected = model.get_economic_matrix(timelines[2, 4, columns][None])[0] / 365
+    assert np.allclose(impact.gva[2, 4], expected)
+    assert np.allclose(impact.loss, model.sector_mapping.baseline / 365 - impact.gva)
+    assert np.allclose(impact.cumulative_loss[:, -1], impact.loss.sum(axis=1))
+
+
+def test_focus_area_names_are_stripped():
+    """
+    test that lockdown sectors match focus areas despite stray whitespace
+    """
+    mapping = EconomicLockdownModel().sector_mapping
+    counts = mapping.focus_area_counts(
+        [sector.strip() for sector in mapping.lockdown_sectors])
+    assert np.array_equal(counts, mapping.counts)
+
+
+def test_run_strategy():
+    """
+    test the total loss of a strategy of the exit strategy store
+    """
+    model = EconomicLockdownModel()
+    loss = model.run({'strategy': '1_ind'})
+    store = model.strategy_store
+    impact = model.get_daily_impact(store.get(strategies=['1_ind']),
+                                    store.focus_areas)
+    assert loss > 0
+    assert np.isclose(loss, impact.loss.sum())
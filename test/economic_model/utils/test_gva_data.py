@@ -0,0 +1,64 @@
+"""
+Test the GVA data loading
+"""
+import os
+import shutil
+
+import pandas as pd
+
+from help_project.src.economic_model.utils import gva_data
+
+
+def test_dataset_shared():
+    """
+    test that the dataset is only loaded once per process
+    """
+    assert gva_data.BaseGVA().dataset is gva_data.BaseGVA().dataset
+
+
+def test_dataset_matches_csv():
+    """
+    test that the loaded data matches a direct read of the CSVs
+    """
+    gva = gva_data.BaseGVA()
+    gva_df = pd.read_csv(gva_data.GVA_PATH)
+    gva_df = gva_df.loc[~gva_df['2019'].isna()].set_index("Industry")
+    assert gva.get_gvas() == gva_df['2019'].to_dict()
+    mapping_df = pd.read_csv(gva_data.MAPPING_PATH)
+    pd.testing.assert_frame_equal(gva.get_sector_mapping(), mapping_df)
+
+
+def test_binary_rebuilt_when_source_changes(tmp_path):
+    """
+    test that the binary file is used until the CSV changes
+    """
+    gva_path = str(tmp_path / "gva_data.csv")
+    mapping_path = str(tmp_path / "sector_mapping.csv")
+    binary_path = str(tmp_path / "gva_data.npz")
+    shutil.copy(gva_data.GVA_PATH, gva_path)
+    shutil.copy(gva_data.MAPPING_PATH, mapping_path)
+
+    dataset = gva_data.load_dataset(gva_path, mapping_path, binary_path)
+    assert os.path.exists(binary_path)
+    cached = gva_data.load_dataset(gva_path, mapping_path, binary_path)
+    assert cached.gva_mapping() == dataset.gva_mapping()
+
+    with open(mapping_path, "a") as mapping_file:
+        mapping_file.write("new_sector,Construction\n")
+    rebuilt = gva_data.load_dataset(gva_path, mapping_path, binary_path)
+    assert "new_sector" in rebuilt.lockdown_sectors.tolist()
+    assert "new_sector" not in dataset.lockdown_sectors.tolist()
+
+
+def test_binary_written_without_leftovers(tmp_path):
+    """
+    test that rewriting the binary file leaves no temporary file behind
+    """
+    binary_path = str(tmp_path / "gva_data.npz")
+    dataset = gva_data.load_dataset(binary_path=None)
+    sources = [gva_data.GVA_PATH, gva_data.MAPPING_PATH]
+    for _ in range(2):
+        dataset.to_binary(binary_path, sources)
+    assert os.listdir(str(tmp_path)) == ["gva_data.npz"]
+    cached = gva_data.GVADataset.from_binary(binary_path, sources)
+    assert cached.gva_mapping() == dataset.gva_mapping()
@@ -0,0 +1,31 @@
+"""
+Test for the ELT of exit strategy files
+"""
+
+from os.path import dirname, join
+import numpy as np
+import pandas as pd
+from help_project.src.exitstrategies.data_elt import DataELT
+
+
+def test_expanded_matches_reference_output():
+    reference_path = join(dirname(__file__), "output", "1_ind_output.csv")
+    reference_df = pd.read_csv(reference_path, index_col=0)
+
+    strat_df = DataELT().extract_data()["1_ind"]
+
+    assert strat_df.shape == reference_df.shape
+    assert list(strat_df.columns) == list(reference_df.columns)
+    assert np.allclose(strat_df.to_numpy(), reference_df.to_numpy())
+
+
+def test_compact_form_expands_to_daily_form():
+    data_elt = DataELT()
+    strat_df = data_elt.extract_data()["1_ind"]
+    compact_df = data_elt.extract_data(expand=False)["1_ind"]
+
+    # Each day takes the levels of the latest breakpoint on or before it
+    days = np.arange(strat_df.shape[0])
+    rows = np.searchsorted(compact_df.index.to_numpy(), days, side="right") - 1
+    assert list(compact_df.columns) == list(strat_df.columns)
+    assert np.array_equal(compact_df.to_numpy()[rows], strat_df.to_numpy())
@@ -0,0 +1,73 @@
+"""
+Test for the exit strategy store
+"""
+
+import os
+import shutil
+from os.path import dirname, join
+import numpy as np
+from help_project.src.exitstrategies.data_elt import DataELT
+from help_project.src.exitstrategies.strategy_store import StrategyStore
+
+SOURCE_FILE = join(dirname(dirname(dirname(__file__))), "src", "exitstrategies", "data", "1_ind.csv")
+
+
+def make_folder(tmp_path):
+    shutil.copy(SOURCE_FILE, str(tmp_path / "a.csv"))
+    with open(str(tmp_path / "b.csv"), "w") as strat_file:
+        strat_file.write("focus_area,2020_03_10,2020_03_20\nagriculture,0.5,0.2\nnew_area,0,1\n")
+    return str(tmp_path)
+
+
+def test_tensor_matches_extract_data(tmp_path):
+    data_folder = make_folder(tmp_path)
+    store = StrategyStore(data_folder)
+    strat_dict = DataELT(data_folder).extract_data()
+
+    assert store.names == ["a", "b"]
+    assert store.tensor.shape == (2, 79, 29)
+    for strat_id, strat_df in strat_dict.items():
+        frame = store.get_frames(strategies=[strat_id])[strat_id]
+        assert np.array_equal(frame.to_numpy(), strat_df.to_numpy())
+        assert list(frame.index) == list(strat_df.index)
+
+    # Shorter strategies keep their last levels, missing focus areas are NaN
+    assert np.all(store.tensor[1, 20:, 0] == 0.2)
+    assert np.all(np.isnan(store.tensor[1, :, 1]))
+
+
+def test_slices_are_views(tmp_path):
+    store = StrategyStore(make_folder(tmp_path))
+    sliced = store.get(start_day=10, end_day=20, strategies=["b"])
+    assert sliced.shape == (1, 10, 29)
+    assert np.shares_memory(sliced, store.tensor)
+
+
+def test_refresh_only_reloads_changed_files(tmp_path):
+    data_folder = make_folder(tmp_path)
+    store = StrategyStore(data_folder)
+    assert store.refresh() == []
+
+    file_path = join(data_folder, "b.csv")
+    with open(file_path, "w") as strat_file:
+        strat_file.write("focus_area,2020_03_10\nagriculture,0.7\n")
+    stat = os.stat(file_path)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert store.refresh() == ["b"]
+    assert np.all(store.get(strategies=["b"])[0, 10:, 0] == 0.7)
+
+
+def test_store_from_arrays_does_not_reload(tmp_path):
+    data_folder = make_folder(tmp_path)
+    loaded = StrategyStore(data_folder)
+    store = StrategyStore.from_arrays(
+        loaded.names, loaded.focus_areas, loaded.tensor,
+        [loaded.n_days[name] for name in loaded.names], data_folder)
+    assert store.refresh() == []
+    assert store.tensor is loaded.tensor
+
+    frame = store.get_frames(strategies=["b"])["b"]
+    expected = loaded.get_frames(strategies=["b"])["b"]
+    assert sorted(frame.columns) == sorted(expected.columns)
+    assert np.array_equal(frame[expected.columns].to_numpy(), expected.to_numpy())
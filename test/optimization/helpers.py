@@ -0,0 +1,35 @@
+"""Mock models and loss functions shared by the optimization tests."""
+from help_project.src.optimization import loss_function
+
+
+class CountingModel():
+    """Mock model returning output(policy) and counting how often it runs."""
+
+    def __init__(self, output):
+        self.output = output
+        self.calls = 0
+
+    def run(self, policy):
+        self.calls += 1
+        return self.output(policy)
+
+
+class WeightedLoss(loss_function.LossFunction):
+    """Weighted Loss."""
+
+    def __init__(self, health_weight=1, economic_weight=1):
+        self.health_weight = health_weight
+        self.economic_weight = economic_weight
+
+    def compute(self, health_output, economic_output):
+        """Compute the loss for a given health and economic output."""
+        return (self.health_weight * health_output +
+                self.economic_weight * economic_output)
+
+
+class MultiLoss(loss_function.LossFunction):
+    """Multi objective Loss."""
+
+    def compute(self, health_output, economic_output):
+        """Compute the loss for a given health and economic output."""
+        return (health_output, economic_output)
@@ -0,0 +1,127 @@
+from help_project.src.optimization import checkpoint
+from help_project.src.optimization import lockdown_config
+from help_project.src.optimization import nsga
+from help_project.src.optimization import optimizer
+from help_project.test.optimization.helpers import CountingModel, MultiLoss
+
+
+def health(policy):
+    """Output of the mock health model."""
+    return policy['x'] + policy['y']
+
+
+def economic(policy):
+    """Output of the mock economic model."""
+    return -policy['x'] + policy['y']
+
+
+class Crash(Exception):
+    """Raised to simulate a crash."""
+
+
+class CrashingModel(CountingModel):
+    """Mock model crashing after a number of calls."""
+
+    def __init__(self, output, crash_after=None):
+        super().__init__(output)
+        self.crash_after = crash_after
+
+    def run(self, policy):
+        if self.crash_after is not None and self.calls >= self.crash_after:
+            raise Crash()
+        return super().run(policy)
+
+
+def make_config():
+    """Config with both Options and Range parameters."""
+    return lockdown_config.LockdownConfig(
+        x=lockdown_config.Options(list(range(10))),
+        y=lockdown_config.Range(0, 1),
+    )
+
+
+def run_with_crash(make_optimizer, tmp_path, crash_after, **kwargs):
+    """Run until the model crashes, then resume from the checkpoint."""
+    path = str(tmp_path / 'run.ckpt')
+    try:
+        make_optimizer().optimize(
+            CrashingModel(health, crash_after=crash_after),
+            CountingModel(economic),
+            checkpoint=checkpoint.Checkpoint(path, every=7), **kwargs)
+    except Crash:
+        pass
+    health_model = CountingModel(health)
+    solution = make_optimizer().optimize(
+        health_model, CountingModel(economic),
+        checkpoint=checkpoint.Checkpoint(path, every=7), **kwargs)
+    return solution, health_model.calls
+
+
+def test_streaming_yields_every_step():
+    """Test that each evaluation is streamed with the frontier."""
+    opt = optimizer.ExhaustiveSearch(make_config(), MultiLoss(), seed=0)
+    steps = list(opt.optimize_iter(CountingModel(health),
+                                   CountingModel(economic)))
+    assert [evaluation.step for evaluation in steps] == list(range(1, 11))
+    assert steps[-1].frontier.frontier == optimizer.ExhaustiveSearch(
+        make_config(), MultiLoss(), seed=0).optimize(
+            CountingModel(health), CountingModel(economic))
+
+
+def test_exhaustive_search_resume(tmp_path):
+    """Test that a resumed run gives the same result without re-evaluating."""
+    def make_optimizer():
+        return optimizer.ExhaustiveSearch(make_config(), MultiLoss(), seed=0)
+
+    expected = make_optimizer().optimize(CountingModel(health),
+                                         CountingModel(economic))
+    solution, calls = run_with_crash(make_optimizer, tmp_path, crash_after=8)
+    assert solution == expected
+    assert calls == 2
+
+
+def test_exhaustive_search_batched_resume(tmp_path):
+    """Test resuming a run that evaluates the policies in batches."""
+    def make_optimizer():
+        return optimizer.ExhaustiveSearch(make_config(), MultiLoss(), seed=0)
+
+    expected = make_optimizer().optimize(CountingModel(health),
+                                         CountingModel(economic))
+    solution, calls = run_with_crash(make_optimizer, tmp_path, crash_after=8,
+                                     batch_size=4)
+    assert solution == expected
+    assert calls == 2
+
+
+def test_nsga_parallel_resume(tmp_path):
+    """Test resuming an optimizer that depends on records, in parallel."""
+    def make_optimizer():
+        return nsga.NSGA2(make_config(), MultiLoss(), population_size=10,
+                          seed=0)
+
+    expected = make_optimizer().optimize(
+        CountingModel(health), CountingModel(economic), n_steps=60)
+    solution, calls = run_with_crash(
+        make_optimizer, tmp_path, crash_after=33, n_steps=60,
+        executor='thread', n_workers=2, max_in_flight=4)
+    assert solution == expected
+    assert calls <= 60 - 28
+
+
+def test_resume_twice_after_torn_write(tmp_path):
+    """Test that records logged after a torn record can be read back."""
+    path = str(tmp_path / 'run.ckpt')
+    log = checkpoint.Checkpoint(path)
+    log.log_evaluation({'x': 0}, 0.)
+    log.close()
+    with open(path, 'ab') as log_file:
+        log_file.write(b'\x80\x04\x95torn')
+
+    for resume in range(1, 3):
+        log = checkpoint.Checkpoint(path)
+        evaluations, _ = log.load()
+        assert len(evaluations) == resume
+        log.log_evaluation({'x': resume}, float(resume))
+        log.close()
+    evaluations, _ = checkpoint.Checkpoint(path).load()
+    assert evaluations == [({'x': 0}, 0.), ({'x': 1}, 1.), ({'x': 2}, 2.)]
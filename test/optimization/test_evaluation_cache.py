@@ -0,0 +1,127 @@
+import os
+
+from help_project.src.optimization import evaluation_cache
+from help_project.src.optimization import lockdown_config
+from help_project.src.optimization import optimizer
+from help_project.test.optimization.helpers import CountingModel, WeightedLoss
+
+
+def strategy(policy):
+    """Output of the mock models."""
+    return policy['strategy']
+
+
+def test_canonical_key_ignores_order():
+    """Test that equal policies get equal keys."""
+    key_a = lockdown_config.canonical_key({'a': 1, 'b': [1, 2]})
+    key_b = lockdown_config.canonical_key({'b': [1, 2], 'a': 1})
+    assert key_a == key_b
+    assert hash(key_a) == hash(key_b)
+
+
+def test_cache_hits_and_misses():
+    """Test that the counters reflect the lookups."""
+    cache = evaluation_cache.EvaluationCache()
+    assert cache.get({'a': 1}) is None
+    cache.put({'a': 1}, (1, 2))
+    assert cache.get({'a': 1}) == (1, 2)
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_cache_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = evaluation_cache.EvaluationCache(maxsize=2)
+    cache.put({'a': 1}, 1)
+    cache.put({'a': 2}, 2)
+    cache.get({'a': 1})
+    cache.put({'a': 3}, 3)
+    assert {'a': 1} in cache
+    assert {'a': 2} not in cache
+    assert len(cache) == 2
+
+
+def test_cache_persistence(tmp_path):
+    """Test that a saved cache is loaded back."""
+    path = str(tmp_path / 'cache.pkl')
+    cache = evaluation_cache.EvaluationCache(path=path)
+    cache.put({'a': 1}, (1, 2))
+    cache.save()
+    assert evaluation_cache.EvaluationCache(path=path).get({'a': 1}) == (1, 2)
+
+
+def test_cache_save_leaves_no_temporary_file(tmp_path):
+    """Test that saving twice only leaves the cache file behind."""
+    path = str(tmp_path / 'cache.pkl')
+    cache = evaluation_cache.EvaluationCache(path=path)
+    for value in range(2):
+        cache.put({'a': 1}, value)
+        cache.save()
+    assert os.listdir(str(tmp_path)) == ['cache.pkl']
+    assert evaluation_cache.EvaluationCache(path=path).get({'a': 1}) == 1
+
+
+def test_optimize_with_cache_skips_repeated_policies(tmp_path):
+    """Test that random search only evaluates each policy once."""
+    path = str(tmp_path / 'cache.pkl')
+    health_model = CountingModel(strategy)
+    opt = optimizer.RandomSearch(
+        config=lockdown_config.LockdownConfig(
+            strategy=lockdown_config.Options([1, 2, 3]),
+        ),
+        loss=WeightedLoss(),
+    )
+    cache = evaluation_cache.EvaluationCache(path=path)
+    solution = opt.optimize(health_model, CountingModel(strategy), n_steps=50,
+                            cache=cache)
+    assert solution == [({'strategy': 1}, 2)]
+    assert health_model.calls <= 3
+    assert cache.hits + cache.misses == 50
+
+    restarted_model = CountingModel(strategy)
+    opt.optimize(restarted_model, CountingModel(strategy), n_steps=50,
+                 cache=evaluation_cache.EvaluationCache(path=path))
+    assert restarted_model.calls + health_model.calls <= 3
+
+
+def test_optimize_parallel_with_cache():
+    """Test that policies in flight are not submitted twice."""
+    health_model = CountingModel(strategy)
+    opt = optimizer.RandomSearch(
+        config=lockdown_config.LockdownConfig(
+            strategy=lockdown_config.Options([1, 2, 3]),
+        ),
+        loss=WeightedLoss(),
+    )
+    solution = opt.optimize(health_model, CountingModel(strategy), n_steps=50,
+                            executor='thread', n_workers=2,
+                            cache=evaluation_cache.EvaluationCache())
+    assert solution == [({'strategy': 1}, 2)]
+    assert health_model.calls <= 3
+
+
+def test_optimize_batches_with_cache():
+    """Test that batched evaluation only runs the models on cache misses."""
+    def make_optimizer():
+        return optimizer.ExhaustiveSearch(
+            lockdown_config.LockdownConfig(
+                strategy=lockdown_config.Options([1, 2, 3]),
+                other=lockdown_config.Options([0, 1]),
+            ),
+            loss=WeightedLoss(),
+        )
+
+    cache = evaluation_cache.EvaluationCache()
+    cache.put({'strategy': 1, 'other': 0}, (1, 1))
+    health_model = CountingModel(strategy)
+    expected = make_optimizer().optimize(health_model, CountingModel(strategy),
+                                         batch_size=4, cache=cache)
+    assert health_model.calls == 5
+    assert cache.stats()['hits'] == 1
+
+    cached_model = CountingModel(strategy)
+    solution = make_optimizer().optimize(cached_model, CountingModel(strategy),
+                                         batch_size=4, cache=cache)
+    assert solution == expected
+    assert cached_model.calls == 0
+    assert cache.stats()['hits'] == 7
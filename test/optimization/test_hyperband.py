@@ -0,0 +1,75 @@
+import pytest
+
+from help_project.src.optimization import checkpoint
+from help_project.src.optimization import evaluation_cache
+from help_project.src.optimization import hyperband
+from help_project.src.optimization import lockdown_config
+from help_project.test.optimization.helpers import WeightedLoss
+
+
+class FidelityModel():
+    """Model whose low fidelity runs are biased but rank policies alike."""
+    def __init__(self):
+        self.calls = []
+
+    def run(self, policy, fidelity=None):
+        self.calls.append(fidelity)
+        return (policy['x'] - 0.3) ** 2 + (1 - fidelity) * 0.05
+
+
+class ZeroModel():
+    """Model with a constant output."""
+    def run(self, policy, fidelity=None):
+        return 0
+
+
+def make_config():
+    return lockdown_config.LockdownConfig(x=lockdown_config.Range(0, 1))
+
+
+def test_successive_halving_rungs():
+    """Test that the best policies are promoted up to full fidelity."""
+    opt = hyperband.SuccessiveHalving(make_config(), WeightedLoss(),
+                                      n_policies=27, eta=3, seed=0)
+    model = FidelityModel()
+    steps = list(opt.optimize_iter(model, ZeroModel(), n_steps=40))
+    assert model.calls == [1 / 27] * 27 + [1 / 9] * 9 + [1 / 3] * 3 + [1]
+    assert [step.fidelity for step in steps] == model.calls
+
+    # Only the full fidelity evaluation reaches the frontier, and it is the
+    # best of the sampled policies.
+    sampled = [step.policy for step in steps[:27]]
+    best = min(sampled, key=lambda policy: abs(policy['x'] - 0.3))
+    assert [policy for policy, _ in steps[-1].frontier.frontier] == [best]
+    assert sum(model.calls) == 4
+
+
+def test_hyperband_brackets():
+    """Test the sizes of the brackets and that they are cycled through."""
+    opt = hyperband.Hyperband(make_config(), WeightedLoss(), eta=3,
+                              min_fidelity=1 / 27, seed=0)
+    assert opt.brackets == [(27, 4), (12, 3), (6, 2), (4, 1)]
+    model = FidelityModel()
+    steps = list(opt.optimize_iter(model, ZeroModel(), n_steps=40 + 16 + 8 + 4))
+    assert opt.n_brackets == 4
+    assert model.calls[40:56] == [1 / 9] * 12 + [1 / 3] * 4
+    assert len(steps[-1].frontier) >= 1
+
+
+def test_cache_is_keyed_by_fidelity():
+    """Test that a policy is evaluated once per fidelity."""
+    config = lockdown_config.LockdownConfig(x=lockdown_config.Options([0.5]))
+    opt = hyperband.SuccessiveHalving(config, WeightedLoss(), n_policies=9,
+                                      eta=3)
+    model = FidelityModel()
+    cache = evaluation_cache.EvaluationCache()
+    opt.optimize(model, ZeroModel(), n_steps=13, cache=cache)
+    assert model.calls == [1 / 9, 1 / 3, 1]
+
+
+def test_checkpoints_are_rejected(tmp_path):
+    """Test that multi-fidelity runs can not be checkpointed."""
+    opt = hyperband.SuccessiveHalving(make_config(), WeightedLoss())
+    with pytest.raises(ValueError):
+        opt.optimize(FidelityModel(), ZeroModel(), n_steps=5,
+                     checkpoint=checkpoint.Checkpoint(str(tmp_path / 'log')))
@@ -0,0 +1,118 @@
+import random
+
+import pytest
+
+from help_project.src.optimization import lockdown_config
+from help_project.src.optimization import loss_function
+from help_project.src.optimization import optimizer
+from help_project.src.optimization import stopping
+from help_project.test.optimization.helpers import MultiLoss
+
+
+def exact_hypervolume_2d(losses, reference):
+    """Hypervolume of the losses within the reference, from scratch."""
+    points = sorted((min(a, reference[0]), min(b, reference[1]))
+                    for a, b in losses)
+    volume, best_second = 0., reference[1]
+    for i, (first, second) in enumerate(points):
+        next_first = points[i + 1][0] if i + 1 < len(points) else reference[0]
+        best_second = min(best_second, second)
+        volume += (next_first - first) * (reference[1] - best_second)
+    return volume
+
+
+def exact_hypervolume_3d(losses, reference):
+    """Hypervolume of 3 objective losses, summed over slabs of the third."""
+    losses = sorted(losses, key=lambda loss: loss[2])
+    volume = 0.
+    for i, loss in enumerate(losses):
+        top = losses[i + 1][2] if i + 1 < len(losses) else reference[2]
+        area = exact_hypervolume_2d([other[:2] for other in losses[:i + 1]],
+                                    reference[:2])
+        volume += (min(top, reference[2]) - min(loss[2], reference[2])) * area
+    return volume
+
+
+def test_hypervolume_2d_is_exact():
+    """Test the incremental hypervolume against a full computation."""
+    rng = random.Random(0)
+    frontier = loss_function.ParetoFrontier(reference=(1., 1.))
+    losses = []
+    for i in range(300):
+        loss = (rng.random() * 1.2, rng.random() * 1.2)
+        losses.append(loss)
+        frontier.update(i, loss)
+        assert frontier.hypervolume == pytest.approx(
+            exact_hypervolume_2d(losses, (1., 1.)))
+
+
+def test_hypervolume_3d_estimate():
+    """Test the Monte Carlo estimate against an exact computation."""
+    rng = random.Random(1)
+    frontier = loss_function.ParetoFrontier(reference=(1., 1., 1.))
+    losses = [tuple(rng.random() for _ in range(3)) for _ in range(200)]
+    frontier.update_many(range(200), losses)
+    assert frontier.hypervolume == pytest.approx(
+        exact_hypervolume_3d(losses, (1., 1., 1.)), rel=0.05)
+
+
+def test_hypervolume_scalar_and_missing():
+    """Test single objective hypervolume and frontiers without reference."""
+    frontier = loss_function.ParetoFrontier(reference=10)
+    assert frontier.hypervolume == 0.
+    frontier.update('a', 7)
+    frontier.update('b', 4)
+    assert frontier.hypervolume == 6.
+    assert loss_function.ParetoFrontier().hypervolume is None
+
+
+class QuadraticModel():
+    """Model returning the distance of x to a target."""
+    def __init__(self, target):
+        self.target = target
+
+    def run(self, policy):
+        return abs(policy['x'] - self.target)
+
+
+def run_until(criteria, n_steps=2000):
+    config = lockdown_config.LockdownConfig(x=lockdown_config.Range(0, 1))
+    opt = optimizer.RandomSearch(config, MultiLoss(), seed=0)
+    frontier = loss_function.ParetoFrontier(reference=(1., 1.))
+    steps = list(opt.optimize_iter(QuadraticModel(0), QuadraticModel(1),
+                                   n_steps, frontier=frontier,
+                                   stopping=criteria))
+    return steps, frontier
+
+
+def test_target_hypervolume():
+    """Test that the run stops once the target is reached."""
+    criterion = stopping.TargetHypervolume(0.45)
+    steps, frontier = run_until([criterion])
+    assert criterion.stopped
+    assert frontier.hypervolume >= 0.45
+    assert len(steps) < 2000
+
+
+def test_stagnation():
+    """Test that the run stops when the hypervolume stops improving."""
+    criterion = stopping.Stagnation(window=50, tolerance=1e-3)
+    steps, _ = run_until([criterion, stopping.WallClock(60)])
+    assert criterion.stopped
+    assert 50 < len(steps) < 2000
+
+
+def test_wall_clock():
+    """Test that a spent time budget stops the run at the first step."""
+    criterion = stopping.WallClock(0)
+    steps, _ = run_until([criterion])
+    assert criterion.stopped and len(steps) == 1
+
+
+def test_hypervolume_criteria_need_reference():
+    """Test that a frontier without reference point is rejected."""
+    config = lockdown_config.LockdownConfig(x=lockdown_config.Range(0, 1))
+    opt = optimizer.RandomSearch(config, MultiLoss(), seed=0)
+    with pytest.raises(ValueError):
+        opt.optimize(QuadraticModel(0), QuadraticModel(1), n_steps=5,
+                     stopping=[stopping.TargetHypervolume(1)])
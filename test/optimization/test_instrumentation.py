@@ -0,0 +1,77 @@
+import json
+import tracemalloc
+
+from help_project.src.optimization import instrumentation
+from help_project.src.optimization import lockdown_config
+from help_project.src.optimization import optimizer
+from help_project.test.optimization.helpers import CountingModel, MultiLoss
+
+
+def strategy(policy):
+    """Output of the mock health model."""
+    return policy['strategy']
+
+
+def negated_strategy(policy):
+    """Output of the mock economic model."""
+    return -policy['strategy']
+
+
+def make_optimizer():
+    """Exhaustive search over 10 strategies."""
+    return optimizer.ExhaustiveSearch(
+        config=lockdown_config.LockdownConfig(
+            strategy=lockdown_config.Options(list(range(10))),
+        ),
+        loss=MultiLoss(),
+    )
+
+
+def test_histogram():
+    """Test the histogram summary."""
+    histogram = instrumentation.Histogram()
+    for seconds in [1e-6, 2e-6, 3e-6, 1e-3]:
+        histogram.add(seconds)
+    summary = histogram.to_dict()
+    assert summary['count'] == 4
+    assert summary['max'] == 1e-3
+    assert 2e-6 <= summary['p50'] <= 4e-6
+    assert summary['p99'] == 1e-3
+
+
+def test_stages_timed_and_exported(tmp_path):
+    """Test that every stage is timed and the events are exported."""
+    path = str(tmp_path / 'metrics.jsonl')
+    exporter = instrumentation.JsonLinesExporter(path)
+    instruments = instrumentation.Instrumentation(
+        profile=['health_model'], trace_memory=['frontier_update'],
+        callbacks=[exporter])
+    make_optimizer().optimize(CountingModel(strategy),
+                              CountingModel(negated_strategy),
+                              instrumentation=instruments)
+    exporter.close()
+
+    summary = instruments.summary()
+    for stage in instrumentation.STAGES:
+        assert summary['stages'][stage]['count'] >= 10
+    assert summary['counters']['steps'] == 10
+    assert summary['counters']['evaluations'] == 10
+    assert summary['memory']['frontier_update']['calls'] == 10
+    assert instruments.profile_stats('health_model').total_calls > 0
+    assert not tracemalloc.is_tracing()
+
+    with open(path) as metrics_file:
+        events = [json.loads(line) for line in metrics_file]
+    assert [event['event'] for event in events] == ['step'] * 10 + ['summary']
+    assert events[-1]['counters']['steps'] == 10
+
+
+def test_model_stages_timed_in_pool():
+    """Test that model runs on a thread pool are timed as well."""
+    instruments = instrumentation.Instrumentation()
+    solution = make_optimizer().optimize(
+        CountingModel(strategy), CountingModel(negated_strategy),
+        executor='thread', n_workers=2, instrumentation=instruments)
+    assert len(solution) == 10
+    assert instruments.timers['health_model'].count == 10
+    assert instruments.timers['economic_model'].count == 10
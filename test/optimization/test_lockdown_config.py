@@ -1,3 +1,9 @@
+import copy
+import pickle
+
+import numpy as np
+import pytest
+
 from help_project.src.optimization import lockdown_config
 
 
@@ -14,3 +20,109 @@ def test_kwargs_sample():
     assert sample_kwargs['b'] == 5
     assert sample_kwargs['c'] == 'param'
     assert 1 <= sample_kwargs['x'] <= 10
+
+
+def make_config():
+    """Config with every kind of parameter."""
+    return lockdown_config.LockdownConfig(
+        a=lockdown_config.Options([1, 2, 3]),
+        b=5,
+        c='param',
+        x=lockdown_config.Range(1, 10),
+    )
+
+
+def test_sample_batch_columns():
+    """Test that every sampling method returns valid columns."""
+    for method in ['random', 'lhs', 'halton']:
+        batch = make_config().sample_batch(100, method, seed=0)
+        assert set(batch) == {'a', 'b', 'c', 'x'}
+        assert all(len(column) == 100 for column in batch.values())
+        assert set(batch['a'].tolist()) == {1, 2, 3}
+        assert set(batch['b'].tolist()) == {5}
+        assert set(batch['c'].tolist()) == {'param'}
+        assert np.all((batch['x'] >= 1) & (batch['x'] <= 10))
+
+
+def test_sample_batch_seeded():
+    """Test that a seed makes the batch reproducible."""
+    config = make_config()
+    first = config.sample_batch(10, 'lhs', seed=1)
+    second = config.sample_batch(10, 'lhs', seed=1)
+    assert all(np.array_equal(first[name], second[name]) for name in first)
+
+
+def test_latin_hypercube_strata():
+    """Test that each slice of the range gets exactly one sample."""
+    batch = make_config().sample_batch(50, 'lhs', seed=0)
+    strata = np.floor((batch['x'] - 1) / 9 * 50).astype(int)
+    assert sorted(strata.tolist()) == list(range(50))
+
+
+def test_halton_sequence():
+    """Test the first points and the continuation of the sequence."""
+    config = lockdown_config.LockdownConfig(x=lockdown_config.Range(0, 1),
+                                            y=lockdown_config.Range(0, 1))
+    batch = config.sample_batch(4, 'halton')
+    assert np.allclose(batch['x'], [1 / 2, 1 / 4, 3 / 4, 1 / 8])
+    assert np.allclose(batch['y'], [1 / 3, 2 / 3, 1 / 9, 4 / 9])
+    following = config.sample_batch(2, 'halton', start=2)
+    assert np.allclose(following['x'], [3 / 4, 1 / 8])
+
+
+def test_policies_from_batch():
+    """Test the conversion of columns into policies."""
+    batch = make_config().sample_batch(3, seed=0)
+    policies = lockdown_config.LockdownConfig.policies_from_batch(batch)
+    assert len(policies) == 3
+    assert policies[0]['c'] == 'param'
+    assert isinstance(policies[0]['x'], float)
+
+
+def test_sample_batch_mixed_options():
+    """Test that options of different types keep their type."""
+    config = lockdown_config.LockdownConfig(
+        a=lockdown_config.Options([1, 'closed', 0.5]))
+    batch = config.sample_batch(30, seed=0)
+    policies = lockdown_config.LockdownConfig.policies_from_batch(batch)
+    assert {policy['a'] for policy in policies} == {1, 'closed', 0.5}
+    assert all(type(policy['a']) in (int, str, float) for policy in policies)
+    assert {type(policy['a']) for policy in policies
+            if policy['a'] == 1} == {int}
+
+
+def test_policy_mapping():
+    """Test that policies behave as read-only dicts."""
+    policy = lockdown_config.LockdownConfig.generate_lockdown_policy(
+        {'a': 1, 'b': [1, 2]})
+    assert policy == {'a': 1, 'b': [1, 2]}
+    assert {'b': [1, 2], 'a': 1} == policy
+    assert policy != {'a': 2, 'b': [1, 2]}
+    assert dict(policy) == policy.to_dict()
+    assert list(policy) == ['a', 'b'] and 'a' in policy and 'c' not in policy
+    with pytest.raises(AttributeError):
+        policy.x = 1
+
+
+def test_policy_hash():
+    """Test that equal policies share a hash and a canonical key."""
+    first = lockdown_config.Policy.from_dict({'a': 1, 'b': 2.5})
+    second = lockdown_config.Policy.from_row(['b', 'a'], np.array([2.5, 1]))
+    assert first == second
+    assert hash(first) == hash(second)
+    assert len({first, second}) == 1
+    assert (lockdown_config.canonical_key(first) ==
+            lockdown_config.canonical_key({'a': 1, 'b': 2.5}))
+    assert first.names is lockdown_config.Policy.from_dict(
+        {'a': 3, 'b': 4}).names
+
+
+def test_policy_conversions():
+    """Test the NumPy row conversion and pickling."""
+    policy = lockdown_config.Policy.from_dict({'a': 1, 'b': 2.5})
+    assert np.array_equal(policy.to_row(), [1., 2.5])
+    assert lockdown_config.Policy.from_row(policy.names,
+                                           policy.to_row()) == policy
+    restored = pickle.loads(pickle.dumps(policy))
+    assert restored == policy and restored.names is policy.names
+    assert copy.deepcopy(policy) == policy
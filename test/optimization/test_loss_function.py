@@ -1,3 +1,7 @@
+import random
+
+import numpy as np
+
 from help_project.src.optimization import loss_function
 
 
@@ -47,3 +51,134 @@ def test_pareto_multi_objective_accumulate():
     pareto.update('b', [5, 4])
     assert pareto.frontier == [('a', [4, 5]),
                                ('b', [5, 4])]
+
+
+def reference_frontier(points, losses):
+    """Compute the frontier with a plain scan, as a reference."""
+    frontier = []
+    for point, loss in zip(points, losses):
+        if any(pareto_point == point or
+               loss_function.ParetoFrontier.dominate(pareto_loss, loss)
+               for pareto_point, pareto_loss in frontier):
+            continue
+        frontier = [(pareto_point, pareto_loss)
+                    for pareto_point, pareto_loss in frontier
+                    if not loss_function.ParetoFrontier.dominate(
+                        loss, pareto_loss)]
+        frontier.append((point, loss))
+    return frontier
+
+
+def test_pareto_equal_losses_kept():
+    """Test that different points with the same loss are both kept."""
+    pareto = loss_function.ParetoFrontier()
+    pareto.update('a', [4, 4])
+    pareto.update('b', [4, 4])
+    pareto.update('a', [3, 3])
+    assert pareto.frontier == [('a', [4, 4]), ('b', [4, 4])]
+
+
+def test_pareto_update_many_matches_reference():
+    """Test the indexed frontier against a plain scan for 1 to 4 objectives."""
+    rng = random.Random(0)
+    for n_objectives in [1, 2, 3, 4]:
+        points = list(range(500))
+        losses = [tuple(rng.randint(0, 20) for _ in range(n_objectives))
+                  for _ in points]
+        pareto = loss_function.ParetoFrontier()
+        pareto.update_many(points, losses)
+        assert pareto.frontier == reference_frontier(points, losses)
+        assert len(pareto) == len(pareto.frontier)
+
+
+def test_pareto_update_many_in_batches():
+    """Test bulk updates of a filled frontier against single updates."""
+    rng = random.Random(1)
+    for n_objectives in [1, 2, 3]:
+        points = list(range(500))
+        losses = [tuple(rng.randint(0, 20) for _ in range(n_objectives))
+                  for _ in points]
+        pareto = loss_function.ParetoFrontier()
+        sequential = loss_function.ParetoFrontier()
+        for start in range(0, len(points), 50):
+            batch = list(zip(points, losses))[start:start + 50]
+            dominated = [pareto.dominated(loss) for _, loss in batch]
+            added = sum(sequential.update(point, loss)
+                        for point, loss in batch)
+            assert pareto.update_many([point for point, _ in batch],
+                                      [loss for _, loss in batch]) == added
+            assert pareto.frontier == sequential.frontier
+            assert not any(point in dict(pareto.frontier)
+                           for (point, _), rejected in zip(batch, dominated)
+                           if rejected)
+        assert pareto.frontier == reference_frontier(points, losses)
+
+
+def test_pareto_dominated_query():
+    """Test the dominance query against the frontier."""
+    pareto = loss_function.ParetoFrontier()
+    pareto.update_many(['a', 'b'], [(1, 5), (5, 1)])
+    assert pareto.dominated((2, 6))
+    assert not pareto.dominated((2, 2))
+    assert not pareto.dominated((1, 5))
+
+
+def covered(archive, losses):
+    """Return whether every loss is within epsilon of an archived loss."""
+    archived = np.array([loss for _, loss in archive.frontier])
+    return all(np.any(np.all(archived < np.array(loss) + archive.epsilon,
+                             axis=1)) for loss in losses)
+
+
+def test_epsilon_archive_bounded_error():
+    """Test that every loss is covered by the archive within epsilon."""
+    rng = random.Random(0)
+    for n_objectives in [2, 3]:
+        losses = [tuple(rng.random() for _ in range(n_objectives))
+                  for _ in range(2000)]
+        archive = loss_function.EpsilonParetoArchive([0.05, 0.1, 0.1][:n_objectives])
+        archive.update_many(range(len(losses)), losses)
+        assert covered(archive, losses)
+
+        exact = loss_function.ParetoFrontier()
+        exact.update_many(range(len(losses)), losses)
+        assert len(archive) <= len(exact)
+        boxes = {tuple(np.floor(np.array(loss) / archive.epsilon).tolist())
+                 for _, loss in archive.frontier}
+        assert len(boxes) == len(archive)
+
+
+def test_epsilon_archive_box_representative():
+    """Test which point is kept within a box."""
+    archive = loss_function.EpsilonParetoArchive(1.)
+    assert archive.update('a', (0.5, 0.5))
+    assert archive.update('b', (0.1, 0.6))  # Closer to the corner
+    assert not archive.update('c', (0.5, 0.5))
+    assert archive.update('d', (0.05, 0.55))  # Dominates
+    assert not archive.dominated((0.05, 0.05))
+    assert archive.dominated((1.5, 1.5))
+    assert archive.frontier == [('d', (0.05, 0.55))]
+
+
+def test_epsilon_archive_capacity():
+    """Test that epsilon is coarsened to respect the capacity."""
+    rng = random.Random(1)
+    losses = [(x, 1 - x + rng.random() * 0.01) for x in
+              (rng.random() for _ in range(1000))]
+    archive = loss_function.EpsilonParetoArchive(0.001, capacity=20)
+    archive.update_many(range(len(losses)), losses)
+    assert len(archive) <= 20
+    assert np.all(archive.epsilon > 0.001)
+    assert covered(archive, losses)
+
+
+def test_epsilon_archive_merge():
+    """Test that merged archives cover the losses of both runs."""
+    rng = random.Random(2)
+    losses = [(rng.random(), rng.random()) for _ in range(500)]
+    first = loss_function.EpsilonParetoArchive(0.05)
+    second = loss_function.EpsilonParetoArchive(0.05)
+    first.update_many(range(250), losses[:250])
+    second.update_many(range(250, 500), losses[250:])
+    first.merge(second)
+    assert covered(first, losses)
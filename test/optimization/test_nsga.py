@@ -0,0 +1,75 @@
+import numpy as np
+
+from help_project.src.optimization import lockdown_config
+from help_project.src.optimization import nsga
+from help_project.test.optimization.helpers import MultiLoss
+
+
+class DistanceModel():
+    """Mock model returning the distance of x to a target, plus a penalty."""
+
+    def __init__(self, target):
+        self.target = target
+
+    def run(self, policy):
+        penalty = 0 if policy['mode'] == 'good' else 1
+        return abs(policy['x'] - self.target) + penalty
+
+
+def test_non_dominated_sort():
+    """Test that fronts are ranked correctly."""
+    losses = [[1, 5], [5, 1], [2, 6], [6, 6], [3, 3]]
+    assert list(nsga.non_dominated_sort(losses)) == [0, 0, 1, 2, 0]
+
+
+def test_crowding_distance():
+    """Test that boundary points get infinite distance."""
+    losses = np.array([[0, 4], [1, 3], [3, 1], [4, 0]])
+    distance = nsga.crowding_distance(losses, np.zeros(4, dtype=int))
+    assert np.isinf(distance[0]) and np.isinf(distance[3])
+    assert np.allclose(distance[1:3], [1.5, 1.5])
+
+
+def make_optimizer():
+    """Create an NSGA2 optimizer on a mixed Options and Range config."""
+    return nsga.NSGA2(
+        config=lockdown_config.LockdownConfig(
+            x=lockdown_config.Range(0, 1),
+            mode=lockdown_config.Options(['good', 'bad', 'worse']),
+            country='india',
+        ),
+        loss=MultiLoss(),
+        population_size=20,
+        seed=0,
+    )
+
+
+def test_nsga_finds_frontier():
+    """Test that the frontier converges to the good option."""
+    opt = make_optimizer()
+    solution = opt.optimize(DistanceModel(0), DistanceModel(1), n_steps=400)
+    assert opt.generation >= 19
+    assert all(policy['mode'] == 'good' for policy, _ in solution)
+    assert all(policy['country'] == 'india' for policy, _ in solution)
+    assert all(sum(loss) < 1.01 for _, loss in solution)
+
+
+def test_nsga_parallel_matches_sequential():
+    """Test that the thread pool waits for each generation to finish."""
+    sequential = make_optimizer().optimize(
+        DistanceModel(0), DistanceModel(1), n_steps=100)
+    parallel = make_optimizer().optimize(
+        DistanceModel(0), DistanceModel(1), n_steps=100,
+        executor='thread', n_workers=4, max_in_flight=8)
+    assert parallel == sequential
+
+
+def test_random_genomes_draw_options_uniformly():
+    """Test that the first and last options are as likely as the others."""
+    space = make_optimizer().space
+    genomes = space.random(3000, np.random.RandomState(0))
+    mode = genomes[:, space.names.index('mode')]
+    counts = np.bincount(mode.astype(int), minlength=3)
+    assert np.all(np.abs(counts - 1000) < 100)
+    x = genomes[:, space.names.index('x')]
+    assert np.all((0 <= x) & (x <= 1))
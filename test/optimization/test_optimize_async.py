@@ -0,0 +1,136 @@
+import asyncio
+import json
+
+from help_project.src.optimization import lockdown_config
+from help_project.src.optimization import optimizer
+from help_project.test.optimization.helpers import MultiLoss
+
+# asyncio.current_task is new in Python 3.7, Task.current_task was removed
+# in 3.9.
+current_task = getattr(asyncio, 'current_task', None) or getattr(
+    asyncio.Task, 'current_task')
+
+
+class StubModelServer():
+    """Local model server answering one JSON request per connection.
+
+    The reply to a policy is value_fn(policy), sent after a delay. The server
+    keeps track of how many requests it handles at the same time."""
+
+    def __init__(self, value_fn, delay=0.01, slow_first=0):
+        self.value_fn = value_fn
+        self.delay = delay
+        self.slow_first = slow_first
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self.server = None
+        self.handlers = set()
+
+    async def start(self):
+        """Start listening on a free local port."""
+        self.server = await asyncio.start_server(
+            self.handle, '127.0.0.1', 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Stop the server, cancelling the requests still being handled."""
+        self.server.close()
+        await self.server.wait_closed()
+        for handler in self.handlers:
+            handler.cancel()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+
+    async def handle(self, reader, writer):
+        """Answer a request."""
+        self.handlers.add(current_task())
+        self.requests += 1
+        slow = self.requests <= self.slow_first
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            policy = json.loads((await reader.readline()).decode())
+            await asyncio.sleep(1 if slow else self.delay)
+            writer.write((json.dumps(self.value_fn(policy)) + '\n').encode())
+            await writer.drain()
+        finally:
+            self.active -= 1
+            writer.close()
+
+
+class ClientModel():
+    """Model running the policy on a stub server."""
+
+    def __init__(self, port):
+        self.port = port
+
+    async def run(self, policy):
+        """Send the policy to the server and wait for the output."""
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        writer.write((json.dumps(policy.to_dict()) + '\n').encode())
+        output = json.loads((await reader.readline()).decode())
+        writer.close()
+        return output
+
+
+class SyncModel():
+    """Plain synchronous model."""
+
+    def run(self, policy):
+        return 6 - policy['strategy']
+
+
+def run(coroutine):
+    """Run a coroutine on a fresh event loop."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def make_optimizer():
+    """Exhaustive search over 5 strategies."""
+    return optimizer.ExhaustiveSearch(
+        config=lockdown_config.LockdownConfig(
+            strategy=lockdown_config.Options([1, 2, 3, 4, 5]),
+        ),
+        loss=MultiLoss(),
+    )
+
+
+def test_optimize_async_with_model_server():
+    """Test that evaluations overlap and results come in proposal order."""
+    async def optimize():
+        server = StubModelServer(lambda policy: policy['strategy'])
+        port = await server.start()
+        try:
+            solution = await make_optimizer().optimize_async(
+                ClientModel(port), SyncModel(), max_in_flight=3)
+        finally:
+            await server.stop()
+        return solution, server
+
+    solution, server = run(optimize())
+    assert solution == [({'strategy': strategy}, (strategy, 6 - strategy))
+                        for strategy in [1, 2, 3, 4, 5]]
+    assert server.requests == 5
+    assert server.max_active == 3
+
+
+def test_optimize_async_retries_timeouts():
+    """Test that calls that time out are tried again."""
+    async def optimize():
+        server = StubModelServer(lambda policy: policy['strategy'],
+                                 slow_first=2)
+        port = await server.start()
+        try:
+            solution = await make_optimizer().optimize_async(
+                ClientModel(port), SyncModel(), timeout=0.5, retries=1)
+        finally:
+            await server.stop()
+        return solution, server
+
+    solution, server = run(optimize())
+    assert len(solution) == 5
+    assert server.requests == 7
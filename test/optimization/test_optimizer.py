@@ -1,6 +1,11 @@
+import itertools
+
+import numpy as np
+
 from help_project.src.optimization import lockdown_config
 from help_project.src.optimization import loss_function
 from help_project.src.optimization import optimizer
+from help_project.test.optimization.helpers import MultiLoss, WeightedLoss
 
 
 class MockHealthModel():
@@ -25,27 +30,6 @@ class MockEconomicModel():
             return 1
 
 
-class WeightedLoss(loss_function.LossFunction):
-    """Weighted Loss."""
-
-    def __init__(self, health_weight, economic_weight):
-        self.health_weight = health_weight
-        self.economic_weight = economic_weight
-
-    def compute(self, health_output, economic_output):
-        """Compute the loss for a given health and economic output."""
-        return (self.health_weight * health_output +
-                self.economic_weight * economic_output)
-
-
-class MultiLoss(loss_function.LossFunction):
-    """Multi objective Loss."""
-
-    def compute(self, health_output, economic_output):
-        """Compute the loss for a given health and economic output."""
-        return (health_output, economic_output)
-
-
 def test_optimize_single_objective_exhaustive_search():
     """Test that exhaustive search fidns the optimum value."""
     opt = optimizer.ExhaustiveSearch(
@@ -91,3 +75,192 @@ def test_optimize_multi_objective_exhaustive_search():
     assert solution == [({'strategy': 1}, (1, 5)),
                         ({'strategy': 2}, (2, 2)),
                         ({'strategy': 3}, (5, 1))]
+
+
+def test_optimize_thread_pool_matches_sequential():
+    """Test that a thread pool gives the same result as the sequential loop."""
+    config = lockdown_config.LockdownConfig(
+        strategy=lockdown_config.Options([1, 2, 3]),
+    )
+    solution = optimizer.ExhaustiveSearch(config, MultiLoss()).optimize(
+        health_model=MockHealthModel(),
+        economic_model=MockEconomicModel(),
+        executor='thread',
+        n_workers=2,
+        max_in_flight=2,
+    )
+    assert solution == [({'strategy': 1}, (1, 5)),
+                        ({'strategy': 2}, (2, 2)),
+                        ({'strategy': 3}, (5, 1))]
+
+
+def test_optimize_process_pool_n_steps():
+    """Test that a process pool respects n_steps and finds the optimum."""
+    opt = optimizer.RandomSearch(
+        config=lockdown_config.LockdownConfig(
+            strategy=lockdown_config.Options([1, 2, 3]),
+        ),
+        loss=WeightedLoss(1, 1),
+    )
+    with optimizer.make_executor('process', n_workers=2) as pool:
+        solution = opt.optimize(
+            health_model=MockHealthModel(),
+            economic_model=MockEconomicModel(),
+            n_steps=50,
+            executor=pool,
+        )
+    assert solution == [({'strategy': 2}, 4)]
+
+
+def test_exhaustive_search_index_matches_product_order():
+    """Test that unranking follows the order of itertools.product."""
+    opt = optimizer.ExhaustiveSearch(
+        config=lockdown_config.LockdownConfig(
+            a=lockdown_config.Options([1, 2]),
+            b=lockdown_config.Options(['x', 'y', 'z']),
+            c=lockdown_config.Range(0, 1),
+            d=5,
+        ),
+        loss=WeightedLoss(1, 1),
+        range_steps=3,
+    )
+    expected = [{'a': a, 'b': b, 'c': c, 'd': 5}
+                for a, b, c in itertools.product(
+                    [1, 2], ['x', 'y', 'z'], [0, 0.5, 1])]
+    assert opt.size == 18
+    assert [opt.proposal_at(i) for i in range(opt.size)] == expected
+    assert list(opt.generate_proposals()) == expected
+
+
+def test_exhaustive_search_shards():
+    """Test that shards are disjoint and their frontiers merge to the full one."""
+    config = lockdown_config.LockdownConfig(
+        strategy=lockdown_config.Options([1, 2, 3]),
+        other=lockdown_config.Options(list(range(5))),
+    )
+    full = optimizer.ExhaustiveSearch(config, MultiLoss()).optimize(
+        MockHealthModel(), MockEconomicModel())
+
+    merged = loss_function.ParetoFrontier()
+    seen = []
+    for shard_index in range(4):
+        opt = optimizer.ExhaustiveSearch(config, MultiLoss(),
+                                         shard=(shard_index, 4))
+        seen.extend(opt.indices)
+        merged.merge(opt.optimize(MockHealthModel(), MockEconomicModel()))
+    assert sorted(seen) == list(range(15))
+    assert sorted(merged.frontier, key=repr) == sorted(full, key=repr)
+
+    opt = optimizer.ExhaustiveSearch(config, MultiLoss(), index_range=(5, 10))
+    assert list(opt.indices) == list(range(5, 10))
+
+
+def test_optimize_random_search_batched_sampling():
+    """Test that random search with latin hypercube batches finds the optimum."""
+    opt = optimizer.RandomSearch(
+        config=lockdown_config.LockdownConfig(
+            strategy=lockdown_config.Options([1, 2, 3]),
+        ),
+        loss=WeightedLoss(1, 1),
+        seed=0,
+        sampling='lhs',
+        batch_size=6,
+    )
+    solution = opt.optimize(
+        health_model=MockHealthModel(),
+        economic_model=MockEconomicModel(),
+        n_steps=6,
+    )
+    assert solution == [({'strategy': 2}, 4)]
+
+
+def test_random_search_halton_batches_continue_sequence():
+    """Test that consecutive batches continue one shifted Halton sequence."""
+    config = lockdown_config.LockdownConfig(x=lockdown_config.Range(0, 1),
+                                            y=lockdown_config.Range(0, 1))
+    opt = optimizer.RandomSearch(config, WeightedLoss(1, 1), seed=0,
+                                 sampling='halton', batch_size=2)
+    proposals = [opt.propose() for _ in range(6)]
+    expected = lockdown_config.LockdownConfig.policies_from_batch(
+        config.sample_batch(6, 'halton', seed=opt.sequence_seed))
+    assert proposals == expected
+
+
+def test_optimize_with_epsilon_archive():
+    """Test that optimize fills the given frontier."""
+    config = lockdown_config.LockdownConfig(
+        strategy=lockdown_config.Options([1, 2, 3]))
+    opt = optimizer.ExhaustiveSearch(config, MultiLoss())
+    archive = loss_function.EpsilonParetoArchive(3.)
+    solution = opt.optimize(MockHealthModel(), MockEconomicModel(),
+                            frontier=archive)
+    assert solution == archive.frontier == [({'strategy': 2}, (2, 2))]
+
+
+class BatchHealthModel(MockHealthModel):
+    """Mock health model evaluating batches."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def run_batch(self, policies):
+        self.batch_sizes.append(len(policies))
+        return [self.run(policy) for policy in policies]
+
+
+class BatchMultiLoss(MultiLoss):
+    """Multi objective Loss computed on whole batches."""
+
+    def compute_batch(self, health_outputs, economic_outputs):
+        return np.stack([health_outputs, economic_outputs], axis=1)
+
+
+def test_optimize_batches_match_sequential():
+    """Test that batched evaluation gives the same result as the loop."""
+    config = lockdown_config.LockdownConfig(
+        strategy=lockdown_config.Options([1, 2, 3]),
+        other=lockdown_config.Options(list(range(5))),
+    )
+    expected = optimizer.ExhaustiveSearch(config, MultiLoss()).optimize(
+        MockHealthModel(), MockEconomicModel())
+
+    health_model = BatchHealthModel()
+    steps = list(optimizer.ExhaustiveSearch(
+        config, BatchMultiLoss()).optimize_iter(
+            health_model, MockEconomicModel(), batch_size=4))
+    assert [step.step for step in steps] == list(range(1, 16))
+    assert all(isinstance(step.loss, tuple) for step in steps)
+    assert steps[-1].frontier.frontier == expected
+    assert health_model.batch_sizes == [4, 4, 4, 3]
+
+    solution = optimizer.ExhaustiveSearch(config, MultiLoss()).optimize(
+        MockHealthModel(), MockEconomicModel(), n_steps=7, batch_size=4,
+        executor='thread', n_workers=2)
+    assert solution == expected[:7]
+
+
+def test_propose_batch_stops_at_needs_records():
+    """Test that the default propose_batch waits for pending records."""
+    class Alternating(optimizer.Optimizer):
+        """Optimizer proposing two policies before needing their losses."""
+
+        def __init__(self):
+            super().__init__(None, WeightedLoss(1, 1))
+            self.outstanding = 0
+            self.recorded = []
+
+        def propose(self):
+            if self.outstanding == 2:
+                raise optimizer.NeedsRecords()
+            self.outstanding += 1
+            return {'strategy': self.outstanding}
+
+        def record(self, proposal, loss):
+            self.outstanding -= 1
+            self.recorded.append(loss)
+
+    opt = Alternating()
+    assert opt.propose_batch(5) == [{'strategy': 1}, {'strategy': 2}]
+    solution = Alternating().optimize(
+        MockHealthModel(), MockEconomicModel(), n_steps=6, batch_size=5)
+    assert solution == [({'strategy': 2}, 4)]
@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+from help_project.benchmarks import suite
+from help_project.src.economic_model.models import basic_lockdown_model
+from help_project.src.economic_model.utils import gva_data
+from help_project.src.optimization import preload
+
+
+def test_optimization_imports_without_pandas():
+    """Test that no optimization module imports pandas or scipy."""
+    folder = os.path.dirname(preload.__file__)
+    modules = ['help_project.src.optimization.' + name[:-3]
+               for name in sorted(os.listdir(folder))
+               if name.endswith('.py') and name != '__init__.py']
+    _, heavy = suite.import_stats(', '.join(modules))
+    assert heavy == []
+
+
+def test_preload():
+    """Test that preloading returns the shared objects of the process."""
+    loaded = preload.preload(['gva', 'sector_mapping'])
+    assert list(loaded) == ['gva', 'sector_mapping']
+    assert loaded['gva'] is gva_data.get_dataset()
+    assert (loaded['sector_mapping'] is
+            basic_lockdown_model.SectorMapping.default())
+    with pytest.raises(ValueError):
+        preload.preload(['gva', 'unknown'])
@@ -0,0 +1,81 @@
+import numpy as np
+
+from help_project.src.disease_model import case_store
+from help_project.src.exitstrategies import strategy_store
+from help_project.src.optimization import lockdown_config
+from help_project.src.optimization import loss_function
+from help_project.src.optimization import optimizer
+from help_project.src.optimization import shared_data
+
+
+class CaseModel():
+    """Model reading the case store of the process it runs in."""
+    def run(self, policy):
+        store = case_store.get_store()
+        attached = not store.dates.flags.writeable
+        return float(store.query(policy['country'])['total_cases'][-1]), attached
+
+
+class AttachedLoss(loss_function.LossFunction):
+    """Loss giving the cases if the model used attached data, NaN if not."""
+    def compute(self, health_output, economic_output):
+        cases, attached = health_output
+        return cases if attached else np.nan
+
+
+def test_attach_matches_loaded_data():
+    """Test that attached arrays match the data they were published from."""
+    cases, strategies = case_store.get_store(), strategy_store.get_store()
+    try:
+        with shared_data.SharedData(['cases', 'strategies']) as data:
+            shared_data.attach(data.manifest)
+            attached = case_store.get_store()
+            assert attached is not cases
+            assert np.array_equal(attached.query('India')['total_cases'],
+                                  cases.query('India')['total_cases'])
+            assert np.array_equal(strategy_store.get_store().get(),
+                                  strategies.get(), equal_nan=True)
+            assert strategy_store.get_store().n_days == strategies.n_days
+            assert strategy_store.get_store().refresh() == []
+            del attached
+            shared_data.detach()
+    finally:
+        case_store.set_store(cases)
+        strategy_store.set_store(strategies)
+    assert data.manifest is None
+
+
+def test_detach_closes_blocks():
+    """Test that detach closes the blocks and resets the installed data."""
+    cases = case_store.get_store()
+    try:
+        with shared_data.SharedData(['cases']) as data:
+            shared_data.attach(data.manifest)
+            assert shared_data._ATTACHED  # pylint: disable=protected-access
+            shared_data.detach()
+            assert not shared_data._ATTACHED  # pylint: disable=protected-access
+            assert case_store.get_store() is not cases
+    finally:
+        case_store.set_store(cases)
+
+
+def test_process_pool_workers_attach():
+    """Test that pool workers use the published data."""
+    config = lockdown_config.LockdownConfig(
+        country=lockdown_config.Options(['India', 'Italy']))
+    opt = optimizer.ExhaustiveSearch(config, AttachedLoss())
+    with shared_data.SharedData(['cases']) as data:
+        steps = list(opt.optimize_iter(CaseModel(), CaseModel(), n_workers=2,
+                                       executor='process', shared_data=data))
+    assert len(steps) == 2
+    assert all(step.loss == case_store.get_store().query(
+        step.policy['country'])['total_cases'][-1] for step in steps)
+
+
+def test_fallback_without_shared_memory(monkeypatch):
+    """Test that workers load their own data without shared memory."""
+    monkeypatch.setattr(shared_data, 'shared_memory', None)
+    data = shared_data.SharedData()
+    assert data.manifest is None
+    shared_data.attach(data.manifest)
+    data.close()
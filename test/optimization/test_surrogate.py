@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from help_project.src.optimization import lockdown_config
+from help_project.src.optimization import surrogate
+from help_project.test.optimization.helpers import MultiLoss, WeightedLoss
+
+
+class QuadraticModel():
+    """Mock model returning the squared distance to a target."""
+
+    def __init__(self, target):
+        self.target = target
+        self.calls = 0
+
+    def run(self, policy):
+        self.calls += 1
+        penalty = 0 if policy['mode'] == 'good' else 0.5
+        return ((policy['x'] - self.target[0]) ** 2 +
+                (policy['y'] - self.target[1]) ** 2 + penalty)
+
+
+def make_config():
+    """Config with both Options and Range parameters."""
+    return lockdown_config.LockdownConfig(
+        x=lockdown_config.Range(0, 1),
+        y=lockdown_config.Range(0, 1),
+        mode=lockdown_config.Options(['good', 'bad']),
+    )
+
+
+def test_gaussian_process_interpolates():
+    """Test that the process reproduces its training targets."""
+    inputs = np.linspace(0, 1, 8)[:, np.newaxis]
+    targets = np.sin(6 * inputs[:, 0])
+    mean, std = surrogate.GaussianProcess().fit(inputs, targets).predict(inputs)
+    assert np.allclose(mean, targets, atol=1e-3)
+    assert np.all(std < 1e-2)
+
+
+def test_gaussian_process_duplicate_inputs():
+    """Test that duplicate inputs are fitted with more jitter, or rejected."""
+    inputs = np.repeat(np.linspace(0, 1, 4), 3)[:, np.newaxis]
+    targets = np.repeat([0., 1., 0., 1.], 3)
+    model = surrogate.GaussianProcess(noise=0).fit(inputs, targets)
+    mean, std = model.predict(inputs)
+    assert np.all(np.isfinite(mean)) and np.all(np.isfinite(std))
+    assert np.allclose(mean, targets, atol=1e-2)
+
+    with pytest.raises(np.linalg.LinAlgError):
+        surrogate.GaussianProcess(noise=0, max_jitter=0).fit(inputs, targets)
+
+
+def test_surrogate_search_single_objective():
+    """Test that few evaluations get close to the optimum."""
+    opt = surrogate.SurrogateSearch(make_config(), WeightedLoss(), seed=0)
+    solution = opt.optimize(QuadraticModel((0.3, 0.7)),
+                            QuadraticModel((0.3, 0.7)), n_steps=40)
+    assert solution[0][0]['mode'] == 'good'
+    assert solution[0][1] < 0.02
+
+
+def test_surrogate_search_multi_objective_parallel():
+    """Test the multi objective batches on a thread pool."""
+    opt = surrogate.SurrogateSearch(make_config(), MultiLoss(), seed=0)
+    solution = opt.optimize(QuadraticModel((0, 0)), QuadraticModel((1, 1)),
+                            n_steps=40, executor='thread', n_workers=2)
+    assert len(solution) > 3
+    assert sum(policy['mode'] == 'good' for policy, _ in solution) > 3
+
+
+def test_surrogate_search_falls_back_when_fit_fails(monkeypatch):
+    """Test that batches are random when the process cannot be fitted."""
+    def fail(self, inputs, targets):
+        raise np.linalg.LinAlgError('not positive definite')
+    monkeypatch.setattr(surrogate.GaussianProcess, 'fit', fail)
+    opt = surrogate.SurrogateSearch(make_config(), WeightedLoss(), seed=0)
+    solution = opt.optimize(QuadraticModel((0.3, 0.7)),
+                            QuadraticModel((0.3, 0.7)), n_steps=20)
+    assert len(solution) == 1